@@ -6,6 +6,7 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 #include <queue>
 #include <tuple>
@@ -33,10 +34,17 @@ std::tuple<at::Tensor, at::Tensor> BallQueryCpu(
   auto idxs_a = idxs.accessor<int64_t, 3>();
   auto dists_a = dists.accessor<float, 3>();
 
-  for (int n = 0; n < N; ++n) {
-    const int64_t length1 = lengths1_a[n];
-    const int64_t length2 = lengths2_a[n];
-    for (int64_t i = 0; i < length1; ++i) {
+  // Each query point is independent, so we parallelize over all the
+  // (n, i) pairs.
+  at::parallel_for(0, int64_t(N) * P1, 1, [&](int64_t start, int64_t end) {
+    for (int64_t n_i = start; n_i < end; ++n_i) {
+      const int64_t n = n_i / P1;
+      const int64_t i = n_i % P1;
+      const int64_t length1 = lengths1_a[n];
+      const int64_t length2 = lengths2_a[n];
+      if (i >= length1) {
+        continue;
+      }
       for (int64_t j = 0, count = 0; j < length2 && count < K; ++j) {
         float dist2 = 0;
         for (int d = 0; d < D; ++d) {
@@ -50,6 +58,6 @@ std::tuple<at::Tensor, at::Tensor> BallQueryCpu(
         }
       }
     }
-  }
+  });
   return std::make_tuple(idxs, dists);
 }
@@ -6,6 +6,7 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 #include <cmath>
 #include <vector>
@@ -25,10 +26,11 @@ at::Tensor SigmoidAlphaBlendForwardCpu(
   auto pix_to_face_a = pix_to_face.accessor<int64_t, 4>();
   auto out_a = out.accessor<float, 3>();
 
-  // Iterate over the images in the batch.
-  for (int n = 0; n < N; ++n) {
-    // Iterate through the horizontal lines of the image from top to bottom.
-    for (int h = 0; h < H; ++h) {
+  // Iterate over the horizontal lines of the images in the batch, in parallel.
+  at::parallel_for(0, N * H, 1, [&](int64_t start, int64_t end) {
+    for (int64_t nh = start; nh < end; ++nh) {
+      const int n = nh / H;
+      const int h = nh % H;
       // Iterate over the pixels on this horizontal line, left to right.
       for (int w = 0; w < W; ++w) {
         float alpha = 1.0;
@@ -57,7 +59,7 @@ at::Tensor SigmoidAlphaBlendForwardCpu(
         out_a[n][h][w] = 1.0 - alpha;
       }
     }
-  }
+  });
   return out;
 }
 
@@ -81,10 +83,11 @@ at::Tensor SigmoidAlphaBlendBackwardCpu(
       torch::zeros({N, H, W, K}, distances.options());
   auto grad_distances_a = grad_distances.accessor<float, 4>();
 
-  // Iterate over the images in the batch.
-  for (int n = 0; n < N; ++n) {
-    // Iterate through the horizontal lines of the image from top to bottom.
-    for (int h = 0; h < H; ++h) {
+  // Iterate over the horizontal lines of the images in the batch, in parallel.
+  at::parallel_for(0, N * H, 1, [&](int64_t start, int64_t end) {
+    for (int64_t nh = start; nh < end; ++nh) {
+      const int n = nh / H;
+      const int h = nh % H;
       // Iterate over the pixels on this horizontal line, left to right.
       for (int w = 0; w < W; ++w) {
         // Get the alpha value from the forward pass and the
@@ -124,6 +127,6 @@ at::Tensor SigmoidAlphaBlendBackwardCpu(
         }
       }
     }
-  }
+  });
   return grad_distances;
 }
@@ -6,8 +6,10 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 
+#include <algorithm>
 #include <cmath>
 #include <vector>
 
@@ -28,12 +30,13 @@ torch::Tensor weightedSumCpuForward(
   auto points_idx_a = points_idx.accessor<int64_t, 4>();
   auto result_a = result.accessor<float, 4>();
 
-  // Iterate over the batch
-  for (int b = 0; b < B; ++b) {
-    // Iterate over the features
-    for (int c = 0; c < C; ++c) {
-      // Iterate through the horizontal lines of the image from top to bottom
-      for (int j = 0; j < H; ++j) {
+  // Iterate over the horizontal lines of the images in the batch, in parallel
+  at::parallel_for(0, B * H, 1, [&](int64_t start, int64_t end) {
+    for (int64_t bj = start; bj < end; ++bj) {
+      const int64_t b = bj / H;
+      const int64_t j = bj % H;
+      // Iterate over the features
+      for (int c = 0; c < C; ++c) {
         // Iterate over pixels in a horizontal line, left to right
         for (int i = 0; i < W; ++i) {
           // Iterate through the closest K points for this pixel
@@ -50,7 +53,7 @@ torch::Tensor weightedSumCpuForward(
         }
       }
     }
-  }
+  });
   return result;
 }
 
@@ -64,41 +67,52 @@ std::tuple<torch::Tensor, torch::Tensor> weightedSumCpuBackward(
   const int64_t H = points_idx.size(2);
   const int64_t W = points_idx.size(3);
   const int64_t C = features.size(0);
+  const int64_t P = features.size(1);
 
-  torch::Tensor grad_features = torch::zeros_like(features);
+  // A point can be seen in several horizontal lines, so each chunk of lines
+  // accumulates the gradients of the features separately.
+  const int64_t n_chunks = std::min<int64_t>(at::get_num_threads(), B * H);
+  torch::Tensor grad_features_chunks =
+      torch::zeros({n_chunks, C, P}, features.options());
   torch::Tensor grad_alphas = torch::zeros_like(alphas);
 
   auto grad_outputs_a = grad_outputs.accessor<float, 4>();
   auto features_a = features.accessor<float, 2>();
   auto alphas_a = alphas.accessor<float, 4>();
   auto points_idx_a = points_idx.accessor<int64_t, 4>();
-  auto grad_features_a = grad_features.accessor<float, 2>();
+  auto grad_features_chunks_a = grad_features_chunks.accessor<float, 3>();
   auto grad_alphas_a = grad_alphas.accessor<float, 4>();
 
-  // Iterate over the batch
-  for (int b = 0; b < B; ++b) {
-    // Iterate oer the features
-    for (int c = 0; c < C; ++c) {
-      // Iterate through the horizontal lines of the image from top to bottom
-      for (int j = 0; j < H; ++j) {
-        // Iterate over pixels in a horizontal line, left to right
-        for (int i = 0; i < W; ++i) {
-          // Iterate through the closest K points for this pixel
-          for (int k = 0; k < K; ++k) {
-            int64_t n_idx = points_idx_a[b][k][j][i];
-            // Sentinal value is -1, indicating no point overlaps this pixel
-            if (n_idx < 0) {
-              continue;
-            }
+  at::parallel_for(0, n_chunks, 1, [&](int64_t start, int64_t end) {
+    for (int64_t chunk = start; chunk < end; ++chunk) {
+      auto grad_features_a = grad_features_chunks_a[chunk];
+      // Iterate over the horizontal lines of the images in this chunk
+      const int64_t bj_end = (chunk + 1) * B * H / n_chunks;
+      for (int64_t bj = chunk * B * H / n_chunks; bj < bj_end; ++bj) {
+        const int64_t b = bj / H;
+        const int64_t j = bj % H;
+        // Iterate over the features
+        for (int c = 0; c < C; ++c) {
+          // Iterate over pixels in a horizontal line, left to right
+          for (int i = 0; i < W; ++i) {
+            // Iterate through the closest K points for this pixel
+            for (int k = 0; k < K; ++k) {
+              int64_t n_idx = points_idx_a[b][k][j][i];
+              // Sentinal value is -1, indicating no point overlaps this pixel
+              if (n_idx < 0) {
+                continue;
+              }
 
-            float alpha = alphas_a[b][k][j][i];
-            grad_alphas_a[b][k][j][i] +=
-                grad_outputs_a[b][c][j][i] * features_a[c][n_idx];
-            grad_features_a[c][n_idx] += grad_outputs_a[b][c][j][i] * alpha;
+              float alpha = alphas_a[b][k][j][i];
+              grad_alphas_a[b][k][j][i] +=
+                  grad_outputs_a[b][c][j][i] * features_a[c][n_idx];
+              grad_features_a[c][n_idx] += grad_outputs_a[b][c][j][i] * alpha;
+            }
           }
         }
       }
     }
-  }
+  });
+  torch::Tensor grad_features = grad_features_chunks.sum(0);
   return std::make_tuple(grad_features, grad_alphas);
 }
@@ -43,6 +43,7 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
   m.def("knn_check_version", &KnnCheckVersion);
 #endif
   m.def("knn_points_idx", &KNearestNeighborIdx);
+  m.def("knn_points_idx_grid", &KNearestNeighborIdxGrid);
   m.def("knn_points_backward", &KNearestNeighborBackward);
   m.def("ball_query", &BallQuery);
   m.def("sample_farthest_points", &FarthestPointSampling);
@@ -97,6 +98,8 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
 
   // Marching cubes
   m.def("marching_cubes", &MarchingCubes);
+  m.def("marching_cubes_batch", &MarchingCubesBatch);
+  m.def("marching_cubes_blocks", &MarchingCubesBlocks);
 
   // Pulsar.
   // Pulsar not enabled on AMD.
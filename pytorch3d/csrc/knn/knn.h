@@ -77,6 +77,80 @@ std::tuple<at::Tensor, at::Tensor> KNearestNeighborIdx(
   return KNearestNeighborIdxCpu(p1, p2, lengths1, lengths2, norm, K);
 }
 
+// Compute indices of K nearest neighbors in pointcloud p2 to points
+// in pointcloud p1, using a uniform grid over each cloud of p2 to only look
+// at the points near each point of p1. The points of p2 are given sorted by
+// the grid cell which contains them. Only 3D points are supported.
+//
+// Args:
+//    p1: FloatTensor of shape (N, P1, 3) giving a batch of pointclouds each
+//        containing P1 points.
+//    lengths1: LongTensor, shape (N,), giving actual length of each P1 cloud.
+//    grid_points: FloatTensor of shape (N, P2, 3) giving the points of p2,
+//        where the points of each cloud are sorted by grid cell, and padding
+//        points come last.
+//    grid_idxs: LongTensor of shape (N, P2) giving the index in p2 of each
+//        point in grid_points.
+//    cell_starts: LongTensor of shape (N, C + 1) where C is at least the
+//        number of cells in each grid, such that the points in cell c of the
+//        grid of cloud n are grid_points[n, cell_starts[n, c]:
+//        cell_starts[n, c + 1]]. Cell (x, y, z) is cell number
+//        (x * resolution[n, 1] + y) * resolution[n, 2] + z.
+//    grid_min: FloatTensor of shape (N, 3) giving the minimum corner of each
+//        grid.
+//    cell_size: FloatTensor of shape (N,) giving the side length of the
+//        (cubic) cells of each grid.
+//    resolution: LongTensor of shape (N, 3) giving the number of cells along
+//        each axis of each grid.
+//    norm: int specifying the norm for the distance (1 for L1, 2 for L2)
+//    K: int giving the number of nearest points to return.
+//
+// Returns:
+//    p1_neighbor_idx, p1_neighbor_dists: as for KNearestNeighborIdx, with
+//        the neighbors sorted in ascending order of distance. Neighbors at
+//        equal distances may be in a different order.
+
+// CPU implementation.
+std::tuple<at::Tensor, at::Tensor> KNearestNeighborIdxGridCpu(
+    const at::Tensor& p1,
+    const at::Tensor& lengths1,
+    const at::Tensor& grid_points,
+    const at::Tensor& grid_idxs,
+    const at::Tensor& cell_starts,
+    const at::Tensor& grid_min,
+    const at::Tensor& cell_size,
+    const at::Tensor& resolution,
+    const int norm,
+    const int K);
+
+// Implementation which is exposed.
+std::tuple<at::Tensor, at::Tensor> KNearestNeighborIdxGrid(
+    const at::Tensor& p1,
+    const at::Tensor& lengths1,
+    const at::Tensor& grid_points,
+    const at::Tensor& grid_idxs,
+    const at::Tensor& cell_starts,
+    const at::Tensor& grid_min,
+    const at::Tensor& cell_size,
+    const at::Tensor& resolution,
+    const int norm,
+    const int K) {
+  if (p1.is_cuda() || grid_points.is_cuda()) {
+    AT_ERROR("The grid method of KNN is only implemented on CPU.");
+  }
+  return KNearestNeighborIdxGridCpu(
+      p1,
+      lengths1,
+      grid_points,
+      grid_idxs,
+      cell_starts,
+      grid_min,
+      cell_size,
+      resolution,
+      norm,
+      K);
+}
+
 // Compute gradients with respect to p1 and p2
 //
 // Args:
@@ -6,6 +6,7 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 #include <queue>
 #include <tuple>
@@ -32,10 +33,17 @@ std::tuple<at::Tensor, at::Tensor> KNearestNeighborIdxCpu(
   auto idxs_a = idxs.accessor<int64_t, 3>();
   auto dists_a = dists.accessor<float, 3>();
 
-  for (int n = 0; n < N; ++n) {
-    const int64_t length1 = lengths1_a[n];
-    const int64_t length2 = lengths2_a[n];
-    for (int64_t i1 = 0; i1 < length1; ++i1) {
+  // Each query point is independent, so we parallelize over all the
+  // (n, i1) pairs. The results do not depend on the number of threads.
+  at::parallel_for(0, int64_t(N) * P1, 1, [&](int64_t start, int64_t end) {
+    for (int64_t n_i1 = start; n_i1 < end; ++n_i1) {
+      const int64_t n = n_i1 / P1;
+      const int64_t i1 = n_i1 % P1;
+      const int64_t length1 = lengths1_a[n];
+      const int64_t length2 = lengths2_a[n];
+      if (i1 >= length1) {
+        continue;
+      }
       // Use a priority queue to store (distance, index) tuples.
       std::priority_queue<std::tuple<float, int>> q;
       for (int64_t i2 = 0; i2 < length2; ++i2) {
@@ -64,7 +72,7 @@ std::tuple<at::Tensor, at::Tensor> KNearestNeighborIdxCpu(
         idxs_a[n][i1][k] = std::get<1>(t);
       }
     }
-  }
+  });
   return std::make_tuple(idxs, dists);
 }
 
@@ -98,31 +106,37 @@ std::tuple<at::Tensor, at::Tensor> KNearestNeighborBackwardCpu(
   auto grad_p1_a = grad_p1.accessor<float, 3>();
   auto grad_p2_a = grad_p2.accessor<float, 3>();
 
-  for (int n = 0; n < N; ++n) {
-    const int64_t length1 = lengths1_a[n];
-    int64_t length2 = lengths2_a[n];
-    length2 = (length2 < K) ? length2 : K;
-    for (int64_t i1 = 0; i1 < length1; ++i1) {
-      for (int64_t k = 0; k < length2; ++k) {
-        const int64_t i2 = idxs_a[n][i1][k];
-        // If the index is the pad value of -1 then ignore it
-        if (i2 == -1) {
-          continue;
-        }
-        for (int64_t d = 0; d < D; ++d) {
-          float diff = 0.0;
-          if (norm == 1) {
-            float sign = (p1_a[n][i1][d] > p2_a[n][i2][d]) ? 1.0 : -1.0;
-            diff = grad_dists_a[n][i1][k] * sign;
-          } else { // norm is 2 (default)
-            diff = 2.0f * grad_dists_a[n][i1][k] *
-                (p1_a[n][i1][d] - p2_a[n][i2][d]);
+  // Different query points of a cloud can accumulate into the same element
+  // of grad_p2, so we only parallelize over the batch. This keeps the order
+  // of the sums, and therefore the results, the same for any number of
+  // threads.
+  at::parallel_for(0, N, 1, [&](int64_t start, int64_t end) {
+    for (int64_t n = start; n < end; ++n) {
+      const int64_t length1 = lengths1_a[n];
+      int64_t length2 = lengths2_a[n];
+      length2 = (length2 < K) ? length2 : K;
+      for (int64_t i1 = 0; i1 < length1; ++i1) {
+        for (int64_t k = 0; k < length2; ++k) {
+          const int64_t i2 = idxs_a[n][i1][k];
+          // If the index is the pad value of -1 then ignore it
+          if (i2 == -1) {
+            continue;
+          }
+          for (int64_t d = 0; d < D; ++d) {
+            float diff = 0.0;
+            if (norm == 1) {
+              float sign = (p1_a[n][i1][d] > p2_a[n][i2][d]) ? 1.0 : -1.0;
+              diff = grad_dists_a[n][i1][k] * sign;
+            } else { // norm is 2 (default)
+              diff = 2.0f * grad_dists_a[n][i1][k] *
+                  (p1_a[n][i1][d] - p2_a[n][i2][d]);
+            }
+            grad_p1_a[n][i1][d] += diff;
+            grad_p2_a[n][i2][d] += -1.0f * diff;
           }
-          grad_p1_a[n][i1][d] += diff;
-          grad_p2_a[n][i2][d] += -1.0f * diff;
         }
       }
     }
-  }
+  });
   return std::make_tuple(grad_p1, grad_p2);
 }
@@ -0,0 +1,163 @@
+/*
+ * Copyright (c) Meta Platforms, Inc. and affiliates.
+ * All rights reserved.
+ *
+ * This source code is licensed under the BSD-style license found in the
+ * LICENSE file in the root directory of this source tree.
+ */
+
+#include <ATen/Parallel.h>
+#include <torch/extension.h>
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <tuple>
+#include <vector>
+
+std::tuple<at::Tensor, at::Tensor> KNearestNeighborIdxGridCpu(
+    const at::Tensor& p1,
+    const at::Tensor& lengths1,
+    const at::Tensor& grid_points,
+    const at::Tensor& grid_idxs,
+    const at::Tensor& cell_starts,
+    const at::Tensor& grid_min,
+    const at::Tensor& cell_size,
+    const at::Tensor& resolution,
+    const int norm,
+    const int K) {
+  const int N = p1.size(0);
+  const int P1 = p1.size(1);
+
+  auto long_opts = lengths1.options().dtype(torch::kInt64);
+  torch::Tensor idxs = torch::full({N, P1, K}, 0, long_opts);
+  torch::Tensor dists = torch::full({N, P1, K}, 0, p1.options());
+
+  auto p1_a = p1.accessor<float, 3>();
+  auto lengths1_a = lengths1.accessor<int64_t, 1>();
+  auto grid_points_a = grid_points.accessor<float, 3>();
+  auto grid_idxs_a = grid_idxs.accessor<int64_t, 2>();
+  auto cell_starts_a = cell_starts.accessor<int64_t, 2>();
+  auto grid_min_a = grid_min.accessor<float, 2>();
+  auto cell_size_a = cell_size.accessor<float, 1>();
+  auto resolution_a = resolution.accessor<int64_t, 2>();
+  auto idxs_a = idxs.accessor<int64_t, 3>();
+  auto dists_a = dists.accessor<float, 3>();
+
+  at::parallel_for(0, int64_t(N) * P1, 1, [&](int64_t start, int64_t end) {
+    // A max-heap of (distance, index) tuples of the nearest points found so
+    // far. Its storage is reused by all the points of this chunk, as there
+    // can be millions of them.
+    std::vector<std::tuple<float, int64_t>> heap;
+    heap.reserve(K);
+    for (int64_t n_i1 = start; n_i1 < end; ++n_i1) {
+      const int64_t n = n_i1 / P1;
+      const int64_t i1 = n_i1 % P1;
+      if (i1 >= lengths1_a[n]) {
+        continue;
+      }
+      const float cell = cell_size_a[n];
+      float point[3];
+      float lo_corner[3];
+      int64_t res[3];
+      int64_t center[3];
+      for (int d = 0; d < 3; ++d) {
+        point[d] = p1_a[n][i1][d];
+        lo_corner[d] = grid_min_a[n][d];
+        res[d] = resolution_a[n][d];
+        // The search starts from the nearest cell, also for points outside
+        // the grid.
+        const float c = std::floor((point[d] - lo_corner[d]) / cell);
+        center[d] = static_cast<int64_t>(
+            std::min(std::max(c, 0.0f), static_cast<float>(res[d] - 1)));
+      }
+
+      heap.clear();
+      auto visit_cell = [&](int64_t x, int64_t y, int64_t z) {
+        const int64_t c = (x * res[1] + y) * res[2] + z;
+        const int64_t cell_end = cell_starts_a[n][c + 1];
+        for (int64_t j = cell_starts_a[n][c]; j < cell_end; ++j) {
+          float dist = 0;
+          for (int d = 0; d < 3; ++d) {
+            float diff = point[d] - grid_points_a[n][j][d];
+            if (norm == 1) {
+              dist += abs(diff);
+            } else { // norm is 2 (default)
+              dist += diff * diff;
+            }
+          }
+          if (static_cast<int>(heap.size()) < K) {
+            heap.emplace_back(dist, grid_idxs_a[n][j]);
+            std::push_heap(heap.begin(), heap.end());
+          } else if (dist < std::get<0>(heap.front())) {
+            std::pop_heap(heap.begin(), heap.end());
+            heap.back() = std::make_tuple(dist, grid_idxs_a[n][j]);
+            std::push_heap(heap.begin(), heap.end());
+          }
+        }
+      };
+
+      // Visit the cells in growing cubic shells around the center cell, until
+      // no point outside the visited block can be closer than the K nearest
+      // points found so far.
+      for (int64_t r = 0;; ++r) {
+        const int64_t x_lo = std::max<int64_t>(center[0] - r, 0);
+        const int64_t x_hi = std::min<int64_t>(center[0] + r, res[0] - 1);
+        const int64_t y_lo = std::max<int64_t>(center[1] - r, 0);
+        const int64_t y_hi = std::min<int64_t>(center[1] + r, res[1] - 1);
+        for (int64_t x = x_lo; x <= x_hi; ++x) {
+          for (int64_t y = y_lo; y <= y_hi; ++y) {
+            const bool on_shell = (std::abs(x - center[0]) == r) ||
+                (std::abs(y - center[1]) == r);
+            if (on_shell) {
+              const int64_t z_lo = std::max<int64_t>(center[2] - r, 0);
+              const int64_t z_hi = std::min<int64_t>(center[2] + r, res[2] - 1);
+              for (int64_t z = z_lo; z <= z_hi; ++z) {
+                visit_cell(x, y, z);
+              }
+            } else {
+              if (center[2] - r >= 0) {
+                visit_cell(x, y, center[2] - r);
+              }
+              if (r > 0 && center[2] + r < res[2]) {
+                visit_cell(x, y, center[2] + r);
+              }
+            }
+          }
+        }
+
+        // Find the smallest distance along an axis from the point to the
+        // cells outside the visited block.
+        bool covers_grid = true;
+        float gap = std::numeric_limits<float>::infinity();
+        for (int d = 0; d < 3; ++d) {
+          if (center[d] - r > 0) {
+            covers_grid = false;
+            const float side = lo_corner[d] + (center[d] - r) * cell;
+            gap = std::min(gap, std::max(point[d] - side, 0.0f));
+          }
+          if (center[d] + r < res[d] - 1) {
+            covers_grid = false;
+            const float side = lo_corner[d] + (center[d] + r + 1) * cell;
+            gap = std::min(gap, std::max(side - point[d], 0.0f));
+          }
+        }
+        if (covers_grid) {
+          break;
+        }
+        if (static_cast<int>(heap.size()) == K) {
+          const float bound = (norm == 1) ? gap : gap * gap;
+          if (bound >= std::get<0>(heap.front())) {
+            break;
+          }
+        }
+      }
+
+      std::sort_heap(heap.begin(), heap.end());
+      for (size_t k = 0; k < heap.size(); ++k) {
+        dists_a[n][i1][k] = std::get<0>(heap[k]);
+        idxs_a[n][i1][k] = std::get<1>(heap[k]);
+      }
+    }
+  });
+  return std::make_tuple(idxs, dists);
+}
@@ -28,7 +28,8 @@
 //    ids: (N_verts,) LongTensor used to identify each vertex and deduplication
 //         to avoid floating point precision issues.
 //         For Cuda, will be used to dedupe redundant vertices.
-//         For cpp implementation, this tensor is just a placeholder.
+//         For cpp implementation, these are the ids of the edges of the
+//         grid on which the vertices lie, which are unique.
 
 // CPU implementation
 std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubesCpu(
@@ -60,3 +61,75 @@ inline std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubes(
   }
   return MarchingCubesCpu(vol.contiguous(), isolevel);
 }
+
+// Run Marching Cubes algorithm over a batch of volume scalar fields in
+// parallel, over the volumes and over slabs of each volume.
+//
+// Args:
+//    vols: FloatTensor of shape (N, D, H, W) giving a batch of volume
+//    scalar grids.
+//    isolevels: FloatTensor of shape (N,) giving the isosurface value of each
+//    volume.
+//
+// Returns:
+//    lists of the N outputs of MarchingCubes for each volume.
+
+// CPU implementation
+std::tuple<
+    std::vector<at::Tensor>,
+    std::vector<at::Tensor>,
+    std::vector<at::Tensor>>
+MarchingCubesBatchCpu(const at::Tensor& vols, const at::Tensor& isolevels);
+
+// Implementation which is exposed
+inline std::tuple<
+    std::vector<at::Tensor>,
+    std::vector<at::Tensor>,
+    std::vector<at::Tensor>>
+MarchingCubesBatch(const at::Tensor& vols, const at::Tensor& isolevels) {
+  if (vols.is_cuda() || isolevels.is_cuda()) {
+    AT_ERROR("Batched marching cubes is only implemented on the CPU.");
+  }
+  return MarchingCubesBatchCpu(vols.contiguous(), isolevels.contiguous());
+}
+
+// Run Marching Cubes algorithm over blocks of a scalar grid of size
+// (D, H, W), e.g. the blocks which straddle the isosurface, and return a
+// single mesh. The vertices on the boundaries between the blocks are shared
+// by the faces of both blocks.
+//
+// Args:
+//    blocks: FloatTensor of shape (B, S + 1, S + 1, S + 1) giving the values
+//    of the grid points of B blocks of S x S x S cells.
+//    block_origins: LongTensor of shape (B, 3) giving the (z, y, x) index in
+//    the grid of the first grid point of each block.
+//    D, H, W: the size of the grid.
+//    isolevel: isosurface value to use as the threshoold to determine whether
+//    the points are within a volume.
+//
+// Returns:
+//    the same as MarchingCubes.
+
+// CPU implementation
+std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubesBlocksCpu(
+    const at::Tensor& blocks,
+    const at::Tensor& block_origins,
+    const int64_t D,
+    const int64_t H,
+    const int64_t W,
+    const float isolevel);
+
+// Implementation which is exposed
+inline std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubesBlocks(
+    const at::Tensor& blocks,
+    const at::Tensor& block_origins,
+    const int64_t D,
+    const int64_t H,
+    const int64_t W,
+    const float isolevel) {
+  if (blocks.is_cuda() || block_origins.is_cuda()) {
+    AT_ERROR("Block-wise marching cubes is only implemented on the CPU.");
+  }
+  return MarchingCubesBlocksCpu(
+      blocks.contiguous(), block_origins.contiguous(), D, H, W, isolevel);
+}
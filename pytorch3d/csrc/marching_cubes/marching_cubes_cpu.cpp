@@ -6,6 +6,7 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 #include <algorithm>
 #include <array>
@@ -15,6 +16,114 @@
 #include "marching_cubes/marching_cubes_utils.h"
 #include "marching_cubes/tables.h"
 
+// The vertices and faces of a mesh which is built by marching cubes. The
+// vertices are identified by the global ids of the edges of the grid on
+// which they lie, so that cells which are marched separately, e.g. in
+// different blocks, share their vertices.
+struct MarchingCubesMesh {
+  // uniq_edge_id: maps the edge ids to the indices of the vertices
+  std::unordered_map<int64_t, int64_t> uniq_edge_id;
+  std::vector<int64_t> faces; // store face indices
+  std::vector<Vertex> verts; // store vertex positions
+  std::vector<int64_t> ids; // store the edge ids of the vertices
+
+  // Add the faces of the cells [x_start, x_end) x [y_start, y_end) x
+  // [z_start, z_end) of a grid of size (D, H, W). vol_a holds the values
+  // of the grid points from (x0, y0, z0) on.
+  void MarchCells(
+      const at::TensorAccessor<float, 3>& vol_a,
+      const float isolevel,
+      const int W,
+      const int H,
+      const int D,
+      const int x_start,
+      const int x_end,
+      const int y_start,
+      const int y_end,
+      const int z_start,
+      const int z_end,
+      const int x0 = 0,
+      const int y0 = 0,
+      const int z0 = 0) {
+    // enumerate each cell in the 3d grid
+    for (int z = z_start; z < z_end; z++) {
+      for (int y = y_start; y < y_end; y++) {
+        for (int x = x_start; x < x_end; x++) {
+          Cube cube(x, y, z, vol_a, isolevel, x0, y0, z0);
+          // Cube is entirely in/out of the surface
+          if (_FACE_TABLE[cube.cubeindex][0] == 255) {
+            continue;
+          }
+          // store all boundary vertices that intersect with the edges
+          std::array<Vertex, 12> interp_points;
+          // triangle vertex IDs and positions
+          std::vector<int64_t> tri;
+          std::vector<Vertex> ps;
+
+          // Interpolate the vertices where the surface intersects with the
+          // cube
+          for (int j = 0; _FACE_TABLE[cube.cubeindex][j] != 255; j++) {
+            const int e = _FACE_TABLE[cube.cubeindex][j];
+            interp_points[e] = cube.VertexInterp(isolevel, e, vol_a);
+
+            int64_t edge = cube.HashVpair(e, W, H, D);
+            tri.push_back(edge);
+            ps.push_back(interp_points[e]);
+
+            // Check if the triangle face is degenerate. A triangle face
+            // is degenerate if any of the two verices share the same 3D
+            // position
+            if ((j + 1) % 3 == 0 && ps[0] != ps[1] && ps[1] != ps[2] &&
+                ps[2] != ps[0]) {
+              for (int k = 0; k < 3; k++) {
+                int64_t v = tri.at(k);
+                if (!uniq_edge_id.count(v)) {
+                  uniq_edge_id[v] = verts.size();
+                  verts.push_back(ps.at(k));
+                  ids.push_back(v);
+                }
+                faces.push_back(uniq_edge_id[v]);
+              }
+              tri.clear();
+              ps.clear();
+            } // endif
+          } // endfor edge enumeration
+        } // endfor x
+      } // endfor y
+    } // endfor z
+  }
+
+  // Collect returning tensor
+  std::tuple<at::Tensor, at::Tensor, at::Tensor> ToTensors() const {
+    const int64_t n_vertices = verts.size();
+    const int64_t n_faces = (int64_t)faces.size() / 3;
+    auto vert_tensor = torch::zeros({n_vertices, 3}, torch::kFloat);
+    auto id_tensor = torch::zeros({n_vertices}, torch::kInt64);
+    auto face_tensor = torch::zeros({n_faces, 3}, torch::kInt64);
+
+    auto vert_a = vert_tensor.accessor<float, 2>();
+    for (int64_t i = 0; i < n_vertices; i++) {
+      vert_a[i][0] = verts.at(i).x;
+      vert_a[i][1] = verts.at(i).y;
+      vert_a[i][2] = verts.at(i).z;
+    }
+
+    auto id_a = id_tensor.accessor<int64_t, 1>();
+    for (int64_t i = 0; i < n_vertices; i++) {
+      id_a[i] = ids.at(i);
+    }
+
+    auto face_a = face_tensor.accessor<int64_t, 2>();
+    for (int64_t i = 0; i < n_faces; i++) {
+      face_a[i][0] = faces.at(i * 3 + 0);
+      face_a[i][1] = faces.at(i * 3 + 1);
+      face_a[i][2] = faces.at(i * 3 + 2);
+    }
+
+    return std::make_tuple(vert_tensor, face_tensor, id_tensor);
+  }
+};
+
 // Cpu implementation for Marching Cubes
 // Args:
 //    vol: a Tensor of size (D, H, W) corresponding to a 3D scalar field
@@ -24,7 +133,8 @@
 // Returns:
 //    vertices: a float tensor of shape (N_verts, 3) for positions of the mesh
 //    faces: a long tensor of shape (N_faces, 3) for indices of the face
-//    ids: a long tensor of shape (N_verts) as placeholder
+//    ids: a long tensor of shape (N_verts) with the ids of the edges of the
+//          grid on which the vertices lie
 //
 std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubesCpu(
     const at::Tensor& vol,
@@ -36,76 +146,181 @@ std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubesCpu(
 
   // Create tensor accessors
   auto vol_a = vol.accessor<float, 3>();
-  // edge_id_to_v maps from an edge id to a vertex position
-  std::unordered_map<int64_t, Vertex> edge_id_to_v;
-  // uniq_edge_id: used to remove redundant edge ids
-  std::unordered_map<int64_t, int64_t> uniq_edge_id;
-  std::vector<int64_t> faces; // store face indices
-  std::vector<Vertex> verts; // store vertex positions
-  // enumerate each cell in the 3d grid
-  for (int z = 0; z < D - 1; z++) {
-    for (int y = 0; y < H - 1; y++) {
-      for (int x = 0; x < W - 1; x++) {
-        Cube cube(x, y, z, vol_a, isolevel);
-        // Cube is entirely in/out of the surface
-        if (_FACE_TABLE[cube.cubeindex][0] == 255) {
-          continue;
-        }
-        // store all boundary vertices that intersect with the edges
-        std::array<Vertex, 12> interp_points;
-        // triangle vertex IDs and positions
-        std::vector<int64_t> tri;
-        std::vector<Vertex> ps;
-
-        // Interpolate the vertices where the surface intersects with the cube
-        for (int j = 0; _FACE_TABLE[cube.cubeindex][j] != 255; j++) {
-          const int e = _FACE_TABLE[cube.cubeindex][j];
-          interp_points[e] = cube.VertexInterp(isolevel, e, vol_a);
-
-          int64_t edge = cube.HashVpair(e, W, H, D);
-          tri.push_back(edge);
-          ps.push_back(interp_points[e]);
-
-          // Check if the triangle face is degenerate. A triangle face
-          // is degenerate if any of the two verices share the same 3D position
-          if ((j + 1) % 3 == 0 && ps[0] != ps[1] && ps[1] != ps[2] &&
-              ps[2] != ps[0]) {
-            for (int k = 0; k < 3; k++) {
-              int64_t v = tri.at(k);
-              edge_id_to_v[v] = ps.at(k);
-              if (!uniq_edge_id.count(v)) {
-                uniq_edge_id[v] = verts.size();
-                verts.push_back(edge_id_to_v[v]);
-              }
-              faces.push_back(uniq_edge_id[v]);
-            }
-            tri.clear();
-            ps.clear();
-          } // endif
-        } // endfor edge enumeration
-      } // endfor x
-    } // endfor y
-  } // endfor z
-  // Collect returning tensor
-  const int n_vertices = verts.size();
-  const int64_t n_faces = (int64_t)faces.size() / 3;
-  auto vert_tensor = torch::zeros({n_vertices, 3}, torch::kFloat);
-  auto id_tensor = torch::zeros({n_vertices}, torch::kInt64); // placeholder
-  auto face_tensor = torch::zeros({n_faces, 3}, torch::kInt64);
-
-  auto vert_a = vert_tensor.accessor<float, 2>();
-  for (int i = 0; i < n_vertices; i++) {
-    vert_a[i][0] = verts.at(i).x;
-    vert_a[i][1] = verts.at(i).y;
-    vert_a[i][2] = verts.at(i).z;
-  }
+  MarchingCubesMesh mesh;
+  mesh.MarchCells(vol_a, isolevel, W, H, D, 0, W - 1, 0, H - 1, 0, D - 1);
+  return mesh.ToTensors();
+}
+
+// The z index of the plane of a grid of size (D, H, W) which contains the
+// edge with the given id, or -1 if the edge is along z.
+inline int64_t EdgePlaneZ(
+    const int64_t edge_id,
+    const int64_t W,
+    const int64_t H,
+    const int64_t D) {
+  // Inverts Cube::HashVpair
+  const int64_t n_ids = W + W * H + W * H * D;
+  const int64_t z1 = edge_id / n_ids / (W * H);
+  const int64_t z2 = edge_id % n_ids / (W * H);
+  return z1 == z2 ? z1 : -1;
+}
 
-  auto face_a = face_tensor.accessor<int64_t, 2>();
-  for (int64_t i = 0; i < n_faces; i++) {
-    face_a[i][0] = faces.at(i * 3 + 0);
-    face_a[i][1] = faces.at(i * 3 + 1);
-    face_a[i][2] = faces.at(i * 3 + 2);
+// Cpu implementation for Marching Cubes over a batch of volumes
+// Args:
+//    vols: a Tensor of size (N, D, H, W) corresponding to a batch of 3D
+//          scalar fields
+//    isolevels: a float Tensor of size (N,) with the isosurface value of
+//          each volume
+//
+// Returns:
+//    lists of N vertices, faces and ids tensors, which are the same as the
+//    outputs of MarchingCubesCpu for each volume
+//
+std::tuple<
+    std::vector<at::Tensor>,
+    std::vector<at::Tensor>,
+    std::vector<at::Tensor>>
+MarchingCubesBatchCpu(const at::Tensor& vols, const at::Tensor& isolevels) {
+  const int64_t N = vols.size(0);
+  const int D = vols.size(1);
+  const int H = vols.size(2);
+  const int W = vols.size(3);
+  if (N == 0) {
+    return std::make_tuple(
+        std::vector<at::Tensor>(),
+        std::vector<at::Tensor>(),
+        std::vector<at::Tensor>());
   }
 
-  return std::make_tuple(vert_tensor, face_tensor, id_tensor);
+  auto vols_a = vols.accessor<float, 4>();
+  auto isolevels_a = isolevels.accessor<float, 1>();
+
+  // Each volume is split into slabs of layers of cells along z, so that
+  // small batches also keep all the threads busy.
+  const int64_t n_layers = std::max(D - 1, 0);
+  const int64_t n_slabs = std::max<int64_t>(
+      1, std::min<int64_t>(n_layers, (at::get_num_threads() + N - 1) / N));
+  auto slab_z = [&](const int64_t s) { return s * n_layers / n_slabs; };
+  std::vector<MarchingCubesMesh> slabs(N * n_slabs);
+  at::parallel_for(0, N * n_slabs, 1, [&](int64_t start, int64_t end) {
+    for (int64_t ns = start; ns < end; ++ns) {
+      const int64_t n = ns / n_slabs;
+      const int64_t s = ns % n_slabs;
+      slabs[ns].MarchCells(
+          vols_a[n],
+          isolevels_a[n],
+          W,
+          H,
+          D,
+          0,
+          W - 1,
+          0,
+          H - 1,
+          slab_z(s),
+          slab_z(s + 1));
+    }
+  });
+
+  // Concatenate the slabs of each volume in order, which gives the same
+  // vertices and faces as marching the volume in one go. Only the vertices
+  // on the plane between two slabs can be shared by both.
+  std::vector<at::Tensor> verts(N);
+  std::vector<at::Tensor> faces(N);
+  std::vector<at::Tensor> ids(N);
+  at::parallel_for(0, N, 1, [&](int64_t start, int64_t end) {
+    for (int64_t n = start; n < end; ++n) {
+      MarchingCubesMesh mesh;
+      // maps the edge ids of the vertices on the first plane of the slab to
+      // the indices of the vertices
+      std::unordered_map<int64_t, int64_t> plane_edge_id;
+      for (int64_t s = 0; s < n_slabs; ++s) {
+        const MarchingCubesMesh& slab = slabs[n * n_slabs + s];
+        const int64_t z_start = slab_z(s);
+        const int64_t z_end = slab_z(s + 1);
+        std::unordered_map<int64_t, int64_t> next_plane_edge_id;
+        std::vector<int64_t> vert_idx(slab.verts.size());
+        for (size_t i = 0; i < slab.verts.size(); ++i) {
+          const int64_t edge_id = slab.ids[i];
+          const int64_t z = EdgePlaneZ(edge_id, W, H, D);
+          auto it = plane_edge_id.end();
+          if (z == z_start) {
+            it = plane_edge_id.find(edge_id);
+          }
+          if (it != plane_edge_id.end()) {
+            vert_idx[i] = it->second;
+            continue;
+          }
+          vert_idx[i] = mesh.verts.size();
+          mesh.verts.push_back(slab.verts[i]);
+          mesh.ids.push_back(edge_id);
+          if (z == z_end) {
+            next_plane_edge_id[edge_id] = vert_idx[i];
+          }
+        }
+        for (const int64_t v : slab.faces) {
+          mesh.faces.push_back(vert_idx[v]);
+        }
+        plane_edge_id = std::move(next_plane_edge_id);
+      }
+      std::tie(verts[n], faces[n], ids[n]) = mesh.ToTensors();
+    }
+  });
+  return std::make_tuple(verts, faces, ids);
+}
+
+// Cpu implementation for Marching Cubes over blocks of a grid
+// Args:
+//    blocks: a Tensor of size (B, S + 1, S + 1, S + 1) with the values of
+//          the grid points of B blocks of S x S x S cells of the grid
+//    block_origins: a long Tensor of size (B, 3) with the (z, y, x) index
+//          in the grid of the first grid point of each block
+//    D, H, W: the size of the whole grid
+//    isolevel: the isosurface value to use as the threshold to determine
+//          whether points are within a volume.
+//
+// Returns:
+//    the same as MarchingCubesCpu for the union of the cells of the blocks
+//    which are inside the grid
+//
+std::tuple<at::Tensor, at::Tensor, at::Tensor> MarchingCubesBlocksCpu(
+    const at::Tensor& blocks,
+    const at::Tensor& block_origins,
+    const int64_t D,
+    const int64_t H,
+    const int64_t W,
+    const float isolevel) {
+  const int64_t B = blocks.size(0);
+  const int S = blocks.size(1) - 1;
+  TORCH_CHECK(
+      blocks.size(2) == S + 1 && blocks.size(3) == S + 1,
+      "blocks must be of shape (B, S + 1, S + 1, S + 1)");
+  TORCH_CHECK(
+      block_origins.size(0) == B && block_origins.size(1) == 3,
+      "block_origins must be of shape (B, 3)");
+
+  auto blocks_a = blocks.accessor<float, 4>();
+  auto block_origins_a = block_origins.accessor<int64_t, 2>();
+  MarchingCubesMesh mesh;
+  for (int64_t b = 0; b < B; ++b) {
+    const int z0 = block_origins_a[b][0];
+    const int y0 = block_origins_a[b][1];
+    const int x0 = block_origins_a[b][2];
+    // Only the cells inside the grid are marched.
+    mesh.MarchCells(
+        blocks_a[b],
+        isolevel,
+        W,
+        H,
+        D,
+        x0,
+        std::min<int>(x0 + S, W - 1),
+        y0,
+        std::min<int>(y0 + S, H - 1),
+        z0,
+        std::min<int>(z0 + S, D - 1),
+        x0,
+        y0,
+        z0);
+  }
+  return mesh.ToTensors();
 }
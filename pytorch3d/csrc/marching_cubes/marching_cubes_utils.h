@@ -65,14 +65,20 @@ struct Cube {
 
   Vertex p[8];
   int x, y, z;
+  // The position in the grid of vol_a[0][0][0], when vol_a is a block of a
+  // larger grid.
+  int x0, y0, z0;
   int cubeindex = 0;
   Cube(
       int x,
       int y,
       int z,
       const at::TensorAccessor<float, 3>& vol_a,
-      const float isolevel)
-      : x(x), y(y), z(z) {
+      const float isolevel,
+      int x0 = 0,
+      int y0 = 0,
+      int z0 = 0)
+      : x(x), y(y), z(z), x0(x0), y0(y0), z0(z0) {
     // vertex position (x, y, z) for v0-v1-v4-v5-v3-v2-v7-v6
     for (int v = 0; v < 8; v++) {
       p[v] = Vertex(x + (v & 1), y + (v >> 1 & 1), z + (v >> 2 & 1));
@@ -80,13 +86,17 @@ struct Cube {
     // Calculates cube configuration index given values of the cube vertices
     for (int i = 0; i < 8; i++) {
       const int idx = _INDEX_TABLE[i];
-      Vertex v = p[idx];
-      if (vol_a[v.z][v.y][v.x] < isolevel) {
+      if (Value(p[idx], vol_a) < isolevel) {
         cubeindex |= (1 << i);
       }
     }
   }
 
+  // The value of the scalar field at a vertex of the grid
+  float Value(const Vertex& v, const at::TensorAccessor<float, 3>& vol_a) {
+    return vol_a[int(v.z) - z0][int(v.y) - y0][int(v.x) - x0];
+  }
+
   // Linearly interpolate the position where an isosurface cuts an edge
   // between two vertices, based on their scalar values
   //
@@ -106,8 +116,8 @@ struct Cube {
     const int v2 = _EDGE_TO_VERTICES[edge][1];
     Vertex p1 = p[v1];
     Vertex p2 = p[v2];
-    float val1 = vol_a[p1.z][p1.y][p1.x];
-    float val2 = vol_a[p2.z][p2.y][p2.x];
+    float val1 = Value(p1, vol_a);
+    float val2 = Value(p2, vol_a);
 
     float ratio = 1.0f;
     if (std::abs(isolevel - val1) < EPS) {
@@ -138,8 +148,12 @@ struct Cube {
   int64_t HashVpair(const int edge, int W, int H, int D) {
     const int v1 = _EDGE_TO_VERTICES[edge][0];
     const int v2 = _EDGE_TO_VERTICES[edge][1];
-    const int v1_id = p[v1].x + p[v1].y * W + p[v1].z * W * H;
-    const int v2_id = p[v2].x + p[v2].y * W + p[v2].z * W * H;
-    return (int64_t)v1_id * (W + W * H + W * H * D) + (int64_t)v2_id;
+    // The ids are computed with integers, as floats cannot represent all
+    // the ids of large grids.
+    const int64_t v1_id =
+        int64_t(p[v1].x) + int64_t(p[v1].y) * W + int64_t(p[v1].z) * W * H;
+    const int64_t v2_id =
+        int64_t(p[v2].x) + int64_t(p[v2].y) * W + int64_t(p[v2].z) * W * H;
+    return v1_id * (W + int64_t(W) * H + int64_t(W) * H * D) + v2_id;
   }
 };
@@ -6,9 +6,14 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
+#include <algorithm>
 #include <array>
 #include <limits>
+#include <numeric>
+#include <utility>
+#include <vector>
 #include "utils/geometry_utils.h"
 #include "utils/vec3.h"
 
@@ -149,6 +154,214 @@ void ValidateShape(const at::Tensor& as) {
   }
 }
 
+// ----------- A bounding volume hierarchy (BVH) of the hulls of one element
+//             of the batch, to find the nearest hull to another hull without
+//             computing the distances to all of them. ----------- //
+
+// The maximum number of hulls in a leaf of the BVH.
+const int64_t kBvhLeafSize = 4;
+
+// Subtrees are only skipped if the distance to their bounding box exceeds
+// the best distance found so far by this fraction of the squared size of
+// the scene, so that rounding errors in the distances to the hulls cannot
+// make the search miss the nearest hull.
+const float kBvhTolerance = 1e-5f;
+
+struct AxisAlignedBox {
+  std::array<float, 3> lo;
+  std::array<float, 3> hi;
+};
+
+template <size_t H>
+AxisAlignedBox HullBox(const std::array<vec3<float>, H>& hull) {
+  AxisAlignedBox box{
+      {hull[0].x, hull[0].y, hull[0].z}, {hull[0].x, hull[0].y, hull[0].z}};
+  for (size_t h = 1; h < H; ++h) {
+    const std::array<float, 3> point = {hull[h].x, hull[h].y, hull[h].z};
+    for (int d = 0; d < 3; ++d) {
+      box.lo[d] = std::min(box.lo[d], point[d]);
+      box.hi[d] = std::max(box.hi[d], point[d]);
+    }
+  }
+  return box;
+}
+
+AxisAlignedBox UnionBox(const AxisAlignedBox& a, const AxisAlignedBox& b) {
+  AxisAlignedBox box;
+  for (int d = 0; d < 3; ++d) {
+    box.lo[d] = std::min(a.lo[d], b.lo[d]);
+    box.hi[d] = std::max(a.hi[d], b.hi[d]);
+  }
+  return box;
+}
+
+// Squared distance between two boxes, which is a lower bound of the squared
+// distance between anything inside them.
+float BoxBoxDistance(const AxisAlignedBox& a, const AxisAlignedBox& b) {
+  float dist = 0;
+  for (int d = 0; d < 3; ++d) {
+    const float gap = std::max({a.lo[d] - b.hi[d], b.lo[d] - a.hi[d], 0.0f});
+    dist += gap * gap;
+  }
+  return dist;
+}
+
+float BoxDiagonal2(const AxisAlignedBox& box) {
+  float diag2 = 0;
+  for (int d = 0; d < 3; ++d) {
+    diag2 += (box.hi[d] - box.lo[d]) * (box.hi[d] - box.lo[d]);
+  }
+  return diag2;
+}
+
+struct BvhNode {
+  AxisAlignedBox box;
+  // The range of Bvh::order with the hulls of a leaf, or the indices of the
+  // children of an inner node in Bvh::nodes.
+  int64_t first;
+  int64_t second;
+  bool is_leaf;
+};
+
+struct Bvh {
+  // The root is the first node.
+  std::vector<BvhNode> nodes;
+  // The indices of the hulls, such that each leaf has a contiguous range.
+  std::vector<int64_t> order;
+};
+
+// Split the hulls order[start:end] recursively at the median of their
+// centers along the longest side of the box of the centers, and add the
+// resulting nodes to bvh. Returns the index of the root of the subtree.
+int64_t BuildBvhNode(
+    Bvh& bvh,
+    const std::vector<AxisAlignedBox>& boxes,
+    const int64_t offset,
+    const int64_t start,
+    const int64_t end) {
+  const int64_t node_idx = bvh.nodes.size();
+  bvh.nodes.emplace_back();
+  AxisAlignedBox box = boxes[bvh.order[start] - offset];
+  for (int64_t i = start + 1; i < end; ++i) {
+    box = UnionBox(box, boxes[bvh.order[i] - offset]);
+  }
+  bvh.nodes[node_idx].box = box;
+  if (end - start <= kBvhLeafSize) {
+    bvh.nodes[node_idx].first = start;
+    bvh.nodes[node_idx].second = end;
+    bvh.nodes[node_idx].is_leaf = true;
+    return node_idx;
+  }
+
+  auto center = [&](const int64_t b_n, const int d) {
+    const AxisAlignedBox& b = boxes[b_n - offset];
+    return b.lo[d] + b.hi[d];
+  };
+  std::array<float, 3> lo, hi;
+  for (int d = 0; d < 3; ++d) {
+    lo[d] = hi[d] = center(bvh.order[start], d);
+  }
+  for (int64_t i = start + 1; i < end; ++i) {
+    for (int d = 0; d < 3; ++d) {
+      lo[d] = std::min(lo[d], center(bvh.order[i], d));
+      hi[d] = std::max(hi[d], center(bvh.order[i], d));
+    }
+  }
+  int axis = 0;
+  for (int d = 1; d < 3; ++d) {
+    if (hi[d] - lo[d] > hi[axis] - lo[axis]) {
+      axis = d;
+    }
+  }
+  const int64_t mid = start + (end - start) / 2;
+  std::nth_element(
+      bvh.order.begin() + start,
+      bvh.order.begin() + mid,
+      bvh.order.begin() + end,
+      [&](const int64_t a, const int64_t b) {
+        const float center_a = center(a, axis);
+        const float center_b = center(b, axis);
+        return center_a < center_b || (center_a == center_b && a < b);
+      });
+  const int64_t left = BuildBvhNode(bvh, boxes, offset, start, mid);
+  const int64_t right = BuildBvhNode(bvh, boxes, offset, mid, end);
+  bvh.nodes[node_idx].first = left;
+  bvh.nodes[node_idx].second = right;
+  bvh.nodes[node_idx].is_leaf = false;
+  return node_idx;
+}
+
+// Build a BVH of the hulls bs[start:end].
+template <int H, typename Accessor>
+Bvh BuildBvh(const Accessor& bs_a, const int64_t start, const int64_t end) {
+  Bvh bvh;
+  if (start == end) {
+    return bvh;
+  }
+  std::vector<AxisAlignedBox> boxes;
+  boxes.reserve(end - start);
+  for (int64_t b_n = start; b_n < end; ++b_n) {
+    boxes.push_back(HullBox(ExtractHull<H>(bs_a[b_n])));
+  }
+  bvh.order.resize(end - start);
+  std::iota(bvh.order.begin(), bvh.order.end(), start);
+  bvh.nodes.reserve(2 * (end - start) / kBvhLeafSize + 1);
+  BuildBvhNode(bvh, boxes, start, 0, end - start);
+  return bvh;
+}
+
+// Find the nearest hull in the BVH to the hull a. Among hulls at the same
+// distance, the one with the largest index is chosen, as when computing the
+// distances to all the hulls in order. stack is storage reused between calls.
+template <int H1, int H2, typename Accessor>
+void BvhNearestHull(
+    const std::array<vec3<float>, H1>& a,
+    const Bvh& bvh,
+    const Accessor& bs_a,
+    const double min_triangle_area,
+    std::vector<std::pair<float, int64_t>>& stack,
+    float& min_dist,
+    int64_t& min_idx) {
+  if (bvh.nodes.empty()) {
+    return;
+  }
+  const AxisAlignedBox a_box = HullBox(a);
+  const float tolerance =
+      kBvhTolerance * BoxDiagonal2(UnionBox(a_box, bvh.nodes[0].box));
+  stack.clear();
+  stack.emplace_back(0.0f, 0);
+  while (!stack.empty()) {
+    const float lower_bound = stack.back().first;
+    const BvhNode& node = bvh.nodes[stack.back().second];
+    stack.pop_back();
+    if (lower_bound > min_dist + tolerance) {
+      continue;
+    }
+    if (node.is_leaf) {
+      for (int64_t i = node.first; i < node.second; ++i) {
+        const int64_t b_n = bvh.order[i];
+        const float dist =
+            HullDistance(a, ExtractHull<H2>(bs_a[b_n]), min_triangle_area);
+        if (dist < min_dist || (dist == min_dist && b_n > min_idx)) {
+          min_dist = dist;
+          min_idx = b_n;
+        }
+      }
+      continue;
+    }
+    // Visit the nearer child first.
+    const float dist_first = BoxBoxDistance(a_box, bvh.nodes[node.first].box);
+    const float dist_second = BoxBoxDistance(a_box, bvh.nodes[node.second].box);
+    if (dist_first < dist_second) {
+      stack.emplace_back(dist_second, node.second);
+      stack.emplace_back(dist_first, node.first);
+    } else {
+      stack.emplace_back(dist_first, node.first);
+      stack.emplace_back(dist_second, node.second);
+    }
+  }
+}
+
 // ----------- Here begins the implementation of each top-level
 //             function using non-type template parameters to
 //             implement all the cases in one go. ----------- //
@@ -180,34 +393,32 @@ std::tuple<at::Tensor, at::Tensor> HullHullDistanceForwardCpu(
   auto bs_first_idx_a = bs_first_idx.accessor<int64_t, 1>();
   auto dists_a = dists.accessor<float, 1>();
   auto idxs_a = idxs.accessor<int64_t, 1>();
-  int64_t a_batch_end = 0;
-  int64_t b_batch_start = 0, b_batch_end = 0;
-  int64_t batch_idx = 0;
-  for (int64_t a_n = 0; a_n < A_N; ++a_n) {
-    if (a_n == a_batch_end) {
-      ++batch_idx;
-      b_batch_start = b_batch_end;
-      if (batch_idx == BATCHES) {
-        a_batch_end = std::numeric_limits<int64_t>::max();
-        b_batch_end = B_N;
-      } else {
-        a_batch_end = as_first_idx_a[batch_idx];
-        b_batch_end = bs_first_idx_a[batch_idx];
-      }
-    }
-    float min_dist = std::numeric_limits<float>::max();
-    size_t min_idx = 0;
-    auto a = ExtractHull<H1>(as_a[a_n]);
-    for (int64_t b_n = b_batch_start; b_n < b_batch_end; ++b_n) {
-      float dist =
-          HullDistance(a, ExtractHull<H2>(bs_a[b_n]), min_triangle_area);
-      if (dist <= min_dist) {
-        min_dist = dist;
-        min_idx = b_n;
-      }
+  for (int64_t batch_idx = 0; batch_idx < BATCHES; ++batch_idx) {
+    const int64_t a_batch_start =
+        batch_idx == 0 ? 0 : as_first_idx_a[batch_idx];
+    const int64_t a_batch_end =
+        batch_idx + 1 == BATCHES ? A_N : as_first_idx_a[batch_idx + 1];
+    const int64_t b_batch_start =
+        batch_idx == 0 ? 0 : bs_first_idx_a[batch_idx];
+    const int64_t b_batch_end =
+        batch_idx + 1 == BATCHES ? B_N : bs_first_idx_a[batch_idx + 1];
+    if (a_batch_start >= a_batch_end) {
+      continue;
     }
-    dists_a[a_n] = min_dist;
-    idxs_a[a_n] = min_idx;
+    const Bvh bvh = BuildBvh<H2>(bs_a, b_batch_start, b_batch_end);
+    at::parallel_for(
+        a_batch_start, a_batch_end, 64, [&](int64_t start, int64_t end) {
+          std::vector<std::pair<float, int64_t>> stack;
+          for (int64_t a_n = start; a_n < end; ++a_n) {
+            float min_dist = std::numeric_limits<float>::max();
+            int64_t min_idx = 0;
+            auto a = ExtractHull<H1>(as_a[a_n]);
+            BvhNearestHull<H1, H2>(
+                a, bvh, bs_a, min_triangle_area, stack, min_dist, min_idx);
+            dists_a[a_n] = min_dist;
+            idxs_a[a_n] = min_idx;
+          }
+        });
   }
 
   return std::make_tuple(dists, idxs);
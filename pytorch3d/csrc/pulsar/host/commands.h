@@ -17,6 +17,11 @@
 // Definitions for CPU commands.
 // #include <execution>
 // #include <numeric>
+#include <ATen/Parallel.h>
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <cstring>
 
 namespace cg {
 struct coalesced_group {
@@ -134,11 +139,26 @@ INLINE float atomicMin(float* address, float val) {
 //
 // uint.
 #define CLZ(VAL) _clz(VAL)
+// The kernels run on several threads (see GET_PARALLEL_IDX_1D and
+// GET_PARALLEL_IDS_2D), so additions to global memory must be atomic.
 template <typename T>
 INLINE T ATOMICADD(T* address, T val) {
-  T old = *address;
-  *address += val;
-  return old;
+  return reinterpret_cast<std::atomic<T>*>(address)->fetch_add(val);
+}
+INLINE float ATOMICADD(float* address, float val) {
+  // There is no atomic addition of floats before C++20, so compare and swap
+  // their bits.
+  std::atomic<uint32_t>* address_bits =
+      reinterpret_cast<std::atomic<uint32_t>*>(address);
+  uint32_t old_bits = address_bits->load();
+  float old_val, new_val;
+  uint32_t new_bits;
+  do {
+    std::memcpy(&old_val, &old_bits, sizeof(float));
+    new_val = old_val + val;
+    std::memcpy(&new_bits, &new_val, sizeof(float));
+  } while (!address_bits->compare_exchange_weak(old_bits, new_bits));
+  return old_val;
 }
 template <typename T>
 INLINE void ATOMICADD_F3(T* address, T val) {
@@ -146,7 +166,14 @@ INLINE void ATOMICADD_F3(T* address, T val) {
   ATOMICADD(&(address->y), val.y);
   ATOMICADD(&(address->z), val.z);
 }
-#define ATOMICADD_B(a, b) ATOMICADD((a), (b))
+// Block-level additions are to SHARED variables, which are local to the
+// thread on the host.
+template <typename T>
+INLINE T ATOMICADD_B(T* address, T val) {
+  T old = *address;
+  *address += val;
+  return old;
+}
 #define POPC(a) __builtin_popcount(a)
 
 // int.
@@ -343,30 +370,80 @@ void MAX_WS(
 //
 //
 //
-#define GET_PARALLEL_IDX_1D(VARNAME, N) \
-  for (uint VARNAME = 0; VARNAME < (N); ++VARNAME) {
-#define GET_PARALLEL_IDS_2D(VAR_X, VAR_Y, WIDTH, HEIGHT)          \
-  int2 blockDim;                                                  \
-  blockDim.x = 1;                                                 \
-  blockDim.y = 1;                                                 \
-  uint __parallel_2d_width = WIDTH;                               \
-  uint __parallel_2d_height = HEIGHT;                             \
-  for (uint VAR_Y = 0; VAR_Y < __parallel_2d_height; ++(VAR_Y)) { \
-    for (uint VAR_X = 0; VAR_X < __parallel_2d_width; ++(VAR_X)) {
+namespace pulsar {
+/** Number of elements processed by a task of a 1D kernel. */
+constexpr int64_t PARALLEL_1D_GRAIN_SIZE = 256;
+/** Side of the square tiles into which 2D kernels cut the image. */
+constexpr uint PARALLEL_2D_TILE_SIZE = 16;
+
+/**
+ * Call body(x, y) for all pixels of a width x height area, on the threads of
+ * the ATen thread pool.
+ *
+ * The area is cut into tiles, which each thread takes one after the other
+ * from a shared counter until none is left. This balances the load between
+ * the threads, even though the cost of the pixels varies a lot with the
+ * number of spheres they see.
+ */
+template <typename Body>
+void parallel_for_tiles(const uint width, const uint height, const Body& body) {
+  const uint n_tiles_x =
+      (width + PARALLEL_2D_TILE_SIZE - 1) / PARALLEL_2D_TILE_SIZE;
+  const uint n_tiles_y =
+      (height + PARALLEL_2D_TILE_SIZE - 1) / PARALLEL_2D_TILE_SIZE;
+  const int64_t n_tiles = static_cast<int64_t>(n_tiles_x) * n_tiles_y;
+  std::atomic<int64_t> next_tile(0);
+  const int64_t n_workers = std::min<int64_t>(at::get_num_threads(), n_tiles);
+  at::parallel_for(0, n_workers, 1, [&](int64_t /*start*/, int64_t /*end*/) {
+    for (int64_t tile = next_tile++; tile < n_tiles; tile = next_tile++) {
+      const uint x_start = (tile % n_tiles_x) * PARALLEL_2D_TILE_SIZE;
+      const uint y_start = (tile / n_tiles_x) * PARALLEL_2D_TILE_SIZE;
+      const uint x_end = std::min(x_start + PARALLEL_2D_TILE_SIZE, width);
+      const uint y_end = std::min(y_start + PARALLEL_2D_TILE_SIZE, height);
+      for (uint y = y_start; y < y_end; ++y) {
+        for (uint x = x_start; x < x_end; ++x) {
+          body(x, y);
+        }
+      }
+    }
+  });
+}
+} // namespace pulsar
 //
+// The body of a kernel becomes a lambda which is called for each index.
+// Returning from it ends the work for this index, as for a CUDA thread.
+#define GET_PARALLEL_IDX_1D(VARNAME, N)                             \
+  at::parallel_for(                                                 \
+      0,                                                            \
+      static_cast<int64_t>(N),                                      \
+      pulsar::PARALLEL_1D_GRAIN_SIZE,                               \
+      [&](int64_t __parallel_1d_start, int64_t __parallel_1d_end) { \
+        for (int64_t __parallel_1d_idx = __parallel_1d_start;       \
+             __parallel_1d_idx < __parallel_1d_end;                 \
+             ++__parallel_1d_idx) {                                 \
+          [&](const uint VARNAME) {
+#define GET_PARALLEL_IDS_2D(VAR_X, VAR_Y, WIDTH, HEIGHT) \
+  int2 blockDim;                                         \
+  blockDim.x = 1;                                        \
+  blockDim.y = 1;                                        \
+  pulsar::parallel_for_tiles(                            \
+      WIDTH, HEIGHT, [&](const uint VAR_X, const uint VAR_Y) {
 //
 //
-#define END_PARALLEL() \
-  end_parallel :;      \
-  }
-#define END_PARALLEL_NORET() }
+//
+#define END_PARALLEL()                     \
+  end_parallel :;                          \
+  }(static_cast<uint>(__parallel_1d_idx)); \
+  }                                        \
+  });
+#define END_PARALLEL_NORET()               \
+  }(static_cast<uint>(__parallel_1d_idx)); \
+  }                                        \
+  });
 #define END_PARALLEL_2D() \
   end_parallel :;         \
-  }                       \
-  }
-#define END_PARALLEL_2D_NORET() \
-  }                             \
-  }
+  });
+#define END_PARALLEL_2D_NORET() });
 #define RETURN_PARALLEL() goto end_parallel;
 #define CHECKLAUNCH()
 #define ISONDEVICE false
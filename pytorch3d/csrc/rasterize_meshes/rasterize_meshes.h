@@ -88,6 +88,13 @@ RasterizeMeshesNaiveCuda(
 //                    direction. NOTE: This will only work if the mesh faces are
 //                    consistently defined with counter-clockwise ordering when
 //                    viewed from the outside.
+//    occlusion_culling: Bool, whether to sort the faces of each bin front to
+//                       back and stop looking at the faces for a pixel once
+//                       they are all behind the nearest face found. This does
+//                       not change the output. It is only used by
+//                       coarse-to-fine rasterization on the CPU, when
+//                       faces_per_pixel is 1, blur_radius is 0 and no faces
+//                       have been clipped.
 //
 // Returns:
 //    A 4 element tuple of:
@@ -427,6 +434,32 @@ RasterizeMeshesFine(
   }
 }
 
+// ****************************************************************************
+// *                     COARSE-TO-FINE CPU RASTERIZATION                     *
+// ****************************************************************************
+
+// Coarse-to-fine rasterization on the CPU. The faces which may hit each bin
+// of bin_size x bin_size pixels are found first, and then the pixels of each
+// bin only look at those faces. The bins are processed in parallel. The
+// number of faces in each bin is not limited, so there is no
+// max_faces_per_bin. The output is identical to RasterizeMeshesNaiveCpu.
+//
+// Args and Returns: As for RasterizeMeshes.
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor>
+RasterizeMeshesBinnedCpu(
+    const torch::Tensor& face_verts,
+    const torch::Tensor& mesh_to_face_first_idx,
+    const torch::Tensor& num_faces_per_mesh,
+    const torch::Tensor& clipped_faces_neighbor_idx,
+    const std::tuple<int, int> image_size,
+    const float blur_radius,
+    const int faces_per_pixel,
+    const int bin_size,
+    const bool perspective_correct,
+    const bool clip_barycentric_coords,
+    const bool cull_backfaces,
+    const bool occlusion_culling);
+
 // ****************************************************************************
 // *                         MAIN ENTRY POINT                                 *
 // ****************************************************************************
@@ -460,7 +493,9 @@ RasterizeMeshesFine(
 //    bin_size: Bin size (in pixels) for coarse-to-fine rasterization. Setting
 //              bin_size=0 uses naive rasterization instead.
 //    max_faces_per_bin: The maximum number of faces allowed to fall into each
-//                      bin when using coarse-to-fine rasterization.
+//                      bin when using coarse-to-fine rasterization. It is
+//                      ignored on the CPU, where bins can hold any number of
+//                      faces.
 //    perspective_correct: Whether to apply perspective correction when
 //                         computing barycentric coordinates. If this is True,
 //                         then this function returns world-space barycentric
@@ -480,6 +515,13 @@ RasterizeMeshesFine(
 //                    direction. NOTE: This will only work if the mesh faces are
 //                    consistently defined with counter-clockwise ordering when
 //                    viewed from the outside.
+//    occlusion_culling: Bool, whether to sort the faces of each bin front to
+//                       back and stop looking at the faces for a pixel once
+//                       they are all behind the nearest face found. This does
+//                       not change the output. It is only used by
+//                       coarse-to-fine rasterization on the CPU, when
+//                       faces_per_pixel is 1, blur_radius is 0 and no faces
+//                       have been clipped.
 //
 // Returns:
 //    A 4 element tuple of:
@@ -510,8 +552,24 @@ RasterizeMeshes(
     const int max_faces_per_bin,
     const bool perspective_correct,
     const bool clip_barycentric_coords,
-    const bool cull_backfaces) {
-  if (bin_size > 0 && max_faces_per_bin > 0) {
+    const bool cull_backfaces,
+    const bool occlusion_culling) {
+  if (bin_size > 0 && !face_verts.is_cuda()) {
+    // Use coarse-to-fine rasterization with bins of any size
+    return RasterizeMeshesBinnedCpu(
+        face_verts,
+        mesh_to_face_first_idx,
+        num_faces_per_mesh,
+        clipped_faces_neighbor_idx,
+        image_size,
+        blur_radius,
+        faces_per_pixel,
+        bin_size,
+        perspective_correct,
+        clip_barycentric_coords,
+        cull_backfaces,
+        occlusion_culling);
+  } else if (bin_size > 0 && max_faces_per_bin > 0) {
     // Use coarse-to-fine rasterization
     at::Tensor bin_faces = RasterizeMeshesCoarse(
         face_verts,
@@ -6,12 +6,14 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 #include <algorithm>
 #include <list>
 #include <queue>
 #include <thread>
 #include <tuple>
+#include <vector>
 #include "ATen/core/TensorAccessor.h"
 #include "rasterize_points/rasterization_utils.h"
 #include "utils/geometry_utils.h"
@@ -119,6 +121,133 @@ struct IsNeighbor {
   int neighbor_idx;
 };
 
+// Check if the pixel at (xf, yf) in NDC is inside face f, or within the blur
+// radius of it. If so, add the face to the deque q of the closest faces, which
+// is kept sorted by z and holds at most K faces.
+void CheckPixelInsideFaceCpu(
+    const int f,
+    const float xf,
+    const float yf,
+    const float blur_radius,
+    const bool perspective_correct,
+    const bool clip_barycentric_coords,
+    const bool cull_backfaces,
+    const int K,
+    const at::TensorAccessor<float, 3>& face_verts_a,
+    const at::TensorAccessor<float, 1>& face_areas_a,
+    const at::TensorAccessor<float, 2>& face_bboxes_a,
+    const at::TensorAccessor<int64_t, 1>& neighbor_idx_a,
+    std::deque<std::tuple<float, int, float, float, float, float>>& q) {
+  // Get coordinates of three face vertices.
+  const auto& face = face_verts_a[f];
+  float x0, x1, x2, y0, y1, y2, z0, z1, z2;
+  std::tie(x0, y0, z0) = ExtractVerts(face, 0);
+  std::tie(x1, y1, z1) = ExtractVerts(face, 1);
+  std::tie(x2, y2, z2) = ExtractVerts(face, 2);
+
+  const vec2<float> v0(x0, y0);
+  const vec2<float> v1(x1, y1);
+  const vec2<float> v2(x2, y2);
+
+  const float face_area = face_areas_a[f];
+  const bool back_face = face_area < 0.0;
+  // Check if the face is visible to the camera.
+  if (cull_backfaces && back_face) {
+    return;
+  }
+  // Skip faces with zero area.
+  if (face_area <= kEpsilon && face_area >= -1.0f * kEpsilon) {
+    return;
+  }
+
+  // Skip if point is outside the face bounding box.
+  const auto face_bbox = face_bboxes_a[f];
+  const bool outside_bbox =
+      CheckPointOutsideBoundingBox(face_bbox, std::sqrt(blur_radius), xf, yf);
+  if (outside_bbox) {
+    return;
+  }
+
+  // Compute barycentric coordinates and use this to get the
+  // depth of the point on the triangle.
+  const vec2<float> pxy(xf, yf);
+  const vec3<float> bary0 = BarycentricCoordinatesForward(pxy, v0, v1, v2);
+  const vec3<float> bary = !perspective_correct
+      ? bary0
+      : BarycentricPerspectiveCorrectionForward(bary0, z0, z1, z2);
+
+  const vec3<float> bary_clip =
+      !clip_barycentric_coords ? bary : BarycentricClipForward(bary);
+
+  // Use barycentric coordinates to get the depth of the current pixel
+  const float pz = (bary_clip.x * z0 + bary_clip.y * z1 + bary_clip.z * z2);
+
+  if (pz < 0) {
+    return; // Point is behind the image plane so ignore.
+  }
+
+  // Compute squared distance of the point to the triangle.
+  const float dist = PointTriangleDistanceForward(pxy, v0, v1, v2);
+
+  // Use the bary coordinates to determine if the point is
+  // inside the face.
+  const bool inside = bary.x > 0.0f && bary.y > 0.0f && bary.z > 0.0f;
+
+  // If the point is inside the triangle then signed_dist
+  // is negative.
+  const float signed_dist = inside ? -dist : dist;
+
+  // Check if pixel is outside blur region
+  if (!inside && dist >= blur_radius) {
+    return;
+  }
+
+  // Handle the case where a face (f) partially behind the image plane
+  // is clipped to a quadrilateral and then split into two faces (t1,
+  // t2). In this case we:
+  // 1. Find the index of the neighbor (e.g. for t1 need index of t2)
+  // 2. Check if the neighbor (t2) is already in the top K faces
+  // 3. If yes, compare the distance of the pixel to t1 with the
+  // distance to t2.
+  // 4. If dist_t1 < dist_t2, overwrite the values for t2 in the top K
+  // faces.
+  const int neighbor_idx = neighbor_idx_a[f];
+  int idx_top_k = -1;
+
+  // Check if neighboring face is already in the top K.
+  if (neighbor_idx != -1) {
+    const auto it = std::find_if(q.begin(), q.end(), IsNeighbor(neighbor_idx));
+    // Get the index of the element from the iterator
+    idx_top_k = (it != q.end()) ? it - q.begin() : idx_top_k;
+  }
+
+  // If idx_top_k idx is not -1 then it is in the top K struct.
+  if (idx_top_k != -1) {
+    // If dist of current face is less than neighbor, overwrite
+    // the neighbor face values in the top K struct.
+    const auto neighbor = q[idx_top_k];
+    const float dist_neighbor = std::abs(std::get<2>(neighbor));
+    if (dist < dist_neighbor) {
+      // Overwrite the neighbor face values.
+      q[idx_top_k] = std::make_tuple(
+          pz, f, signed_dist, bary_clip.x, bary_clip.y, bary_clip.z);
+    }
+  } else {
+    // Handle as a normal face.
+    // The current pixel lies inside the current face.
+    // Add at the end of the deque.
+    q.emplace_back(pz, f, signed_dist, bary_clip.x, bary_clip.y, bary_clip.z);
+  }
+
+  // Sort the deque inplace based on the z distance
+  // to mimic using a priority queue.
+  std::sort(q.begin(), q.end());
+  if (static_cast<int>(q.size()) > K) {
+    // remove the last value
+    q.pop_back();
+  }
+}
+
 namespace {
 void RasterizeMeshesNaiveCpu_worker(
     const int start_yi,
@@ -172,118 +301,20 @@ void RasterizeMeshesNaiveCpu_worker(
 
         // Loop through the faces in the mesh.
         for (int f = face_start_idx; f < face_stop_idx; ++f) {
-          // Get coordinates of three face vertices.
-          const auto& face = face_verts_a[f];
-          float x0, x1, x2, y0, y1, y2, z0, z1, z2;
-          std::tie(x0, y0, z0) = ExtractVerts(face, 0);
-          std::tie(x1, y1, z1) = ExtractVerts(face, 1);
-          std::tie(x2, y2, z2) = ExtractVerts(face, 2);
-
-          const vec2<float> v0(x0, y0);
-          const vec2<float> v1(x1, y1);
-          const vec2<float> v2(x2, y2);
-
-          const float face_area = face_areas_a[f];
-          const bool back_face = face_area < 0.0;
-          // Check if the face is visible to the camera.
-          if (cull_backfaces && back_face) {
-            continue;
-          }
-          // Skip faces with zero area.
-          if (face_area <= kEpsilon && face_area >= -1.0f * kEpsilon) {
-            continue;
-          }
-
-          // Skip if point is outside the face bounding box.
-          const auto face_bbox = face_bboxes_a[f];
-          const bool outside_bbox = CheckPointOutsideBoundingBox(
-              face_bbox, std::sqrt(blur_radius), xf, yf);
-          if (outside_bbox) {
-            continue;
-          }
-
-          // Compute barycentric coordinates and use this to get the
-          // depth of the point on the triangle.
-          const vec2<float> pxy(xf, yf);
-          const vec3<float> bary0 =
-              BarycentricCoordinatesForward(pxy, v0, v1, v2);
-          const vec3<float> bary = !perspective_correct
-              ? bary0
-              : BarycentricPerspectiveCorrectionForward(bary0, z0, z1, z2);
-
-          const vec3<float> bary_clip =
-              !clip_barycentric_coords ? bary : BarycentricClipForward(bary);
-
-          // Use barycentric coordinates to get the depth of the current pixel
-          const float pz =
-              (bary_clip.x * z0 + bary_clip.y * z1 + bary_clip.z * z2);
-
-          if (pz < 0) {
-            continue; // Point is behind the image plane so ignore.
-          }
-
-          // Compute squared distance of the point to the triangle.
-          const float dist = PointTriangleDistanceForward(pxy, v0, v1, v2);
-
-          // Use the bary coordinates to determine if the point is
-          // inside the face.
-          const bool inside = bary.x > 0.0f && bary.y > 0.0f && bary.z > 0.0f;
-
-          // If the point is inside the triangle then signed_dist
-          // is negative.
-          const float signed_dist = inside ? -dist : dist;
-
-          // Check if pixel is outside blur region
-          if (!inside && dist >= blur_radius) {
-            continue;
-          }
-
-          // Handle the case where a face (f) partially behind the image plane
-          // is clipped to a quadrilateral and then split into two faces (t1,
-          // t2). In this case we:
-          // 1. Find the index of the neighbor (e.g. for t1 need index of t2)
-          // 2. Check if the neighbor (t2) is already in the top K faces
-          // 3. If yes, compare the distance of the pixel to t1 with the
-          // distance to t2.
-          // 4. If dist_t1 < dist_t2, overwrite the values for t2 in the top K
-          // faces.
-          const int neighbor_idx = neighbor_idx_a[f];
-          int idx_top_k = -1;
-
-          // Check if neighboring face is already in the top K.
-          if (neighbor_idx != -1) {
-            const auto it =
-                std::find_if(q.begin(), q.end(), IsNeighbor(neighbor_idx));
-            // Get the index of the element from the iterator
-            idx_top_k = (it != q.end()) ? it - q.begin() : idx_top_k;
-          }
-
-          // If idx_top_k idx is not -1 then it is in the top K struct.
-          if (idx_top_k != -1) {
-            // If dist of current face is less than neighbor, overwrite
-            // the neighbor face values in the top K struct.
-            const auto neighbor = q[idx_top_k];
-            const float dist_neighbor = std::abs(std::get<2>(neighbor));
-            if (dist < dist_neighbor) {
-              // Overwrite the neighbor face values.
-              q[idx_top_k] = std::make_tuple(
-                  pz, f, signed_dist, bary_clip.x, bary_clip.y, bary_clip.z);
-            }
-          } else {
-            // Handle as a normal face.
-            // The current pixel lies inside the current face.
-            // Add at the end of the deque.
-            q.emplace_back(
-                pz, f, signed_dist, bary_clip.x, bary_clip.y, bary_clip.z);
-          }
-
-          // Sort the deque inplace based on the z distance
-          // to mimic using a priority queue.
-          std::sort(q.begin(), q.end());
-          if (static_cast<int>(q.size()) > K) {
-            // remove the last value
-            q.pop_back();
-          }
+          CheckPixelInsideFaceCpu(
+              f,
+              xf,
+              yf,
+              blur_radius,
+              perspective_correct,
+              clip_barycentric_coords,
+              cull_backfaces,
+              K,
+              face_verts_a,
+              face_areas_a,
+              face_bboxes_a,
+              neighbor_idx_a,
+              q);
         }
         while (!q.empty()) {
           // Loop through and add values to the output tensors
@@ -389,6 +420,208 @@ RasterizeMeshesNaiveCpu(
   return std::make_tuple(face_idxs, zbuf, barycentric_coords, pix_dists);
 }
 
+std::tuple<torch::Tensor, torch::Tensor, torch::Tensor, torch::Tensor>
+RasterizeMeshesBinnedCpu(
+    const torch::Tensor& face_verts,
+    const torch::Tensor& mesh_to_face_first_idx,
+    const torch::Tensor& num_faces_per_mesh,
+    const torch::Tensor& clipped_faces_neighbor_idx,
+    const std::tuple<int, int> image_size,
+    const float blur_radius,
+    const int faces_per_pixel,
+    const int bin_size,
+    const bool perspective_correct,
+    const bool clip_barycentric_coords,
+    const bool cull_backfaces,
+    const bool occlusion_culling) {
+  if (face_verts.ndimension() != 3 || face_verts.size(1) != 3 ||
+      face_verts.size(2) != 3) {
+    AT_ERROR("face_verts must have dimensions (num_faces, 3, 3)");
+  }
+  if (num_faces_per_mesh.size(0) != mesh_to_face_first_idx.size(0)) {
+    AT_ERROR(
+        "num_faces_per_mesh must have save size first dimension as mesh_to_face_first_idx");
+  }
+
+  const int32_t N = mesh_to_face_first_idx.size(0); // batch_size.
+  const int H = std::get<0>(image_size);
+  const int W = std::get<1>(image_size);
+  const int K = faces_per_pixel;
+
+  // Occlusion culling is only used for hard rasterization, where each pixel
+  // keeps the single nearest face which contains it. Such a face is found
+  // first when the faces are sorted by their minimum depth, and the search
+  // stops at the first face which is entirely behind it. Clipped faces are
+  // excluded, because the face kept for a pixel then depends on the order
+  // of the faces.
+  const bool early_out = occlusion_culling && K == 1 && blur_radius == 0 &&
+      !(clipped_faces_neighbor_idx >= 0).any().item<bool>();
+
+  // Integer division round up.
+  const int BH = 1 + (H - 1) / bin_size;
+  const int BW = 1 + (W - 1) / bin_size;
+
+  auto long_opts = num_faces_per_mesh.options().dtype(torch::kInt64);
+  auto float_opts = face_verts.options().dtype(torch::kFloat32);
+
+  // Initialize output tensors.
+  torch::Tensor face_idxs = torch::full({N, H, W, K}, -1, long_opts);
+  torch::Tensor zbuf = torch::full({N, H, W, K}, -1, float_opts);
+  torch::Tensor pix_dists = torch::full({N, H, W, K}, -1, float_opts);
+  torch::Tensor barycentric_coords =
+      torch::full({N, H, W, K, 3}, -1, float_opts);
+
+  auto face_verts_a = face_verts.accessor<float, 3>();
+  auto face_idxs_a = face_idxs.accessor<int64_t, 4>();
+  auto zbuf_a = zbuf.accessor<float, 4>();
+  auto pix_dists_a = pix_dists.accessor<float, 4>();
+  auto barycentric_coords_a = barycentric_coords.accessor<float, 5>();
+  auto neighbor_idx_a = clipped_faces_neighbor_idx.accessor<int64_t, 1>();
+  auto mesh_to_face_first_idx_a = mesh_to_face_first_idx.accessor<int64_t, 1>();
+  auto num_faces_per_mesh_a = num_faces_per_mesh.accessor<int64_t, 1>();
+
+  auto face_bboxes = ComputeFaceBoundingBoxes(face_verts);
+  auto face_bboxes_a = face_bboxes.accessor<float, 2>();
+  auto face_areas = ComputeFaceAreas(face_verts);
+  auto face_areas_a = face_areas.accessor<float, 1>();
+
+  // The extent of each bin in NDC, which covers the pixels of the bin with
+  // half a pixel to spare on each side.
+  const float half_pix_x = NonSquareNdcRange(W, H) / (2.0f * W);
+  const float half_pix_y = NonSquareNdcRange(H, W) / (2.0f * H);
+  std::vector<float> bin_x_min(BW);
+  std::vector<float> bin_x_max(BW);
+  std::vector<float> bin_y_min(BH);
+  std::vector<float> bin_y_max(BH);
+  for (int bx = 0; bx < BW; ++bx) {
+    const int x_end = std::min((bx + 1) * bin_size, W);
+    bin_x_min[bx] = PixToNonSquareNdc(bx * bin_size, W, H) - half_pix_x;
+    bin_x_max[bx] = PixToNonSquareNdc(x_end - 1, W, H) + half_pix_x;
+  }
+  for (int by = 0; by < BH; ++by) {
+    const int y_end = std::min((by + 1) * bin_size, H);
+    bin_y_min[by] = PixToNonSquareNdc(by * bin_size, H, W) - half_pix_y;
+    bin_y_max[by] = PixToNonSquareNdc(y_end - 1, H, W) + half_pix_y;
+  }
+
+  // Coarse pass: find the faces whose bounding box overlaps each bin. Each
+  // row of bins is filled by one task, which looks at the faces in order, so
+  // that the faces in each bin are in the same order as in the naive
+  // rasterizer and the output is identical.
+  const float sqrt_blur_radius = std::sqrt(blur_radius);
+  std::vector<std::vector<int32_t>> bin_faces(int64_t(N) * BH * BW);
+  at::parallel_for(0, int64_t(N) * BH, 1, [&](int64_t start, int64_t end) {
+    for (int64_t n_by = start; n_by < end; ++n_by) {
+      const int64_t n = n_by / BH;
+      const int by = n_by % BH;
+      const int64_t face_start_idx = mesh_to_face_first_idx_a[n];
+      const int64_t face_stop_idx = face_start_idx + num_faces_per_mesh_a[n];
+      for (int64_t f = face_start_idx; f < face_stop_idx; ++f) {
+        // Skip the faces which the naive rasterizer skips at every pixel:
+        // culled back faces, faces with zero area and faces with a vertex
+        // behind the camera.
+        const float face_area = face_areas_a[f];
+        if ((cull_backfaces && face_area < 0.0) ||
+            (face_area <= kEpsilon && face_area >= -1.0f * kEpsilon) ||
+            face_bboxes_a[f][4] < kEpsilon) {
+          continue;
+        }
+        // Use a half-open interval so that faces exactly on the boundary
+        // between bins will fall into exactly one bin.
+        const float face_y_min = face_bboxes_a[f][1] - sqrt_blur_radius;
+        const float face_y_max = face_bboxes_a[f][3] + sqrt_blur_radius;
+        if (!((face_y_min <= bin_y_max[by]) && (bin_y_min[by] < face_y_max))) {
+          continue;
+        }
+        const float face_x_min = face_bboxes_a[f][0] - sqrt_blur_radius;
+        const float face_x_max = face_bboxes_a[f][2] + sqrt_blur_radius;
+        for (int bx = 0; bx < BW; ++bx) {
+          if ((face_x_min <= bin_x_max[bx]) && (bin_x_min[bx] < face_x_max)) {
+            bin_faces[n_by * BW + bx].push_back(f);
+          }
+        }
+      }
+    }
+  });
+
+  // Fine pass: rasterize the pixels of each bin, only looking at the faces
+  // in the bin.
+  at::parallel_for(0, int64_t(N) * BH * BW, 1, [&](int64_t start, int64_t end) {
+    for (int64_t bin = start; bin < end; ++bin) {
+      std::vector<int32_t>& faces = bin_faces[bin];
+      if (faces.empty()) {
+        continue;
+      }
+      if (early_out) {
+        // Sort the faces of the bin front to back.
+        std::sort(faces.begin(), faces.end(), [&](int32_t f1, int32_t f2) {
+          return face_bboxes_a[f1][4] < face_bboxes_a[f2][4];
+        });
+      }
+      const int64_t n = bin / (BH * BW);
+      const int by = (bin / BW) % BH;
+      const int bx = bin % BW;
+      const int y_end = std::min((by + 1) * bin_size, H);
+      const int x_end = std::min((bx + 1) * bin_size, W);
+      for (int yidx = by * bin_size; yidx < y_end; ++yidx) {
+        // Y coordinate of the top of the pixel.
+        const float yf = PixToNonSquareNdc(yidx, H, W);
+        // Reverse the order of the Y axis so that +Y is pointing upwards
+        // in the image.
+        const int yi = H - 1 - yidx;
+        for (int xidx = bx * bin_size; xidx < x_end; ++xidx) {
+          // X coordinate of the left of the pixel.
+          const float xf = PixToNonSquareNdc(xidx, W, H);
+          // Reverse the order of the X axis so that +X is pointing to the
+          // left in the image.
+          const int xi = W - 1 - xidx;
+
+          // Use a deque to hold values:
+          // (z, idx, r, bary.x, bary.y. bary.z)
+          std::deque<std::tuple<float, int, float, float, float, float>> q;
+          for (const int32_t f : faces) {
+            // The depth of a pixel inside a face is at least the minimum
+            // depth of the face, so this face and all the following ones
+            // are behind the nearest face found so far.
+            if (early_out && !q.empty() &&
+                std::get<0>(q.front()) < face_bboxes_a[f][4]) {
+              break;
+            }
+            CheckPixelInsideFaceCpu(
+                f,
+                xf,
+                yf,
+                blur_radius,
+                perspective_correct,
+                clip_barycentric_coords,
+                cull_backfaces,
+                K,
+                face_verts_a,
+                face_areas_a,
+                face_bboxes_a,
+                neighbor_idx_a,
+                q);
+          }
+          while (!q.empty()) {
+            // Loop through and add values to the output tensors
+            auto t = q.back();
+            q.pop_back();
+            const int i = q.size();
+            zbuf_a[n][yi][xi][i] = std::get<0>(t);
+            face_idxs_a[n][yi][xi][i] = std::get<1>(t);
+            pix_dists_a[n][yi][xi][i] = std::get<2>(t);
+            barycentric_coords_a[n][yi][xi][i][0] = std::get<3>(t);
+            barycentric_coords_a[n][yi][xi][i][1] = std::get<4>(t);
+            barycentric_coords_a[n][yi][xi][i][2] = std::get<5>(t);
+          }
+        }
+      }
+    }
+  });
+
+  return std::make_tuple(face_idxs, zbuf, barycentric_coords, pix_dists);
+}
+
 torch::Tensor RasterizeMeshesBackwardCpu(
     const torch::Tensor& face_verts, // (F, 3, 3)
     const torch::Tensor& pix_to_face, // (N, H, W, K)
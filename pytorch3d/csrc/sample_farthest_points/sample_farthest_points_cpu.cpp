@@ -6,11 +6,16 @@
  * LICENSE file in the root directory of this source tree.
  */
 
+#include <ATen/Parallel.h>
 #include <torch/extension.h>
 #include <iterator>
 #include <random>
 #include <vector>
 
+// Minimum number of points for which to split the distance updates of a
+// single point cloud between threads.
+constexpr int64_t kPointsGrainSize = 16384;
+
 at::Tensor FarthestPointSamplingCpu(
     const at::Tensor& points,
     const at::Tensor& lengths,
@@ -34,15 +39,12 @@ at::Tensor FarthestPointSamplingCpu(
   auto sampled_indices_a = sampled_indices.accessor<int64_t, 2>();
   auto start_idxs_a = start_idxs.accessor<int64_t, 1>();
 
-  // Initialize a mask to prevent duplicates
-  // If true, the point has already been selected.
-  std::vector<unsigned char> selected_points_mask(P, false);
-
-  // Initialize to infinity a vector of
-  // distances from each point to any of the previously selected points
-  std::vector<float> dists(P, std::numeric_limits<float>::max());
-
-  for (int64_t n = 0; n < N; ++n) {
+  // Sample the n-th point cloud. If split_points, the distance updates for
+  // each point, which are independent, are split between threads.
+  auto sample_cloud = [&](int64_t n,
+                          std::vector<unsigned char>& selected_points_mask,
+                          std::vector<float>& dists,
+                          bool split_points) {
     // Resize and reset points mask and distances for each batch
     selected_points_mask.resize(lengths_a[n]);
     dists.resize(lengths_a[n]);
@@ -61,10 +63,8 @@ at::Tensor FarthestPointSamplingCpu(
     // points to sample
     const int64_t batch_k = std::min(lengths_a[n], k_a[n]);
 
-    // Iteratively select batch_k points per batch
-    for (int64_t k = 1; k < batch_k; ++k) {
-      // Iterate through all the points
-      for (int64_t p = 0; p < lengths_a[n]; ++p) {
+    auto update_dists = [&](int64_t p_start, int64_t p_end) {
+      for (int64_t p = p_start; p < p_end; ++p) {
         if (selected_points_mask[p]) {
           // For already selected points set the distance to 0.0
           dists[p] = 0.0;
@@ -85,6 +85,16 @@ at::Tensor FarthestPointSamplingCpu(
           dists[p] = dist2;
         }
       }
+    };
+
+    // Iteratively select batch_k points per batch
+    for (int64_t k = 1; k < batch_k; ++k) {
+      // Iterate through all the points
+      if (split_points) {
+        at::parallel_for(0, lengths_a[n], kPointsGrainSize, update_dists);
+      } else {
+        update_dists(0, lengths_a[n]);
+      }
 
       // The aim is to pick the point that has the largest
       // nearest neighbour distance to any of the already selected points
@@ -97,6 +107,29 @@ at::Tensor FarthestPointSamplingCpu(
       // Set the mask value to true to prevent duplicates.
       selected_points_mask[last_idx] = true;
     }
+  };
+
+  // Initialize a mask to prevent duplicates
+  // If true, the point has already been selected.
+  std::vector<unsigned char> selected_points_mask(P, false);
+
+  // Initialize to infinity a vector of
+  // distances from each point to any of the previously selected points
+  std::vector<float> dists(P, std::numeric_limits<float>::max());
+
+  if (N >= at::get_num_threads()) {
+    // There are enough point clouds to keep all the threads busy.
+    at::parallel_for(0, N, 1, [&](int64_t start, int64_t end) {
+      std::vector<unsigned char> thread_mask;
+      std::vector<float> thread_dists;
+      for (int64_t n = start; n < end; ++n) {
+        sample_cloud(n, thread_mask, thread_dists, false);
+      }
+    });
+  } else {
+    for (int64_t n = 0; n < N; ++n) {
+      sample_cloud(n, selected_points_mask, dists, true);
+    }
   }
 
   return sampled_indices;
@@ -6,6 +6,7 @@
 
 # pyre-unsafe
 
+from .cache import ModelCache
 from .r2n2 import BlenderCamera, collate_batched_R2N2, R2N2, render_cubified_voxels
 from .shapenet import ShapeNetCore
 from .utils import collate_batched_meshes
@@ -0,0 +1,124 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-unsafe
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import torch
+from iopath.common.file_io import PathManager
+from pytorch3d.io.packed_io import load_tensors_packed, save_tensors_packed
+
+
+class ModelCache:
+    """
+    An on-disk cache of the tensors parsed from the files of each model in a
+    dataset, so that the files only need to be parsed once. Entries are stored
+    in the .p3d format of pytorch3d.io and are memory-mapped when read.
+
+    The cache can be shared by the workers of a DataLoader, and by several
+    datasets, because entries are written atomically and a missing entry is
+    just a miss. When max_size_bytes is given, the least recently used entries
+    are deleted whenever an entry is added and the cache is too big.
+
+    The number of hits and misses seen by this object are counted, which can
+    be used to tune the size of the cache. Note that each DataLoader worker
+    process has its own copy of the counts.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: Optional[int] = None) -> None:
+        """
+        Args:
+            cache_dir: directory in which to store the entries. It is created
+                if it does not exist.
+            max_size_bytes: If given, the maximum total size of the entries.
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self._path_manager = PathManager()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_file(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".p3d")
+
+    def get(self, key: str) -> Optional[Dict[str, torch.Tensor]]:
+        """
+        Look up an entry.
+
+        Args:
+            key: string identifying the entry, e.g. the path of the model file
+                together with any options which affect how it is parsed.
+
+        Returns:
+            dictionary of the stored tensors, or None if the entry is not in
+            the cache.
+        """
+        entry_file = self._entry_file(key)
+        try:
+            tensors = load_tensors_packed(
+                Path(entry_file), path_manager=self._path_manager, mmap=True
+            )
+        except FileNotFoundError:
+            # The entry was never added or has been evicted.
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            # Mark the entry as recently used.
+            os.utime(entry_file)
+        except FileNotFoundError:
+            pass
+        return tensors
+
+    def put(self, key: str, tensors: Dict[str, torch.Tensor]) -> None:
+        """
+        Add or replace an entry, and evict old entries if the cache is too big.
+
+        Args:
+            key: string identifying the entry.
+            tensors: dictionary of CPU tensors to store.
+        """
+        save_tensors_packed(self._entry_file(key), tensors)
+        if self.max_size_bytes is not None:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used entries until the total size of the
+        entries is at most max_size_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".p3d"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                # Another process evicted it.
+                pass
+            total_size -= size
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dictionary with the number of "hits" and "misses" of this object.
+        """
+        return {"hits": self.hits, "misses": self.misses}
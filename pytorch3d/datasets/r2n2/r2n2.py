@@ -16,6 +16,7 @@ import numpy as np
 import torch
 from PIL import Image
 from pytorch3d.common.datatypes import Device
+from pytorch3d.datasets.cache import ModelCache
 from pytorch3d.datasets.shapenet_base import ShapeNetBase
 from pytorch3d.renderer import HardPhongShader
 from tabulate import tabulate
@@ -66,6 +67,7 @@ class R2N2(ShapeNetBase):  # pragma: no cover
         voxels_rel_path: str = "ShapeNetVoxels",
         load_textures: bool = True,
         texture_resolution: int = 4,
+        cache: Optional[ModelCache] = None,
     ) -> None:
         """
         Store each object's synset id and models id the given directories.
@@ -89,9 +91,12 @@ class R2N2(ShapeNetBase):  # pragma: no cover
             texture_resolution: Int specifying the resolution of the texture map per face
                 created using the textures in the obj file. A
                 (texture_resolution, texture_resolution, 3) map is created per face.
+            cache: Optional ModelCache in which to keep the parsed meshes and voxel
+                coordinates, so that each obj and binvox file is only parsed once.
 
         """
         super().__init__()
+        self.cache = cache
         self.shapenet_dir = shapenet_dir
         self.r2n2_dir = r2n2_dir
         self.views_rel_path = views_rel_path
@@ -326,9 +331,7 @@ class R2N2(ShapeNetBase):  # pragma: no cover
                 msg = "Voxel file not found for model %s from category %s."
                 raise FileNotFoundError(msg % (model["model_id"], model["synset_id"]))
 
-            with open(voxel_path, "rb") as f:
-                # Read voxel coordinates as a tensor of shape (N, 3).
-                voxel_coords = read_binvox_coords(f)
+            voxel_coords = self._load_voxel_coords(voxel_path)
             # Align voxels to the same coordinate system as mesh verts.
             voxel_coords = align_bbox(voxel_coords, model["verts"])
             for RT in voxel_RTs:
@@ -341,6 +344,27 @@ class R2N2(ShapeNetBase):  # pragma: no cover
 
         return model
 
+    def _load_voxel_coords(self, voxel_path: str) -> torch.Tensor:
+        """
+        Read the voxel coordinates from a binvox file, or from the cache.
+
+        Args:
+            voxel_path: path of the binvox file.
+
+        Returns:
+            voxel coordinates as a tensor of shape (N, 3).
+        """
+        key = "voxel_coords " + voxel_path
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached["voxel_coords"]
+        with open(voxel_path, "rb") as f:
+            voxel_coords = read_binvox_coords(f)
+        if self.cache is not None:
+            self.cache.put(key, {"voxel_coords": voxel_coords})
+        return voxel_coords
+
     def _compute_camera_calibration(self, RT):
         """
         Helper function for calculating rotation and translation matrices from ShapeNet
@@ -11,8 +11,9 @@ import os
 import warnings
 from os import path
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
+from pytorch3d.datasets.cache import ModelCache
 from pytorch3d.datasets.shapenet_base import ShapeNetBase
 
 
@@ -33,6 +34,7 @@ class ShapeNetCore(ShapeNetBase):  # pragma: no cover
         version: int = 1,
         load_textures: bool = True,
         texture_resolution: int = 4,
+        cache: Optional[ModelCache] = None,
     ) -> None:
         """
         Store each object's synset id and models id from data_dir.
@@ -55,11 +57,14 @@ class ShapeNetCore(ShapeNetBase):  # pragma: no cover
             texture_resolution: Int specifying the resolution of the texture map per face
                 created using the textures in the obj file. A
                 (texture_resolution, texture_resolution, 3) map is created per face.
+            cache: Optional ModelCache in which to keep the parsed meshes, so that
+                each obj file is only parsed once.
         """
         super().__init__()
         self.shapenet_dir = data_dir
         self.load_textures = load_textures
         self.texture_resolution = texture_resolution
+        self.cache = cache
 
         if version not in [1, 2]:
             raise ValueError("Version number must be either 1 or 2.")
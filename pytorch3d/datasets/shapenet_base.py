@@ -22,6 +22,7 @@ from pytorch3d.renderer import (
     TexturesVertex,
 )
 
+from .cache import ModelCache
 from .utils import collate_batched_meshes
 
 
@@ -45,6 +46,7 @@ class ShapeNetBase(torch.utils.data.Dataset):  # pragma: no cover
         self.model_dir = "model.obj"
         self.load_textures = True
         self.texture_resolution = 4
+        self.cache: Optional[ModelCache] = None
 
     def __len__(self) -> int:
         """
@@ -85,6 +87,16 @@ class ShapeNetBase(torch.utils.data.Dataset):  # pragma: no cover
         return model
 
     def _load_mesh(self, model_path) -> Tuple:
+        if self.cache is not None:
+            key = "mesh %s %s %d" % (
+                model_path,
+                self.load_textures,
+                self.texture_resolution,
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached["verts"], cached["faces"], cached.get("textures")
+
         verts, faces, aux = load_obj(
             model_path,
             create_texture_atlas=self.load_textures,
@@ -105,6 +117,11 @@ class ShapeNetBase(torch.utils.data.Dataset):  # pragma: no cover
         else:
             textures = None
 
+        if self.cache is not None:
+            tensors = {"verts": verts, "faces": faces.verts_idx}
+            if textures is not None:
+                tensors["textures"] = textures
+            self.cache.put(key, tensors)
         return verts, faces.verts_idx, textures
 
     def render(
@@ -8,6 +8,12 @@
 
 
 from .obj_io import load_obj, load_objs_as_meshes, save_obj
+from .packed_io import (
+    load_mesh_cached,
+    load_pointcloud_cached,
+    load_tensors_packed,
+    save_tensors_packed,
+)
 from .pluggable import IO
 from .ply_io import load_ply, save_ply
 
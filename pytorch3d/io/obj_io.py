@@ -8,6 +8,7 @@
 
 
 """This module implements utility functions for loading and saving meshes."""
+import concurrent.futures
 import os
 import warnings
 from collections import namedtuple
@@ -243,6 +244,8 @@ def load_objs_as_meshes(
     texture_atlas_size: int = 4,
     texture_wrap: Optional[str] = "repeat",
     path_manager: Optional[PathManager] = None,
+    num_workers: int = 0,
+    use_processes: bool = False,
 ):
     """
     Load meshes from a list of .obj files using the load_obj function, and
@@ -258,20 +261,49 @@ def load_objs_as_meshes(
         load_textures: Boolean indicating whether material files are loaded
         create_texture_atlas, texture_atlas_size, texture_wrap: as for load_obj.
         path_manager: optionally a PathManager object to interpret paths.
+        num_workers: If greater than 0, the number of workers which load the
+            files, including their material files and texture images,
+            concurrently. The meshes are still returned in the order of files.
+            If any files fail to load, the error from the first of them in
+            files is raised.
+        use_processes: If True and num_workers > 0, the workers are processes
+            instead of threads, which is faster when parsing rather than
+            reading dominates. Then files must be paths or strings, and
+            path_manager must be picklable.
 
     Returns:
         New Meshes object.
     """
-    mesh_list = []
-    for f_obj in files:
-        verts, faces, aux = load_obj(
-            f_obj,
-            load_textures=load_textures,
-            create_texture_atlas=create_texture_atlas,
-            texture_atlas_size=texture_atlas_size,
-            texture_wrap=texture_wrap,
-            path_manager=path_manager,
+    load_kwargs = {
+        "load_textures": load_textures,
+        "create_texture_atlas": create_texture_atlas,
+        "texture_atlas_size": texture_atlas_size,
+        "texture_wrap": texture_wrap,
+        "path_manager": path_manager,
+    }
+    if num_workers > 0:
+        executor_class = (
+            concurrent.futures.ProcessPoolExecutor
+            if use_processes
+            else concurrent.futures.ThreadPoolExecutor
         )
+        with executor_class(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(load_obj, f_obj, **load_kwargs) for f_obj in files
+            ]
+            try:
+                # Waiting in order makes the reported error independent of
+                # which worker finishes first.
+                loaded = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    else:
+        loaded = (load_obj(f_obj, **load_kwargs) for f_obj in files)
+
+    mesh_list = []
+    for verts, faces, aux in loaded:
         tex = None
         if create_texture_atlas:
             # TexturesAtlas type
@@ -432,10 +464,46 @@ def _parse_face(
         faces_materials_idx.append(material_idx)
 
 
-def _parse_obj(f, data_dir: str):
+def _parse_mtl_statement(line: str, tokens: List[str], data_dir: str):
     """
-    Load a mesh from a file-like object. See load_obj function for more details
-    about the return values.
+    Interpret a line of an obj file which may be a material statement.
+
+    Args:
+        line: the stripped line.
+        tokens: the whitespace separated tokens of the line.
+        data_dir: the directory in which an mtl file is expected.
+
+    Returns:
+        2-element tuple (kind, value) where kind is "mtllib" with value the
+        path to the mtl file, "usemtl" with value the material name, or None
+        if the line is not a material statement.
+    """
+    if line.startswith("mtllib"):
+        if len(tokens) < 2:
+            raise ValueError("material file name is not specified")
+        # NOTE: only allow one .mtl file per .obj.
+        # Definitions for multiple materials can be included
+        # in this one .mtl file.
+        mtl_path = line[len(tokens[0]) :].strip()  # Take the remainder of the line
+        return "mtllib", os.path.join(data_dir, mtl_path)
+    if len(tokens) and tokens[0] == "usemtl":
+        return "usemtl", tokens[1]
+    return None, None
+
+
+def _material_index(material_name: str, material_names: List[str]) -> int:
+    # materials are often repeated for different parts
+    # of a mesh.
+    if material_name not in material_names:
+        material_names.append(material_name)
+        return len(material_names) - 1
+    return material_names.index(material_name)
+
+
+def _parse_obj_lines(lines, data_dir: str):
+    """
+    Reference parser which interprets an obj file one line at a time.
+    See _parse_obj for the return values.
     """
     verts, normals, verts_uvs = [], [], []
     faces_verts_idx, faces_normals_idx, faces_textures_idx = [], [], []
@@ -443,7 +511,7 @@ def _parse_obj(f, data_dir: str):
     material_names = []
     mtl_path = None
 
-    lines = [line.strip() for line in f]
+    lines = [line.strip() for line in lines]
 
     # startswith expects each line to be a string. If the file is read in as
     # bytes then first decode to strings.
@@ -454,23 +522,11 @@ def _parse_obj(f, data_dir: str):
 
     for line in lines:
         tokens = line.strip().split()
-        if line.startswith("mtllib"):
-            if len(tokens) < 2:
-                raise ValueError("material file name is not specified")
-            # NOTE: only allow one .mtl file per .obj.
-            # Definitions for multiple materials can be included
-            # in this one .mtl file.
-            mtl_path = line[len(tokens[0]) :].strip()  # Take the remainder of the line
-            mtl_path = os.path.join(data_dir, mtl_path)
-        elif len(tokens) and tokens[0] == "usemtl":
-            material_name = tokens[1]
-            # materials are often repeated for different parts
-            # of a mesh.
-            if material_name not in material_names:
-                material_names.append(material_name)
-                materials_idx = len(material_names) - 1
-            else:
-                materials_idx = material_names.index(material_name)
+        kind, value = _parse_mtl_statement(line, tokens, data_dir)
+        if kind == "mtllib":
+            mtl_path = value
+        elif kind == "usemtl":
+            materials_idx = _material_index(value, material_names)
         elif line.startswith("v "):  # Line is a vertex.
             vert = [float(x) for x in tokens[1:4]]
             if len(vert) != 3:
@@ -515,6 +571,313 @@ def _parse_obj(f, data_dir: str):
     )
 
 
+# Bytes which python's str.split treats as whitespace within ascii obj data.
+_OBJ_WHITESPACE = np.zeros(256, dtype=bool)
+_OBJ_WHITESPACE[[9, 10, 11, 12, 13, 32]] = True
+
+# Bytes which cannot start a line in the vectorized parser. str.strip() would
+# remove them, so such files are handed to the reference parser instead.
+_OBJ_BAD_LINE_START = np.zeros(256, dtype=bool)
+_OBJ_BAD_LINE_START[[9, 11, 12, 28, 29, 30, 31, 32]] = True
+_OBJ_BAD_LINE_START[128:] = True
+
+# Size in bytes of the blocks of lines which are classified together.
+_OBJ_CHUNK_BYTES = 1 << 22
+
+
+def _bulk_numbers(text: bytes, dtype) -> Optional[np.ndarray]:
+    """
+    Convert whitespace separated numbers to an array in one call,
+    or return None if any of the text is not a number.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=dtype, sep=" ")
+        except (DeprecationWarning, ValueError):
+            return None
+
+
+def _parse_obj_chunk(chunk: np.ndarray, data_dir: str, state: dict):
+    """
+    Vectorized parse of a block of complete lines of an obj file.
+
+    Args:
+        chunk: uint8 array of the bytes of the lines, ending with a newline.
+        data_dir: the directory in which an mtl file is expected.
+        state: dict with the running "material_names", "materials_idx" and
+            "mtl_path", which is updated in place.
+
+    Returns:
+        Tuple of arrays (verts, normals, verts_uvs, faces_verts_idx,
+        faces_normals_idx, faces_textures_idx, faces_materials_idx) for the
+        lines in the chunk, or None if the chunk contains something which the
+        reference parser must handle, for example a malformed line.
+    """
+    n = chunk.shape[0]
+    is_nl = chunk == 10
+    line_ends = np.flatnonzero(is_nl)
+    line_starts = np.empty_like(line_ends)
+    line_starts[0] = 0
+    line_starts[1:] = line_ends[:-1] + 1
+
+    c0 = chunk[line_starts]
+    c1 = chunk[np.minimum(line_starts + 1, n - 1)]
+    c2 = chunk[np.minimum(line_starts + 2, n - 1)]
+    if _OBJ_BAD_LINE_START[c0].any() or ((c0 == 13) & (c1 != 10)).any():
+        return None
+
+    # Classify the lines as the reference parser would. Anything past the end
+    # of a line is a newline, which never matches.
+    is_v = (c0 == ord("v")) & (c1 == ord(" "))
+    is_vt = (c0 == ord("v")) & (c1 == ord("t")) & (c2 == ord(" "))
+    is_vn = (c0 == ord("v")) & (c1 == ord("n")) & (c2 == ord(" "))
+    is_f = (c0 == ord("f")) & (c1 == ord(" "))
+
+    # Material statements are rare and order dependent, so are handled one
+    # by one. For each change of material, record the line it happens on.
+    material_lines, material_values = [-1], [state["materials_idx"]]
+    for i in np.flatnonzero((c0 == ord("m")) | (c0 == ord("u"))):
+        try:
+            line = chunk[line_starts[i] : line_ends[i]].tobytes().decode("utf-8")
+            line = line.strip()
+            kind, value = _parse_mtl_statement(line, line.split(), data_dir)
+        except (IndexError, UnicodeDecodeError, ValueError):
+            # Let the reference parser report the first error in the file.
+            return None
+        if kind == "mtllib":
+            state["mtl_path"] = value
+        elif kind == "usemtl":
+            material_lines.append(i)
+            material_values.append(_material_index(value, state["material_names"]))
+    state["materials_idx"] = material_values[-1]
+
+    # Token structure of every byte: which token it is in, and the position
+    # of that token within its line.
+    ws = _OBJ_WHITESPACE[chunk]
+    tok_start = ~ws
+    tok_start[1:] &= ws[:-1]
+    tok_id = np.cumsum(tok_start, dtype=np.int32) - 1
+    line_lengths = line_ends - line_starts + 1
+    # Classified lines start with a token, so their first token is tok_id at
+    # the start of the line.
+    line_first_tok = tok_id[line_starts]
+    num_tokens = tok_id[line_ends] - line_first_tok + 1
+    tok_rank = tok_id - np.repeat(line_first_tok, line_lengths)
+
+    def numbers(is_kind, ncols):
+        nlines = int(is_kind.sum())
+        if nlines == 0:
+            return np.zeros((0, ncols))
+        if (num_tokens[is_kind] <= ncols).any():
+            return None
+        # Keep the first ncols values after the keyword, and the newlines.
+        rank_ok = (tok_rank >= 1) & (tok_rank <= ncols)
+        keep = np.repeat(is_kind, line_lengths) & (rank_ok | is_nl)
+        values = _bulk_numbers(chunk[keep].tobytes(), np.float64)
+        if values is None or values.shape[0] != nlines * ncols:
+            return None
+        return values.reshape(nlines, ncols)
+
+    verts = numbers(is_v, 3)
+    verts_uvs = numbers(is_vt, 2)
+    normals = numbers(is_vn, 3)
+    if verts is None or verts_uvs is None or normals is None:
+        return None
+
+    faces = _parse_obj_chunk_faces(
+        chunk, is_f, ws, tok_start, tok_id, tok_rank, line_lengths, num_tokens
+    )
+    if faces is None:
+        return None
+    faces_verts_idx, faces_normals_idx, faces_textures_idx, face_lines = faces
+
+    # Material in effect for each face is that of the last usemtl before it.
+    material_values = np.array(material_values, dtype=np.int64)
+    which = np.searchsorted(material_lines, face_lines, side="right") - 1
+    faces_materials_idx = material_values[which]
+
+    return (
+        verts,
+        normals,
+        verts_uvs,
+        faces_verts_idx,
+        faces_normals_idx,
+        faces_textures_idx,
+        faces_materials_idx,
+    )
+
+
+def _parse_obj_chunk_faces(
+    chunk, is_f, ws, tok_start, tok_id, tok_rank, line_lengths, num_tokens
+):
+    """
+    Vectorized parse of the face lines in a chunk. Helper for _parse_obj_chunk.
+
+    Returns:
+        Tuple of (T, 3) arrays faces_verts_idx, faces_normals_idx and
+        faces_textures_idx, and the (T,) array of the line of each triangle,
+        or None if a face line needs the reference parser.
+    """
+    empty = np.zeros((0, 3), dtype=np.int64)
+    if not is_f.any():
+        return empty, empty, empty, np.zeros(0, dtype=np.int64)
+    verts_per_face = num_tokens[is_f] - 1
+    if (verts_per_face < 3).any():
+        return None
+
+    # Bytes of the vertex statements such as 4/1/1 of face lines.
+    in_face_line = np.repeat(is_f, line_lengths)
+    in_face_vert = in_face_line & (tok_rank >= 1) & ~ws
+    is_slash = chunk == ord("/")
+    sep = ws | is_slash
+    num_start = ~sep
+    num_start[1:] &= sep[:-1]
+    double_slash = np.zeros_like(is_slash)
+    double_slash[1:] = is_slash[1:] & is_slash[:-1]
+
+    vert_tok = tok_id[tok_start & in_face_vert]
+    ntok = int(tok_id[-1]) + 1
+
+    def count(mask):
+        return np.bincount(tok_id[mask & in_face_vert], minlength=ntok)[vert_tok]
+
+    n_slash = count(is_slash)
+    n_double = count(double_slash)
+    n_num = count(num_start)
+
+    # Only accept the forms 4, 4/1, 4/1/1 and 4//1 with nothing missing.
+    has_tex = (n_slash >= 1) & (n_double == 0)
+    has_norm = n_slash == 2
+    valid = ((n_slash <= 2) & (n_double <= 1)) & (
+        n_num == 1 + has_tex.astype(np.int64) + has_norm
+    )
+    if not valid.all():
+        return None
+
+    # Triplets must be consistent for all vertices in a face.
+    face_offsets = np.cumsum(verts_per_face) - verts_per_face
+    for prop in (has_tex, has_norm):
+        prop = prop.astype(np.int8)
+        low = np.minimum.reduceat(prop, face_offsets)
+        high = np.maximum.reduceat(prop, face_offsets)
+        if (low != high).any():
+            return None
+
+    text = chunk[in_face_vert | in_face_line & ws]
+    text[text == ord("/")] = ord(" ")
+    values = _bulk_numbers(text.tobytes(), np.int64)
+    if values is None or values.shape[0] != n_num.sum():
+        return None
+    first = np.cumsum(n_num) - n_num
+    vert_idx = values[first]
+    tex_idx = np.where(has_tex, values[np.minimum(first + 1, len(values) - 1)], -1)
+    norm_idx = np.where(
+        has_norm, values[np.minimum(first + 1 + has_tex, len(values) - 1)], -1
+    )
+
+    # Subdivide faces with more than 3 vertices as triangle fans.
+    tris_per_face = verts_per_face - 2
+    tri_face = np.repeat(np.arange(len(tris_per_face)), tris_per_face)
+    tri_in_face = np.arange(len(tri_face)) - np.repeat(
+        np.cumsum(tris_per_face) - tris_per_face, tris_per_face
+    )
+    corner0 = face_offsets[tri_face]
+    corners = np.stack(
+        [corner0, corner0 + tri_in_face + 1, corner0 + tri_in_face + 2], axis=1
+    )
+    face_lines = np.flatnonzero(is_f)[tri_face]
+    return vert_idx[corners], norm_idx[corners], tex_idx[corners], face_lines
+
+
+def _parse_obj_buffer(data: bytes, data_dir: str):
+    """
+    Vectorized parser for the contents of an obj file. The lines are
+    classified and converted in bulk with numpy, in chunks of about
+    _OBJ_CHUNK_BYTES so that the temporary arrays stay small.
+    See _parse_obj for the return values.
+
+    Returns None if the reference parser must be used instead, for example
+    because a line is malformed and the precise error is needed.
+    """
+    state = {"material_names": [], "materials_idx": -1, "mtl_path": None}
+    parts = []
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start + _OBJ_CHUNK_BYTES) + 1
+        if end == 0:
+            end = len(data)
+        chunk = buffer[start:end]
+        if chunk[-1] != 10:
+            chunk = np.concatenate([chunk, np.array([10], dtype=np.uint8)])
+        part = _parse_obj_chunk(chunk, data_dir, state)
+        if part is None:
+            return None
+        parts.append(part)
+        start = end
+
+    def join(arrays, ncols):
+        # Keep the empty lists which the reference parser returns.
+        arrays = [a for a in arrays if len(a)]
+        if not arrays:
+            return []
+        return np.concatenate(arrays).reshape(-1, ncols)
+
+    (
+        verts,
+        normals,
+        verts_uvs,
+        faces_verts_idx,
+        faces_normals_idx,
+        faces_textures_idx,
+        faces_materials_idx,
+    ) = zip(*parts) if parts else ([],) * 7
+    faces_materials_idx = join(faces_materials_idx, 1)
+    return (
+        join(verts, 3),
+        join(normals, 3),
+        join(verts_uvs, 2),
+        join(faces_verts_idx, 3),
+        join(faces_normals_idx, 3),
+        join(faces_textures_idx, 3),
+        faces_materials_idx[:, 0] if len(faces_materials_idx) else [],
+        state["material_names"],
+        state["mtl_path"],
+    )
+
+
+def _parse_obj(f, data_dir: str, vectorized: bool = True):
+    """
+    Load a mesh from a file-like object. See load_obj function for more details
+    about the return values.
+
+    Args:
+        f: file-like object.
+        data_dir: the directory in which an mtl file is expected.
+        vectorized: whether to try the vectorized parser, which converts
+            the whole file with numpy. It falls back to the line by line
+            reference parser for anything unusual, so the results and any
+            errors are the same either way.
+
+    Returns:
+        9-element tuple (verts, normals, verts_uvs, faces_verts_idx,
+        faces_normals_idx, faces_textures_idx, faces_materials_idx,
+        material_names, mtl_path). The data members are lists, or arrays
+        from the vectorized parser, and are empty lists if there is no data.
+    """
+    if not vectorized or not hasattr(f, "read"):
+        return _parse_obj_lines(f, data_dir)
+
+    data = f.read()
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    parsed = _parse_obj_buffer(data, data_dir)
+    if parsed is None:
+        parsed = _parse_obj_lines(data.split(b"\n"), data_dir)
+    return parsed
+
+
 def _load_materials(
     material_names: List[str],
     f: Optional[str],
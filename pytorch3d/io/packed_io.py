@@ -0,0 +1,550 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-unsafe
+
+
+"""
+This module implements loading and saving meshes and point clouds in the
+.p3d format, a simple uncompressed binary container whose arrays can be
+memory-mapped and used as tensors without any parsing, and functions which
+use it to cache files of other formats.
+
+A .p3d file consists of
+
+    - the 8 bytes b"P3DPACK1",
+    - the length of the header as a little endian uint64,
+    - the header, which is utf-8 encoded JSON, describing the kind of data
+      ("mesh" or "pointcloud"), any metadata, and for each array its numpy
+      dtype string, its shape and its offset from the start of the file,
+    - the arrays, each in C order and starting at a multiple of 64 bytes.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import torch
+from iopath.common.file_io import PathManager
+from pytorch3d.common.datatypes import Device
+from pytorch3d.io.utils import _open_file, PathOrStr
+from pytorch3d.renderer import TexturesAtlas, TexturesUV, TexturesVertex
+from pytorch3d.structures import Meshes, Pointclouds
+
+from .pluggable_formats import (
+    endswith,
+    MeshFormatInterpreter,
+    PointcloudFormatInterpreter,
+)
+
+
+_MAGIC = b"P3DPACK1"
+_LENGTH_STRUCT = struct.Struct("<Q")
+_ALIGNMENT = 64
+
+
+def _save_packed(f, kind: str, arrays: Dict[str, np.ndarray], metadata: dict) -> None:
+    """
+    Write arrays to a binary file-like object in the .p3d format.
+
+    Args:
+        f: binary file-like object to write to.
+        kind: "mesh" or "pointcloud".
+        arrays: map from names to the arrays to be stored.
+        metadata: JSON-serializable dictionary of extra information.
+    """
+    arrays = {
+        name: np.ascontiguousarray(array.astype(array.dtype.newbyteorder("<")))
+        for name, array in arrays.items()
+    }
+
+    # The offsets depend on the length of the header, which depends on the
+    # offsets, so the arrays start at the first aligned position after it.
+    def encode_header(start: int) -> Tuple[bytes, Dict[str, int]]:
+        offsets = {}
+        layout = {}
+        offset = start
+        for name, array in arrays.items():
+            offsets[name] = offset
+            layout[name] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+            }
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        header = {"kind": kind, "metadata": metadata, "arrays": layout}
+        return json.dumps(header).encode("utf-8"), offsets
+
+    prefix_size = len(_MAGIC) + _LENGTH_STRUCT.size
+    start = _ALIGNMENT
+    header, offsets = encode_header(start)
+    while prefix_size + len(header) > start:
+        start = -(-(prefix_size + len(header)) // _ALIGNMENT) * _ALIGNMENT
+        header, offsets = encode_header(start)
+
+    f.write(_MAGIC)
+    f.write(_LENGTH_STRUCT.pack(len(header)))
+    f.write(header)
+    position = prefix_size + len(header)
+    for name, array in arrays.items():
+        f.write(b"\0" * (offsets[name] - position))
+        f.write(array.tobytes())
+        position = offsets[name] + array.nbytes
+
+
+def _load_packed(
+    f, path_manager: PathManager, mmap: bool
+) -> Optional[Tuple[str, Dict[str, np.ndarray], dict]]:
+    """
+    Read the arrays from a .p3d file.
+
+    Args:
+        f: A binary file-like object, a pathlib path or a string containing
+            a file name.
+        path_manager: PathManager for interpreting f if it is a str.
+        mmap: whether to memory-map the file instead of reading it, if it
+            is on the local filesystem. The pages are then only read when
+            the data is used, and only copied if they are written to.
+
+    Returns:
+        None if f is a stream which does not start like a .p3d file, in
+        which case it is undisturbed. Otherwise a tuple of
+            kind: "mesh" or "pointcloud".
+            arrays: map from names to the arrays, which are views of the
+                mapped file if mmap is True.
+            metadata: dictionary of extra information.
+    """
+    if isinstance(f, str):
+        f = Path(path_manager.get_local_path(f))
+    if isinstance(f, Path):
+        with open(f, "rb") as stream:
+            prefix = stream.read(len(_MAGIC) + _LENGTH_STRUCT.size)
+            if prefix[: len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"{f} is not a .p3d file.")
+            (header_length,) = _LENGTH_STRUCT.unpack(prefix[len(_MAGIC) :])
+            header = json.loads(stream.read(header_length).decode("utf-8"))
+            if mmap:
+                data = np.memmap(stream, dtype=np.uint8, mode="c")
+            else:
+                stream.seek(0)
+                data = np.frombuffer(bytearray(stream.read()), dtype=np.uint8)
+    else:
+        old_offset = f.tell()
+        if f.read(len(_MAGIC)) != _MAGIC:
+            f.seek(old_offset)
+            return None
+        f.seek(old_offset)
+        data = np.frombuffer(bytearray(f.read()), dtype=np.uint8)
+        prefix_size = len(_MAGIC) + _LENGTH_STRUCT.size
+        (header_length,) = _LENGTH_STRUCT.unpack(data[len(_MAGIC) : prefix_size])
+        header_bytes = data[prefix_size : prefix_size + header_length].tobytes()
+        header = json.loads(header_bytes.decode("utf-8"))
+
+    arrays = {}
+    for name, layout in header["arrays"].items():
+        dtype = np.dtype(layout["dtype"])
+        shape = tuple(layout["shape"])
+        start = layout["offset"]
+        end = start + dtype.itemsize * int(np.prod(shape))
+        if end > len(data):
+            raise ValueError(f"Not enough data for {name}.")
+        array = data[start:end].view(dtype).reshape(shape)
+        if not dtype.isnative:
+            array = array.astype(dtype.newbyteorder("="))
+        arrays[name] = array
+    return header["kind"], arrays, header["metadata"]
+
+
+def _to_numpy(tensor: torch.Tensor) -> np.ndarray:
+    return tensor.detach().cpu().numpy()
+
+
+def _save_mesh_packed(f, mesh: Meshes) -> None:
+    """
+    Write the first mesh of a Meshes object to a binary file-like object
+    in the .p3d format, including its normals and textures where possible.
+    """
+    arrays = {
+        "verts": _to_numpy(mesh.verts_list()[0]).astype(np.float32),
+        "faces": _to_numpy(mesh.faces_list()[0]).astype(np.int64),
+    }
+    metadata = {}
+    if mesh.has_verts_normals():
+        arrays["verts_normals"] = _to_numpy(mesh.verts_normals_list()[0])
+    textures = mesh.textures
+    if isinstance(textures, TexturesUV) and textures.maps_ids_padded() is None:
+        arrays["maps"] = _to_numpy(textures.maps_list()[0])
+        arrays["faces_uvs"] = _to_numpy(textures.faces_uvs_list()[0])
+        arrays["verts_uvs"] = _to_numpy(textures.verts_uvs_list()[0])
+        metadata["textures"] = "uv"
+        metadata["padding_mode"] = textures.padding_mode
+        metadata["align_corners"] = textures.align_corners
+        metadata["sampling_mode"] = textures.sampling_mode
+    elif isinstance(textures, TexturesVertex):
+        arrays["verts_features"] = _to_numpy(textures.verts_features_list()[0])
+        metadata["textures"] = "vertex"
+    elif isinstance(textures, TexturesAtlas):
+        arrays["atlas"] = _to_numpy(textures.atlas_list()[0])
+        metadata["textures"] = "atlas"
+    elif textures is not None:
+        warnings.warn(f"Texture of type {type(textures).__name__} will not be saved.")
+    _save_packed(f, "mesh", arrays, metadata)
+
+
+def _load_mesh_packed(
+    f,
+    *,
+    path_manager: PathManager,
+    include_textures: bool,
+    device: Device,
+    mmap: bool,
+) -> Optional[Meshes]:
+    """
+    Read a mesh from a .p3d file. Arguments and return as for _load_packed,
+    except that the data is returned as a Meshes object.
+    """
+    loaded = _load_packed(f, path_manager=path_manager, mmap=mmap)
+    if loaded is None:
+        return None
+    kind, arrays, metadata = loaded
+    if kind != "mesh":
+        raise ValueError(f"Expected a mesh but the file contains a {kind}.")
+
+    tensors = {name: torch.from_numpy(array) for name, array in arrays.items()}
+    textures = None
+    if include_textures:
+        if metadata.get("textures") == "uv":
+            textures = TexturesUV(
+                maps=[tensors["maps"].to(device)],
+                faces_uvs=[tensors["faces_uvs"].to(device)],
+                verts_uvs=[tensors["verts_uvs"].to(device)],
+                padding_mode=metadata["padding_mode"],
+                align_corners=metadata["align_corners"],
+                sampling_mode=metadata["sampling_mode"],
+            )
+        elif metadata.get("textures") == "vertex":
+            textures = TexturesVertex([tensors["verts_features"].to(device)])
+        elif metadata.get("textures") == "atlas":
+            textures = TexturesAtlas([tensors["atlas"].to(device)])
+
+    verts_normals = None
+    if "verts_normals" in tensors:
+        verts_normals = [tensors["verts_normals"].to(device)]
+    return Meshes(
+        verts=[tensors["verts"].to(device)],
+        faces=[tensors["faces"].to(device)],
+        textures=textures,
+        verts_normals=verts_normals,
+    )
+
+
+def _save_pointcloud_packed(f, pointcloud: Pointclouds) -> None:
+    """
+    Write the first point cloud of a Pointclouds object to a binary
+    file-like object in the .p3d format, including normals and features.
+    """
+    arrays = {"points": _to_numpy(pointcloud.points_list()[0]).astype(np.float32)}
+    normals = pointcloud.normals_list()
+    if normals is not None:
+        arrays["normals"] = _to_numpy(normals[0])
+    features = pointcloud.features_list()
+    if features is not None:
+        arrays["features"] = _to_numpy(features[0])
+    _save_packed(f, "pointcloud", arrays, {})
+
+
+def _load_pointcloud_packed(
+    f, *, path_manager: PathManager, device: Device, mmap: bool
+) -> Optional[Pointclouds]:
+    """
+    Read a point cloud from a .p3d file. Arguments and return as for
+    _load_packed, except that the data is returned as a Pointclouds object.
+    """
+    loaded = _load_packed(f, path_manager=path_manager, mmap=mmap)
+    if loaded is None:
+        return None
+    kind, arrays, _ = loaded
+    if kind != "pointcloud":
+        raise ValueError(f"Expected a pointcloud but the file contains a {kind}.")
+
+    tensors = {name: torch.from_numpy(array) for name, array in arrays.items()}
+    normals = None
+    if "normals" in tensors:
+        normals = [tensors["normals"].to(device)]
+    features = None
+    if "features" in tensors:
+        features = [tensors["features"].to(device)]
+    return Pointclouds(
+        points=[tensors["points"].to(device)], normals=normals, features=features
+    )
+
+
+class MeshPackedFormat(MeshFormatInterpreter):
+    """
+    Loads and saves meshes in the binary .p3d format, which stores the
+    vertices, faces, vertex normals and textures of type TexturesUV (with a
+    single map per mesh), TexturesVertex or TexturesAtlas as raw arrays.
+    Files are memory-mapped when loaded, so loading is nearly free and the
+    data is only read from disk when it is used.
+    """
+
+    def __init__(self) -> None:
+        self.known_suffixes = (".p3d",)
+
+    def read(
+        self,
+        path: PathOrStr,
+        include_textures: bool,
+        device,
+        path_manager: PathManager,
+        mmap: bool = True,
+        **kwargs,
+    ) -> Optional[Meshes]:
+        """
+        Extra optional args:
+            mmap: (bool) Whether to memory-map the file instead of reading
+                        it, if it is on the local filesystem.
+        """
+        if not endswith(path, self.known_suffixes):
+            return None
+
+        return _load_mesh_packed(
+            path,
+            path_manager=path_manager,
+            include_textures=include_textures,
+            device=device,
+            mmap=mmap,
+        )
+
+    def save(
+        self,
+        data: Meshes,
+        path: PathOrStr,
+        path_manager: PathManager,
+        binary: Optional[bool],
+        **kwargs,
+    ) -> bool:
+        if not endswith(path, self.known_suffixes):
+            return False
+
+        with _open_file(path, path_manager, "wb") as f:
+            _save_mesh_packed(f, data)
+        return True
+
+
+class PointcloudPackedFormat(PointcloudFormatInterpreter):
+    """
+    Loads and saves point clouds in the binary .p3d format, which stores the
+    points, normals and features as raw arrays. Files are memory-mapped when
+    loaded.
+    """
+
+    def __init__(self) -> None:
+        self.known_suffixes = (".p3d",)
+
+    def read(
+        self,
+        path: PathOrStr,
+        device,
+        path_manager: PathManager,
+        mmap: bool = True,
+        **kwargs,
+    ) -> Optional[Pointclouds]:
+        """
+        Extra optional args:
+            mmap: (bool) Whether to memory-map the file instead of reading
+                        it, if it is on the local filesystem.
+        """
+        if not endswith(path, self.known_suffixes):
+            return None
+
+        return _load_pointcloud_packed(
+            path, path_manager=path_manager, device=device, mmap=mmap
+        )
+
+    def save(
+        self,
+        data: Pointclouds,
+        path: PathOrStr,
+        path_manager: PathManager,
+        binary: Optional[bool],
+        **kwargs,
+    ) -> bool:
+        if not endswith(path, self.known_suffixes):
+            return False
+
+        with _open_file(path, path_manager, "wb") as f:
+            _save_pointcloud_packed(f, data)
+        return True
+
+
+def _cache_file(
+    path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    path_manager,
+    tag: str,
+    load_kwargs: Dict[str, Any],
+) -> str:
+    """
+    Name of the file in cache_dir for the given source file, which changes
+    whenever the source file is modified. The tag and the keyword arguments
+    with which the file is loaded are also part of the key.
+    """
+    local_path = os.path.abspath(path_manager.get_local_path(str(path)))
+    stat = os.stat(local_path)
+    key = f"{local_path}\0{stat.st_mtime_ns}\0{stat.st_size}\0{tag}"
+    key += f"\0{sorted(load_kwargs.items())!r}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(str(cache_dir), digest + ".p3d")
+
+
+def _write_cache_file(cache_file: str, save_function, data) -> None:
+    """
+    Write a cache file atomically, so that concurrent readers never see a
+    partial file.
+    """
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temp_file = tempfile.mkstemp(suffix=".p3d.tmp", dir=cache_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            save_function(f, data)
+        os.replace(temp_file, cache_file)
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+
+def load_mesh_cached(
+    path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    io=None,
+    include_textures: bool = True,
+    device: Device = "cpu",
+    **kwargs,
+) -> Meshes:
+    """
+    Load a mesh from a file in any format readable by io, using a .p3d copy
+    of it in cache_dir if there is one. Otherwise the mesh is loaded as usual
+    and a copy is written to cache_dir. The copy is keyed on the source path
+    and its modification time, so an edited file is loaded afresh, and on
+    the keyword arguments, e.g. create_texture_atlas.
+
+    Args:
+        path: file to read.
+        cache_dir: directory in which to keep the .p3d copies.
+        io: IO object with which to read the file. Default: IO().
+        include_textures: whether to load texture information.
+        device: Device (as str or torch.device) on which to load the data.
+        **kwargs: passed to io.load_mesh when the file is not cached.
+
+    Returns:
+        new Meshes object containing one mesh.
+    """
+    if io is None:
+        from .pluggable import IO
+
+        io = IO()
+    cache_file = _cache_file(
+        path, cache_dir, io.path_manager, f"mesh {include_textures}", kwargs
+    )
+    if os.path.isfile(cache_file):
+        return _load_mesh_packed(
+            Path(cache_file),
+            path_manager=io.path_manager,
+            include_textures=include_textures,
+            device=device,
+            mmap=True,
+        )
+    mesh = io.load_mesh(
+        path, include_textures=include_textures, device=device, **kwargs
+    )
+    _write_cache_file(cache_file, _save_mesh_packed, mesh)
+    return mesh
+
+
+def load_pointcloud_cached(
+    path: Union[str, Path],
+    cache_dir: Union[str, Path],
+    io=None,
+    device: Device = "cpu",
+    **kwargs,
+) -> Pointclouds:
+    """
+    Load a point cloud from a file in any format readable by io, using a .p3d
+    copy of it in cache_dir if there is one, as for load_mesh_cached.
+
+    Args:
+        path: file to read.
+        cache_dir: directory in which to keep the .p3d copies.
+        io: IO object with which to read the file. Default: IO().
+        device: Device (as str or torch.device) on which to load the data.
+        **kwargs: passed to io.load_pointcloud when the file is not cached.
+
+    Returns:
+        new Pointclouds object containing one point cloud.
+    """
+    if io is None:
+        from .pluggable import IO
+
+        io = IO()
+    cache_file = _cache_file(path, cache_dir, io.path_manager, "pointcloud", kwargs)
+    if os.path.isfile(cache_file):
+        return _load_pointcloud_packed(
+            Path(cache_file), path_manager=io.path_manager, device=device, mmap=True
+        )
+    pointcloud = io.load_pointcloud(path, device=device, **kwargs)
+    _write_cache_file(cache_file, _save_pointcloud_packed, pointcloud)
+    return pointcloud
+
+
+def save_tensors_packed(
+    path: Union[str, Path], tensors: Dict[str, torch.Tensor]
+) -> None:
+    """
+    Save a dictionary of CPU tensors to a .p3d file. The file is written
+    atomically, so that concurrent readers never see a partial file.
+
+    Args:
+        path: local file to write.
+        tensors: map from names to the tensors to be stored.
+    """
+    arrays = {name: tensor.detach().numpy() for name, tensor in tensors.items()}
+    _write_cache_file(
+        str(path), lambda f, data: _save_packed(f, "tensors", data, {}), arrays
+    )
+
+
+def load_tensors_packed(
+    path: Union[str, Path],
+    path_manager: Optional[PathManager] = None,
+    mmap: bool = True,
+) -> Dict[str, torch.Tensor]:
+    """
+    Load the tensors from a .p3d file, e.g. one written by save_tensors_packed.
+
+    Args:
+        path: file to read.
+        path_manager: PathManager for interpreting path. Default: PathManager().
+        mmap: whether to memory-map the file instead of reading it, if it is
+            on the local filesystem.
+
+    Returns:
+        dictionary of the stored tensors, which share memory with the mapped
+        file if mmap is True.
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+    """
+    if path_manager is None:
+        path_manager = PathManager()
+    _, arrays, _ = _load_packed(path, path_manager=path_manager, mmap=mmap)
+    return {name: torch.from_numpy(array) for name, array in arrays.items()}
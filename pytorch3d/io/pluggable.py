@@ -9,7 +9,7 @@
 
 from collections import deque
 from pathlib import Path
-from typing import Deque, Optional, Union
+from typing import Deque, Iterator, Optional, Union
 
 from iopath.common.file_io import PathManager
 from pytorch3d.common.datatypes import Device
@@ -17,6 +17,7 @@ from pytorch3d.structures import Meshes, Pointclouds
 
 from .obj_io import MeshObjFormat
 from .off_io import MeshOffFormat
+from .packed_io import MeshPackedFormat, PointcloudPackedFormat
 from .pluggable_formats import MeshFormatInterpreter, PointcloudFormatInterpreter
 from .ply_io import MeshPlyFormat, PointcloudPlyFormat
 
@@ -75,6 +76,8 @@ class IO:
             self.register_default_formats()
 
     def register_default_formats(self) -> None:
+        self.register_meshes_format(MeshPackedFormat())
+        self.register_pointcloud_format(PointcloudPackedFormat())
         self.register_meshes_format(MeshObjFormat())
         self.register_meshes_format(MeshOffFormat())
         self.register_meshes_format(MeshPlyFormat())
@@ -194,6 +197,43 @@ class IO:
 
         raise ValueError(f"No point cloud interpreter found to read {path}.")
 
+    def iter_pointcloud_chunks(
+        self,
+        path: Union[str, Path],
+        chunk_points: int,
+        device: Device = "cpu",
+        **kwargs,
+    ) -> Iterator[Pointclouds]:
+        """
+        Attempt to read a point cloud from the given file in chunks of at
+        most chunk_points points, using a registered format. Only one chunk
+        is held in memory at a time, so this can be used to process files
+        which are too large to load with load_pointcloud.
+
+        Args:
+            path: file to read
+            chunk_points: maximum number of points in each chunk.
+            device: Device (as str or torch.device) on which to load the data.
+
+        Returns:
+            iterator of Pointclouds objects each containing one point cloud,
+            which together contain the points of the file in order.
+        """
+        if chunk_points <= 0:
+            raise ValueError("chunk_points must be positive.")
+        for pointcloud_interpreter in self.pointcloud_interpreters:
+            chunks = pointcloud_interpreter.read_chunks(
+                path,
+                path_manager=self.path_manager,
+                device=device,
+                chunk_points=chunk_points,
+                **kwargs,
+            )
+            if chunks is not None:
+                return chunks
+
+        raise ValueError(f"No point cloud interpreter found to read {path} in chunks.")
+
     def save_pointcloud(
         self,
         data: Pointclouds,
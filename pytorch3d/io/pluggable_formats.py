@@ -8,7 +8,7 @@
 
 
 import pathlib
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 
 from iopath.common.file_io import PathManager
 from pytorch3d.common.datatypes import Device
@@ -140,3 +140,30 @@ class PointcloudFormatInterpreter:
             True: on success.
         """
         raise NotImplementedError()
+
+    def read_chunks(
+        self,
+        path: PathOrStr,
+        device: Device,
+        path_manager: PathManager,
+        chunk_points: int,
+        **kwargs,
+    ) -> Optional[Iterator[Pointclouds]]:
+        """
+        Read the points from the specified file a bounded number at a time,
+        so that files larger than memory can be processed. Formats which
+        cannot be read in this way need not override this.
+
+        Args:
+            path: path to load.
+            device: torch.device to load data on to.
+            path_manager: PathManager to interpret the path.
+            chunk_points: maximum number of points in each chunk.
+
+        Returns:
+            None if self is not the appropriate object to interpret the given
+                path, or cannot read it in chunks.
+            Otherwise, an iterator of 1-element Pointclouds objects which
+                together contain the points of the file in order.
+        """
+        return None
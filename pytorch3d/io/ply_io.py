@@ -19,7 +19,8 @@ import warnings
 from collections import namedtuple
 from dataclasses import asdict, dataclass
 from io import BytesIO, TextIOBase
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -545,26 +546,17 @@ def _read_ply_fixed_size_element_binary(
     return [data.reshape(definition.count, len(definition.properties))]
 
 
-def _read_ply_element_binary_nolists(f, definition: _PlyElementType, big_endian: bool):
+def _split_ply_element_binary_nolists(
+    data: np.ndarray, definition: _PlyElementType, big_endian: bool
+):
     """
-    Given an element which has no lists, read the corresponding data as tuple
-    of numpy arrays, one for each set of adjacent columns with the same type.
-
-    For example, given
-
-        element vertex 8
-        property float x
-        property float y
-        property float z
-        property uchar red
-        property uchar green
-        property uchar blue
-
-    the output will have two arrays, the first containing (x,y,z)
-    and the second (red,green,blue).
+    Given the raw bytes of an element which has no lists, as a 2D uint8 array
+    with one row per occurrence, split it into numpy arrays, one for each set
+    of adjacent columns with the same type. The arrays are views of data,
+    except when the byte order must be swapped.
 
     Args:
-        f: file-like object being read.
+        data: uint8 array of shape (definition.count, bytes per element).
         definition: The element object which describes what we are reading.
         big_endian: (bool) whether the document is encoded as big endian.
 
@@ -572,9 +564,6 @@ def _read_ply_element_binary_nolists(f, definition: _PlyElementType, big_endian:
         List of 2D numpy arrays corresponding to the data. The rows are the different
         values.
     """
-    size = sum(_PLY_TYPES[prop.data_type].size for prop in definition.properties)
-    needed_bytes = size * definition.count
-    data = _read_raw_array(f, definition.name, needed_bytes).reshape(-1, size)
     offset = 0
     pieces = []
     for dtype, it in itertools.groupby(p.data_type for p in definition.properties):
@@ -599,6 +588,78 @@ def _read_ply_element_binary_nolists(f, definition: _PlyElementType, big_endian:
     return pieces
 
 
+def _read_ply_element_binary_nolists(f, definition: _PlyElementType, big_endian: bool):
+    """
+    Given an element which has no lists, read the corresponding data as tuple
+    of numpy arrays, one for each set of adjacent columns with the same type.
+
+    For example, given
+
+        element vertex 8
+        property float x
+        property float y
+        property float z
+        property uchar red
+        property uchar green
+        property uchar blue
+
+    the output will have two arrays, the first containing (x,y,z)
+    and the second (red,green,blue).
+
+    Args:
+        f: file-like object being read.
+        definition: The element object which describes what we are reading.
+        big_endian: (bool) whether the document is encoded as big endian.
+
+    Returns:
+        List of 2D numpy arrays corresponding to the data. The rows are the different
+        values.
+    """
+    size = sum(_PLY_TYPES[prop.data_type].size for prop in definition.properties)
+    needed_bytes = size * definition.count
+    data = _read_raw_array(f, definition.name, needed_bytes).reshape(-1, size)
+    return _split_ply_element_binary_nolists(data, definition, big_endian)
+
+
+def _try_memmap_ply_element_binary(
+    f, definition: _PlyElementType, big_endian: bool
+) -> Optional[list]:
+    """
+    If definition is an element which has no lists and f is a real file,
+    map the element's data from the file instead of reading it, and move f
+    past it. The pages are only read when the data is used, and only copied
+    if they are written to.
+
+    Args:
+        f: file object being read.
+        definition: The element object which describes what we are reading.
+        big_endian: (bool) whether the document is encoded as big endian.
+
+    Returns:
+        List of 2D numpy arrays as for _read_ply_element_binary_nolists,
+        which are views of the memory-mapped file unless the byte order must
+        be swapped, or None if the element cannot be mapped, in which case f
+        is undisturbed.
+    """
+    if not definition.is_fixed_size():
+        return None
+    try:
+        f.fileno()
+    except (AttributeError, OSError):
+        # For example a BytesIO.
+        return None
+    size = sum(_PLY_TYPES[prop.data_type].size for prop in definition.properties)
+    offset = f.tell()
+    file_size = os.fstat(f.fileno()).st_size
+    if offset + size * definition.count > file_size:
+        raise ValueError("Not enough data for %s." % definition.name)
+    data = np.memmap(
+        f, dtype=np.uint8, mode="c", offset=offset, shape=(definition.count, size)
+    )
+    f.seek(offset + size * definition.count)
+    return _split_ply_element_binary_nolists(data, definition, big_endian)
+
+
 def _try_read_ply_constant_list_binary(
     f, definition: _PlyElementType, big_endian: bool
 ):
@@ -675,7 +736,9 @@ def _try_read_ply_constant_list_binary(
     return output
 
 
-def _read_ply_element_binary(f, definition: _PlyElementType, big_endian: bool) -> list:
+def _read_ply_element_binary(
+    f, definition: _PlyElementType, big_endian: bool, mmap: bool = False
+) -> list:
     """
     Decode all instances of a single element from a binary .ply file.
 
@@ -683,6 +746,8 @@ def _read_ply_element_binary(f, definition: _PlyElementType, big_endian: bool) -
         f: file-like object being read.
         definition: The element object which describes what we are reading.
         big_endian: (bool) whether the document is encoded as big endian.
+        mmap: (bool) whether to memory-map elements without lists
+            instead of reading them, if f is a real file.
 
     Returns:
         In simple cases where every element has the same size, 2D numpy array
@@ -694,6 +759,10 @@ def _read_ply_element_binary(f, definition: _PlyElementType, big_endian: bool) -
     if not definition.count:
         return []
 
+    if mmap:
+        data = _try_memmap_ply_element_binary(f, definition, big_endian)
+        if data is not None:
+            return data
     if definition.is_constant_type_fixed_size():
         return _read_ply_fixed_size_element_binary(f, definition, big_endian)
     if definition.is_fixed_size():
@@ -738,12 +807,13 @@ def _read_ply_element_binary(f, definition: _PlyElementType, big_endian: bool) -
     return data
 
 
-def _load_ply_raw_stream(f) -> Tuple[_PlyHeader, dict]:
+def _load_ply_raw_stream(f, mmap: bool = False) -> Tuple[_PlyHeader, dict]:
     """
     Implementation for _load_ply_raw which takes a stream.
 
     Args:
         f:  A binary or text file-like object.
+        mmap: whether to memory-map binary elements without lists.
 
     Returns:
         header: A _PlyHeader object describing the metadata in the ply file.
@@ -765,14 +835,16 @@ def _load_ply_raw_stream(f) -> Tuple[_PlyHeader, dict]:
             )
         big = header.big_endian
         for element in header.elements:
-            elements[element.name] = _read_ply_element_binary(f, element, big)
+            elements[element.name] = _read_ply_element_binary(f, element, big, mmap)
     end = f.read().strip()
     if len(end) != 0:
         raise ValueError("Extra data at end of file: " + str(end[:20]))
     return header, elements
 
 
-def _load_ply_raw(f, path_manager: PathManager) -> Tuple[_PlyHeader, dict]:
+def _load_ply_raw(
+    f, path_manager: PathManager, mmap: bool = False
+) -> Tuple[_PlyHeader, dict]:
     """
     Load the data from a .ply file.
 
@@ -782,6 +854,9 @@ def _load_ply_raw(f, path_manager: PathManager) -> Tuple[_PlyHeader, dict]:
             If the ply file is binary, a text stream is not supported.
             It is recommended to use a binary stream.
         path_manager: PathManager for loading if f is a str.
+        mmap: whether to memory-map binary elements without lists, such as
+            the vertices, instead of reading them. Then the arrays returned
+            for those elements are views of the file.
 
     Returns:
         header: A _PlyHeader object describing the metadata in the ply file.
@@ -791,8 +866,11 @@ def _load_ply_raw(f, path_manager: PathManager) -> Tuple[_PlyHeader, dict]:
                   If it has no lists but more than one type, it will be a list of arrays.
                   If not, it is a list of the relevant property values.
     """
+    if mmap and isinstance(f, str):
+        # np.memmap needs a file on the local filesystem.
+        f = Path(path_manager.get_local_path(f))
     with _open_file(f, path_manager, "rb") as f:
-        header, elements = _load_ply_raw_stream(f)
+        header, elements = _load_ply_raw_stream(f, mmap)
     return header, elements
 
 
@@ -900,12 +978,48 @@ class _VertsData:
     verts_texture_uvs: Optional[torch.Tensor] = None
 
 
-def _get_verts(header: _PlyHeader, elements: dict) -> _VertsData:
+def _columns_to_tensor(
+    array: np.ndarray, idxs: List[int], share_memory: bool
+) -> torch.Tensor:
+    """
+    Get some columns of a 2D array as a FloatTensor.
+
+    Args:
+        array: 2D numpy array.
+        idxs: List[int] of columns.
+        share_memory: If True, and the columns are adjacent and already
+                    float32, return a view of array instead of a copy.
+
+    Returns:
+        FloatTensor of shape (array.shape[0], len(idxs)).
+    """
+    start, end = idxs[0], idxs[0] + len(idxs)
+    if (
+        share_memory
+        and _can_share_float_columns(array)
+        and list(idxs) == list(range(start, end))
+    ):
+        return torch.from_numpy(array[:, start:end])
+    return torch.tensor(array[:, idxs], dtype=torch.float32)
+
+
+def _can_share_float_columns(array: np.ndarray) -> bool:
+    """
+    Whether torch.from_numpy can view columns of a 2D array as a FloatTensor.
+    """
+    return array.dtype == np.float32 and array.strides[0] % array.itemsize == 0
+
+
+def _get_verts(
+    header: _PlyHeader, elements: dict, share_memory: bool = False
+) -> _VertsData:
     """
     Get the vertex locations, colors and normals from a parsed ply file.
 
     Args:
         header, elements: as returned from load_ply_raw.
+        share_memory: If True, the verts and normals are views of the
+                    arrays in elements when possible instead of copies.
 
     Returns:
         _VertsData object
@@ -917,7 +1031,25 @@ def _get_verts(header: _PlyHeader, elements: dict) -> _VertsData:
     if not isinstance(vertex, list):
         raise ValueError("Invalid vertices in file.")
     vertex_head = next(head for head in header.elements if head.name == "vertex")
+    return _get_verts_from_element(vertex_head, vertex, share_memory)
+
+
+def _get_verts_from_element(
+    vertex_head: _PlyElementType, vertex: list, share_memory: bool = False
+) -> _VertsData:
+    """
+    Get the vertex locations, colors and normals from the data of the
+    vertex element.
 
+    Args:
+        vertex_head: description of the vertex element.
+        vertex: the element's data, as returned from _read_ply_element_ascii
+                or _read_ply_element_binary.
+        share_memory: as for _get_verts.
+
+    Returns:
+        _VertsData object
+    """
     column_idxs = _get_verts_column_indices(vertex_head)
 
     # Case of no vertices
@@ -936,6 +1068,8 @@ def _get_verts(header: _PlyHeader, elements: dict) -> _VertsData:
         and vertex[0].ndim == 2
         and vertex[0].shape[1] == 3
     ):
+        if share_memory:
+            return _VertsData(verts=_columns_to_tensor(vertex[0], [0, 1, 2], True))
         return _VertsData(verts=_make_tensor(vertex[0], cols=3, dtype=torch.float32))
 
     vertex_colors = None
@@ -945,14 +1079,14 @@ def _get_verts(header: _PlyHeader, elements: dict) -> _VertsData:
     if len(vertex) == 1:
         # This is the case where the whole vertex element has one type,
         # so it was read as a single array and we can index straight into it.
-        verts = torch.tensor(vertex[0][:, column_idxs.point_idxs], dtype=torch.float32)
+        verts = _columns_to_tensor(vertex[0], column_idxs.point_idxs, share_memory)
         if column_idxs.color_idxs is not None:
             vertex_colors = column_idxs.color_scale * torch.tensor(
                 vertex[0][:, column_idxs.color_idxs], dtype=torch.float32
             )
         if column_idxs.normal_idxs is not None:
-            vertex_normals = torch.tensor(
-                vertex[0][:, column_idxs.normal_idxs], dtype=torch.float32
+            vertex_normals = _columns_to_tensor(
+                vertex[0], column_idxs.normal_idxs, share_memory
             )
         if column_idxs.texture_uv_idxs is not None:
             vertex_texture_uvs = torch.tensor(
@@ -969,18 +1103,35 @@ def _get_verts(header: _PlyHeader, elements: dict) -> _VertsData:
             for partnum, array in enumerate(vertex)
             for col in range(array.shape[1])
         ]
-        verts = torch.empty(size=(vertex_head.count, 3), dtype=torch.float32)
-        for axis in range(3):
-            partnum, col = prop_to_partnum_col[column_idxs.point_idxs[axis]]
-            verts.numpy()[:, axis] = vertex[partnum][:, col]
-            # Note that in the previous line, we made the assignment
-            # as numpy arrays by casting verts. If we took the (more
-            # obvious) method of converting the right hand side to
-            # torch, then we might have an extra data copy because
-            # torch wants contiguity. The code would be like:
-            #   if not vertex[partnum].flags["C_CONTIGUOUS"]:
-            #      vertex[partnum] = np.ascontiguousarray(vertex[partnum])
-            #   verts[:, axis] = torch.tensor((vertex[partnum][:, col]))
+
+        def shared_columns(idxs):
+            # If share_memory and the columns are adjacent float32 columns
+            # of one part, a view of them, otherwise None.
+            partnum, col = prop_to_partnum_col[idxs[0]]
+            cols = list(range(col, col + len(idxs)))
+            if (
+                not share_memory
+                or not _can_share_float_columns(vertex[partnum])
+                or [prop_to_partnum_col[i] for i in idxs]
+                != [(partnum, c) for c in cols]
+            ):
+                return None
+            return _columns_to_tensor(vertex[partnum], cols, True)
+
+        verts = shared_columns(column_idxs.point_idxs)
+        if verts is None:
+            verts = torch.empty(size=(vertex_head.count, 3), dtype=torch.float32)
+            for axis in range(3):
+                partnum, col = prop_to_partnum_col[column_idxs.point_idxs[axis]]
+                verts.numpy()[:, axis] = vertex[partnum][:, col]
+                # Note that in the previous line, we made the assignment
+                # as numpy arrays by casting verts. If we took the (more
+                # obvious) method of converting the right hand side to
+                # torch, then we might have an extra data copy because
+                # torch wants contiguity. The code would be like:
+                #   if not vertex[partnum].flags["C_CONTIGUOUS"]:
+                #      vertex[partnum] = np.ascontiguousarray(vertex[partnum])
+                #   verts[:, axis] = torch.tensor((vertex[partnum][:, col]))
         if column_idxs.color_idxs is not None:
             vertex_colors = torch.empty(
                 size=(vertex_head.count, 3), dtype=torch.float32
@@ -990,6 +1141,8 @@ def _get_verts(header: _PlyHeader, elements: dict) -> _VertsData:
                 vertex_colors.numpy()[:, color] = vertex[partnum][:, col]
             vertex_colors *= column_idxs.color_scale
         if column_idxs.normal_idxs is not None:
+            vertex_normals = shared_columns(column_idxs.normal_idxs)
+        if column_idxs.normal_idxs is not None and vertex_normals is None:
             vertex_normals = torch.empty(
                 size=(vertex_head.count, 3), dtype=torch.float32
             )
@@ -1032,7 +1185,7 @@ class _PlyData:
     verts_texture_uvs: Optional[torch.Tensor]
 
 
-def _load_ply(f, *, path_manager: PathManager) -> _PlyData:
+def _load_ply(f, *, path_manager: PathManager, mmap: bool = False) -> _PlyData:
     """
     Load the data from a .ply file.
 
@@ -1043,13 +1196,16 @@ def _load_ply(f, *, path_manager: PathManager) -> _PlyData:
             ply format, then a text stream is not supported.
             It is easiest to use a binary stream in all cases.
         path_manager: PathManager for loading if f is a str.
+        mmap: If True and the file is binary, memory-map the vertex data
+            instead of reading it, and return the verts and normals as views
+            of the file where the layout allows.
 
     Returns:
         _PlyData object
     """
-    header, elements = _load_ply_raw(f, path_manager=path_manager)
+    header, elements = _load_ply_raw(f, path_manager=path_manager, mmap=mmap)
 
-    verts_data = _get_verts(header, elements)
+    verts_data = _get_verts(header, elements, share_memory=mmap)
 
     face = elements.get("face", None)
     if face is not None:
@@ -1090,8 +1246,62 @@ def _load_ply(f, *, path_manager: PathManager) -> _PlyData:
     return _PlyData(**asdict(verts_data), faces=faces, header=header)
 
 
+def _iter_ply_verts_chunks(
+    f, *, path_manager: PathManager, chunk_points: int
+) -> Iterator[_VertsData]:
+    """
+    Read the vertex data from a .ply file at most chunk_points vertices at a
+    time. The file is kept open while the iterator is in use, and only the
+    current chunk is held in memory. Elements after the vertex element,
+    such as faces, are not read.
+
+    Args:
+        f:  A binary or text file-like object (with methods read, readline,
+            tell and seek), a pathlib path or a string containing a file name.
+            If the ply file is binary, a text stream is not supported.
+        path_manager: PathManager for loading if f is a str.
+        chunk_points: maximum number of vertices in each chunk.
+
+    Returns:
+        iterator of _VertsData objects, one for each chunk, in file order.
+    """
+    with _open_file(f, path_manager, "rb") as f:
+        header = _PlyHeader(f)
+        if not header.ascii and isinstance(f, TextIOBase):
+            raise ValueError(
+                "Cannot safely read a binary ply file using a Text stream."
+            )
+        vertex_head = next(
+            (head for head in header.elements if head.name == "vertex"), None
+        )
+        if vertex_head is None:
+            raise ValueError("The ply file has no vertex element.")
+        # Checks that the vertex element has no lists.
+        _get_verts_column_indices(vertex_head)
+
+        for element in header.elements:
+            if element is vertex_head:
+                break
+            # Skip the data of elements before the vertices.
+            if header.ascii:
+                _read_ply_element_ascii(f, element)
+            else:
+                _read_ply_element_binary(f, element, header.big_endian)
+
+        for start in range(0, vertex_head.count, chunk_points):
+            chunk_head = _PlyElementType(
+                vertex_head.name, min(chunk_points, vertex_head.count - start)
+            )
+            chunk_head.properties = vertex_head.properties
+            if header.ascii:
+                vertex = _read_ply_element_ascii(f, chunk_head)
+            else:
+                vertex = _read_ply_element_binary(f, chunk_head, header.big_endian)
+            yield _get_verts_from_element(chunk_head, vertex)
+
+
 def load_ply(
-    f, *, path_manager: Optional[PathManager] = None
+    f, *, path_manager: Optional[PathManager] = None, mmap: bool = False
 ) -> Tuple[torch.Tensor, torch.Tensor]:
     """
     Load the verts and faces from a .ply file.
@@ -1134,6 +1344,12 @@ def load_ply(
             ply format, then a text stream is not supported.
             It is easiest to use a binary stream in all cases.
         path_manager: PathManager for loading if f is a str.
+        mmap: If True and f is a binary ply file on the local filesystem,
+            the vertex data is memory-mapped instead of being read, and
+            verts is a view of the file when it is stored as float32
+            with x, y and z adjacent. This avoids holding two copies of
+            the data while loading very large point clouds. Elements with
+            list properties, such as faces, are read as usual.
 
     Returns:
         verts: FloatTensor of shape (V, 3).
@@ -1142,7 +1358,7 @@ def load_ply(
 
     if path_manager is None:
         path_manager = PathManager()
-    data = _load_ply(f, path_manager=path_manager)
+    data = _load_ply(f, path_manager=path_manager, mmap=mmap)
     faces = data.faces
     if faces is None:
         faces = torch.zeros(0, 3, dtype=torch.int64)
@@ -1488,12 +1704,18 @@ class PointcloudPlyFormat(PointcloudFormatInterpreter):
         path: PathOrStr,
         device,
         path_manager: PathManager,
+        mmap: bool = False,
         **kwargs,
     ) -> Optional[Pointclouds]:
+        """
+        Extra optional args:
+            mmap: (bool) Whether to memory-map the vertex data of a binary
+                        file instead of reading it, as for load_ply.
+        """
         if not endswith(path, self.known_suffixes):
             return None
 
-        data = _load_ply(f=path, path_manager=path_manager)
+        data = _load_ply(f=path, path_manager=path_manager, mmap=mmap)
         features = None
         if data.verts_colors is not None:
             features = [data.verts_colors.to(device)]
@@ -1506,6 +1728,40 @@ class PointcloudPlyFormat(PointcloudFormatInterpreter):
         )
         return pointcloud
 
+    def read_chunks(
+        self,
+        path: PathOrStr,
+        device,
+        path_manager: PathManager,
+        chunk_points: int,
+        **kwargs,
+    ) -> Optional[Iterator[Pointclouds]]:
+        if not endswith(path, self.known_suffixes):
+            return None
+
+        return self._iter_chunks(path, device, path_manager, chunk_points)
+
+    def _iter_chunks(
+        self,
+        path: PathOrStr,
+        device,
+        path_manager: PathManager,
+        chunk_points: int,
+    ) -> Iterator[Pointclouds]:
+        for data in _iter_ply_verts_chunks(
+            f=path, path_manager=path_manager, chunk_points=chunk_points
+        ):
+            features = None
+            if data.verts_colors is not None:
+                features = [data.verts_colors.to(device)]
+            normals = None
+            if data.verts_normals is not None:
+                normals = [data.verts_normals.to(device)]
+
+            yield Pointclouds(
+                points=[data.verts.to(device)], features=features, normals=normals
+            )
+
     def save(
         self,
         data: Pointclouds,
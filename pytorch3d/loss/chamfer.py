@@ -11,6 +11,7 @@ from typing import Union
 import torch
 import torch.nn.functional as F
 from pytorch3d.ops.knn import knn_gather, knn_points
+from pytorch3d.ops.point_index import PointIndex
 from pytorch3d.structures.pointclouds import Pointclouds
 
 
@@ -36,7 +37,7 @@ def _validate_chamfer_reduction_inputs(
 
 
 def _handle_pointcloud_input(
-    points: Union[torch.Tensor, Pointclouds],
+    points: Union[torch.Tensor, Pointclouds, PointIndex],
     lengths: Union[torch.Tensor, None],
     normals: Union[torch.Tensor, None],
 ):
@@ -45,8 +46,16 @@ def _handle_pointcloud_input(
     along with the number of points per batch and the padded normals.
     Otherwise, return the input points (and normals) with the number of points per cloud
     set to the size of the second dimension of `points`.
+    If points is a PointIndex, return its points, lengths and normals, if any.
     """
-    if isinstance(points, Pointclouds):
+    if isinstance(points, PointIndex):
+        if lengths is not None:
+            raise ValueError("lengths must be None for a PointIndex.")
+        X = points.points
+        lengths = points.lengths
+        if points.normals is not None:
+            normals = points.normals
+    elif isinstance(points, Pointclouds):
         X = points.points_padded()
         lengths = points.num_points_per_cloud()
         normals = points.normals_padded()  # either a tensor or None
@@ -85,6 +94,8 @@ def _chamfer_distance_single_direction(
     point_reduction: Union[str, None],
     norm: int,
     abs_cosine: bool,
+    y_index: Union[PointIndex, None] = None,
+    method: str = "bruteforce",
 ):
     return_normals = x_normals is not None and y_normals is not None
 
@@ -108,7 +119,18 @@ def _chamfer_distance_single_direction(
 
     cham_norm_x = x.new_zeros(())
 
-    x_nn = knn_points(x, y, lengths1=x_lengths, lengths2=y_lengths, norm=norm, K=1)
+    if y_index is not None:
+        x_nn = knn_points(x, y_index, lengths1=x_lengths, norm=norm, K=1)
+    else:
+        x_nn = knn_points(
+            x,
+            y,
+            lengths1=x_lengths,
+            lengths2=y_lengths,
+            norm=norm,
+            K=1,
+            method=method,
+        )
     cham_x = x_nn.dists[..., 0]  # (N, P1)
 
     if is_x_heterogeneous:
@@ -186,6 +208,7 @@ def chamfer_distance(
     norm: int = 2,
     single_directional: bool = False,
     abs_cosine: bool = True,
+    method: str = "bruteforce",
 ):
     """
     Chamfer distance between two pointclouds x and y.
@@ -196,7 +219,9 @@ def chamfer_distance(
             batch size N and feature dimension D.
         y: FloatTensor of shape (N, P2, D) or a Pointclouds object representing
             a batch of point clouds with at most P2 points in each batch element,
-            batch size N and feature dimension D.
+            batch size N and feature dimension D. Or a PointIndex over such a
+            batch, which saves rebuilding the index when y is fixed. The
+            method of the index is then used for both directions.
         x_lengths: Optional LongTensor of shape (N,) giving the number of points in each
             cloud in x.
         y_lengths: Optional LongTensor of shape (N,) giving the number of points in each
@@ -219,6 +244,11 @@ def chamfer_distance(
             If True (default), loss_normals is from one minus the absolute value of the
             cosine similarity, which means that exactly opposite normals are considered
             equivalent to exactly matching normals, i.e. sign does not matter.
+        method: How to find the nearest neighbors, see knn_points. "bruteforce"
+            (default) compares every pair of points, which needs time
+            proportional to P1 * P2. "grid" searches a uniform grid over each
+            cloud, which scales to millions of points per cloud on the CPU.
+            It is only supported for 3D points on the CPU.
 
     Returns:
         2-element tuple containing
@@ -243,6 +273,11 @@ def chamfer_distance(
     if point_reduction == "max" and (x_normals is not None or y_normals is not None):
         raise ValueError('Normals must be None if point_reduction is "max"')
 
+    if method not in ("bruteforce", "grid"):
+        raise ValueError('method must be one of ["bruteforce", "grid"]')
+    y_index = y if isinstance(y, PointIndex) else None
+    if y_index is not None:
+        method = y_index.method
     x, x_lengths, x_normals = _handle_pointcloud_input(x, x_lengths, x_normals)
     y, y_lengths, y_normals = _handle_pointcloud_input(y, y_lengths, y_normals)
 
@@ -257,6 +292,8 @@ def chamfer_distance(
         point_reduction,
         norm,
         abs_cosine,
+        y_index=y_index,
+        method=method,
     )
     if single_directional:
         loss = cham_x
@@ -273,6 +310,7 @@ def chamfer_distance(
             point_reduction,
             norm,
             abs_cosine,
+            method=method,
         )
         if point_reduction == "max":
             loss = torch.maximum(cham_x, cham_y)
@@ -10,6 +10,7 @@ from .ball_query import ball_query
 from .cameras_alignment import corresponding_cameras_alignment
 
 from .cubify import cubify
+from .decimate_meshes import decimate_meshes, select_mesh_lod
 from .graph_conv import GraphConv
 from .interp_face_attrs import interpolate_face_attributes
 from .iou_box3d import box3d_overlap
@@ -21,6 +22,7 @@ from .mesh_filtering import taubin_smoothing
 
 from .packed_to_padded import packed_to_padded, padded_to_packed
 from .perspective_n_points import efficient_pnp
+from .point_index import PointIndex
 from .points_alignment import corresponding_points_alignment, iterative_closest_point
 from .points_normals import (
     estimate_pointcloud_local_coord_frames,
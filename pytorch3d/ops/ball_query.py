@@ -13,7 +13,8 @@ from pytorch3d import _C
 from torch.autograd import Function
 from torch.autograd.function import once_differentiable
 
-from .knn import _KNN
+from .knn import _KNN, knn_points
+from .point_index import PointIndex
 from .utils import masked_gather
 
 
@@ -52,9 +53,35 @@ class _ball_query(Function):
         return grad_p1, grad_p2, None, None, None, None
 
 
+def _ball_query_grid(
+    p1: torch.Tensor,
+    index: PointIndex,
+    lengths1: torch.Tensor,
+    K: int,
+    radius: float,
+    return_nn: bool,
+) -> _KNN:
+    """
+    Ball query against a PointIndex with the grid method, which finds the K
+    nearest neighbors with knn_points and then drops those outside the radius.
+    The arguments are as for ball_query.
+    """
+    N, P1 = p1.shape[:2]
+    out = knn_points(p1, index, lengths1=lengths1, K=K)
+    mask = out.dists >= radius * radius
+    # Also mask the padding, which knn_points pads with index 0.
+    mask |= index.lengths[:, None, None] <= torch.arange(K, device=p1.device)
+    mask |= lengths1[:, None, None] <= torch.arange(P1, device=p1.device)[:, None]
+    # mask has shape [N, P1, K]
+    dists = out.dists.masked_fill(mask, 0.0)
+    idx = out.idx.masked_fill(mask, -1)
+    points_nn = masked_gather(index.points, idx) if return_nn else None
+    return _KNN(dists=dists, idx=idx, knn=points_nn)
+
+
 def ball_query(
     p1: torch.Tensor,
-    p2: torch.Tensor,
+    p2: Union[torch.Tensor, PointIndex],
     lengths1: Union[torch.Tensor, None] = None,
     lengths2: Union[torch.Tensor, None] = None,
     K: int = 500,
@@ -87,7 +114,10 @@ def ball_query(
             containing up to P1 points of dimension D. These represent the centers of
             the ball queries.
         p2: Tensor of shape (N, P2, D) giving a batch of N point clouds, each
-            containing up to P2 points of dimension D.
+            containing up to P2 points of dimension D. Or a PointIndex over such
+            a batch, in which case lengths2 must be None. If the index uses the
+            grid method, the neighbors returned are the K nearest ones within
+            the radius, in ascending order of distance.
         lengths1: LongTensor of shape (N,) of values in the range [0, P1], giving the
             length of each pointcloud in p1. Or None to indicate that every cloud has
             length P1.
@@ -118,6 +148,13 @@ def ball_query(
             of shape (N, P1, K, U).
 
     """
+    index = None
+    if isinstance(p2, PointIndex):
+        if lengths2 is not None:
+            raise ValueError("lengths2 must be None when p2 is a PointIndex.")
+        index = p2
+        lengths2 = p2.lengths
+        p2 = p2.points
     if p1.shape[0] != p2.shape[0]:
         raise ValueError("pts1 and pts2 must have the same batch dimension.")
     if p1.shape[2] != p2.shape[2]:
@@ -131,6 +168,8 @@ def ball_query(
 
     if lengths1 is None:
         lengths1 = torch.full((N,), P1, dtype=torch.int64, device=p1.device)
+    if index is not None and index.method == "grid":
+        return _ball_query_grid(p1, index, lengths1, K, radius, return_nn)
     if lengths2 is None:
         lengths2 = torch.full((N,), P2, dtype=torch.int64, device=p1.device)
 
@@ -10,9 +10,6 @@
 from typing import Optional
 
 import torch
-import torch.nn.functional as F
-
-from pytorch3d.common.compat import meshgrid_ij
 
 from pytorch3d.structures import Meshes
 
@@ -70,6 +67,8 @@ def cubify(
     internal faces are removed.
     Args:
       voxels: A FloatTensor of shape (N, D, H, W) containing occupancy probabilities.
+          It can be a sparse COO tensor, e.g. for high resolution grids, in which
+          case the voxels which are not specified are empty.
       thresh: A scalar threshold. If a voxel occupancy is larger than
           thresh, the voxel is considered occupied.
       feats: A FloatTensor of shape (N, K, D, H, W) containing the color information
@@ -99,6 +98,10 @@ def cubify(
     pixel coordinate of the input grid.
     When `align="corner"`, then the corners of the output mesh span the whole grid.
     When `align="center"`, then the grid locations form the center of the cuboids.
+
+    The meshes are computed from the indices of the occupied voxels only, so the
+    time and memory scale with the number of occupied voxels rather than with the
+    size of the grid.
     """
 
     if device is None:
@@ -147,76 +150,67 @@ def cubify(
         device=device,
     )
 
-    wx = torch.tensor([0.5, 0.5], device=device).view(1, 1, 1, 1, 2)
-    wy = torch.tensor([0.5, 0.5], device=device).view(1, 1, 1, 2, 1)
-    wz = torch.tensor([0.5, 0.5], device=device).view(1, 1, 2, 1, 1)
-
-    voxelt = voxels.ge(thresh).float()
-    # N x 1 x D x H x W
-    voxelt = voxelt.view(N, 1, D, H, W)
-
-    # N x 1 x (D-1) x (H-1) x (W-1)
-    voxelt_x = F.conv3d(voxelt, wx).gt(0.5).float()
-    voxelt_y = F.conv3d(voxelt, wy).gt(0.5).float()
-    voxelt_z = F.conv3d(voxelt, wz).gt(0.5).float()
-
-    # 12 x N x 1 x D x H x W
-    faces_idx = torch.ones((cube_faces.size(0), N, 1, D, H, W), device=device)
-
-    # add left face
-    faces_idx[0, :, :, :, :, 1:] = 1 - voxelt_x
-    faces_idx[1, :, :, :, :, 1:] = 1 - voxelt_x
-    # add bottom face
-    faces_idx[2, :, :, :, :-1, :] = 1 - voxelt_y
-    faces_idx[3, :, :, :, :-1, :] = 1 - voxelt_y
-    # add front face
-    faces_idx[4, :, :, 1:, :, :] = 1 - voxelt_z
-    faces_idx[5, :, :, 1:, :, :] = 1 - voxelt_z
-    # add up face
-    faces_idx[6, :, :, :, 1:, :] = 1 - voxelt_y
-    faces_idx[7, :, :, :, 1:, :] = 1 - voxelt_y
-    # add right face
-    faces_idx[8, :, :, :, :, :-1] = 1 - voxelt_x
-    faces_idx[9, :, :, :, :, :-1] = 1 - voxelt_x
-    # add back face
-    faces_idx[10, :, :, :-1, :, :] = 1 - voxelt_z
-    faces_idx[11, :, :, :-1, :, :] = 1 - voxelt_z
-
-    faces_idx *= voxelt
-
-    # N x H x W x D x 12
-    faces_idx = faces_idx.permute(1, 2, 4, 5, 3, 0).squeeze(1)
-    # (NHWD) x 12
-    faces_idx = faces_idx.contiguous()
-    faces_idx = faces_idx.view(-1, cube_faces.size(0))
-
-    # boolean to linear index
-    # NF x 2
-    linind = torch.nonzero(faces_idx, as_tuple=False)
-
-    # NF x 4
-    nyxz = unravel_index(linind[:, 0], (N, H, W, D))
-
-    # NF x 3: faces
-    faces = torch.index_select(cube_faces, 0, linind[:, 1])
-
-    grid_faces = []
-    for d in range(cube_faces.size(1)):
-        # NF x 3
-        xyz = torch.index_select(cube_verts, 0, faces[:, d])
-        permute_idx = torch.tensor([1, 0, 2], device=device)
-        yxz = torch.index_select(xyz, 1, permute_idx)
-        yxz += nyxz[:, 1:]
-        # NF x 1
-        temp = ravel_index(yxz, (H + 1, W + 1, D + 1))
-        grid_faces.append(temp)
-    # NF x 3
-    grid_faces = torch.stack(grid_faces, dim=1)
-
-    y, x, z = meshgrid_ij(torch.arange(H + 1), torch.arange(W + 1), torch.arange(D + 1))
-    y = y.to(device=device, dtype=torch.float32)
-    x = x.to(device=device, dtype=torch.float32)
-    z = z.to(device=device, dtype=torch.float32)
+    # offsets in (n, h, w, d) of the voxel on the other side of each face: 12x4
+    cube_neighbors = torch.tensor(
+        [
+            [0, 0, -1, 0],  # left
+            [0, 1, 0, 0],  # bottom
+            [0, 0, 0, -1],  # front
+            [0, -1, 0, 0],  # up
+            [0, 0, 1, 0],  # right
+            [0, 0, 0, 1],  # back
+        ],
+        dtype=torch.int64,
+        device=device,
+    ).repeat_interleave(2, dim=0)
+
+    # M x 4: (n, d, h, w) indices of the occupied voxels
+    if voxels.is_sparse:
+        voxels = voxels.coalesce()
+        ndhw = voxels.indices()[:, voxels.values().ge(thresh)].t()
+    else:
+        ndhw = voxels.ge(thresh).nonzero(as_tuple=False)
+    if len(ndhw) == 0:
+        verts_list = [torch.tensor([], dtype=torch.float32, device=device)] * N
+        faces_list = [torch.tensor([], dtype=torch.int64, device=device)] * N
+        return Meshes(verts=verts_list, faces=faces_list)
+
+    # M x 4: (n, h, w, d) indices of the occupied voxels, sorted by their
+    # linear index in an N x H x W x D grid, which is the order of the faces.
+    def voxel_key(nhwd: torch.Tensor) -> torch.Tensor:
+        return ravel_index(nhwd[:, 1:], (H, W, D)) + nhwd[:, 0] * (H * W * D)
+
+    nhwd = ndhw.to(device)[:, [0, 2, 3, 1]]
+    voxel_keys, order = voxel_key(nhwd).sort()
+    nhwd = nhwd[order]
+
+    # A face is kept unless the voxel on its other side is occupied, which is
+    # found by a binary search of its key among the keys of the occupied voxels.
+    # M x 12 x 4
+    neighbors = nhwd[:, None] + cube_neighbors
+    size = nhwd.new_tensor([H, W, D])
+    inside = ((neighbors[..., 1:] >= 0) & (neighbors[..., 1:] < size)).all(2)
+    neighbor_keys = voxel_key(neighbors.view(-1, 4))
+    pos = torch.searchsorted(voxel_keys, neighbor_keys).clamp_(max=len(voxel_keys) - 1)
+    occupied = inside & (voxel_keys[pos] == neighbor_keys).view(-1, 12)
+    # NF: the voxel and the cube face of each face
+    voxel_idx, face_idx = (~occupied).nonzero(as_tuple=True)
+    faces_n = nhwd[voxel_idx, 0]
+
+    # NF x 3 x 3: (y, x, z) indices of the vertices of the faces in the
+    # (H+1) x (W+1) x (D+1) grid of vertices
+    yxz = cube_verts[cube_faces[face_idx]][..., [1, 0, 2]] + nhwd[voxel_idx, None, 1:]
+    num_verts = (H + 1) * (W + 1) * (D + 1)
+    vert_keys = ravel_index(yxz.view(-1, 3), (H + 1, W + 1, D + 1))
+    vert_keys = vert_keys.view(-1, 3) + faces_n[:, None] * num_verts
+    # Shared vertices are merged, keeping the order of the grid of vertices.
+    vert_keys, grid_faces = torch.unique(vert_keys, return_inverse=True)
+
+    verts_n = vert_keys // num_verts
+    grid_idx = vert_keys % num_verts
+    y = (grid_idx // ((W + 1) * (D + 1))).to(torch.float32)
+    x = (grid_idx // (D + 1) % (W + 1)).to(torch.float32)
+    z = (grid_idx % (D + 1)).to(torch.float32)
 
     if align == "center":
         x = x - 0.5
@@ -228,48 +222,26 @@ def cubify(
     x = x * 2.0 / (W - margin) - 1.0
     z = z * 2.0 / (D - margin) - 1.0
 
-    # ((H+1)(W+1)(D+1)) x 3
-    grid_verts = torch.stack((x, y, z), dim=3).view(-1, 3)
-
-    if len(nyxz) == 0:
-        verts_list = [torch.tensor([], dtype=torch.float32, device=device)] * N
-        faces_list = [torch.tensor([], dtype=torch.int64, device=device)] * N
-        return Meshes(verts=verts_list, faces=faces_list)
-
-    num_verts = grid_verts.size(0)
-    grid_faces += nyxz[:, 0].view(-1, 1) * num_verts
-    idleverts = torch.ones(num_verts * N, dtype=torch.uint8, device=device)
-
-    indices = grid_faces.flatten()
-    if device.type == "cpu":
-        indices = torch.unique(indices)
-    idleverts.scatter_(0, indices, 0)
-    grid_faces -= nyxz[:, 0].view(-1, 1) * num_verts
-    split_size = torch.bincount(nyxz[:, 0], minlength=N)
+    verts_split_size = torch.bincount(verts_n, minlength=N)
+    split_size = torch.bincount(faces_n, minlength=N)
+    verts_list = list(
+        torch.split(torch.stack((x, y, z), dim=1), verts_split_size.tolist(), 0)
+    )
+    # The vertex indices of each mesh start from 0.
+    verts_start = verts_split_size.cumsum(0) - verts_split_size
+    grid_faces = grid_faces - verts_start[faces_n, None]
     faces_list = list(torch.split(grid_faces, split_size.tolist(), 0))
 
-    idleverts = idleverts.view(N, num_verts)
-    idlenum = idleverts.cumsum(1)
-
-    verts_list = [
-        grid_verts.index_select(0, (idleverts[n] == 0).nonzero(as_tuple=False)[:, 0])
-        for n in range(N)
-    ]
-
     textures_list = None
     if feats is not None and align == "center":
         # We return a TexturesAtlas containing one color for each face
-        # N x K x D x H x W  -> N x H x W x D x K
-        feats = feats.permute(0, 3, 4, 2, 1)
-
-        # (NHWD) x K
-        feats = feats.reshape(-1, feats.size(4))
-        feats = torch.index_select(feats, 0, linind[:, 0])
+        # NF x K
+        n, h, w, d = nhwd[voxel_idx].unbind(1)
+        feats = feats[n, :, d, h, w]
         feats = feats.reshape(-1, 1, 1, feats.size(1))
         feats_list = list(torch.split(feats, split_size.tolist(), 0))
         from pytorch3d.renderer.mesh.textures import TexturesAtlas
 
         textures_list = TexturesAtlas(feats_list)
 
-    faces_list = [nface - idlenum[n][nface] for n, nface in enumerate(faces_list)]
     return Meshes(verts=verts_list, faces=faces_list, textures=textures_list)
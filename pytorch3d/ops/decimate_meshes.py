@@ -0,0 +1,396 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-unsafe
+
+from itertools import product
+from typing import Sequence, Tuple, Union
+
+import torch
+import torch.nn.functional as F
+from pytorch3d.structures import join_meshes_as_batch, Meshes
+
+
+def decimate_meshes(
+    meshes: Meshes,
+    ratio: float,
+    boundary_weight: float = 100.0,
+    max_iters: int = 100,
+) -> Meshes:
+    """
+    Reduce the number of faces of each mesh in a batch by collapsing edges,
+    choosing the edges and the positions of the merged vertices which
+    minimize the quadric error metric of [1]. Boundaries are kept in place
+    by adding to the quadrics the planes through the boundary edges which
+    are perpendicular to their faces. Collapses which would make the mesh
+    non-manifold or flip a face are not done.
+
+    The edges are collapsed in rounds, in all the meshes of the batch at
+    once. Each round collapses the edges of least error which do not share
+    a vertex, until about ratio times the original number of faces of each
+    mesh remain.
+
+    The textures are carried over using their submeshes method:
+    TexturesVertex keeps the features of the remaining vertices,
+    TexturesAtlas the atlas of the remaining faces and TexturesUV the texture
+    coordinates of the remaining faces, which only approximate the texture
+    near collapsed edges.
+
+    The decimated meshes are not differentiable with respect to the input.
+
+    Args:
+        meshes: Meshes object with a batch of triangle meshes.
+        ratio: fraction of the faces of each mesh to keep, in (0, 1].
+        boundary_weight: weight of the boundary planes relative to the planes
+            of the faces in the quadrics.
+        max_iters: maximum number of rounds of collapses. Fewer faces than
+            requested are removed if this is reached, or if no edge can be
+            collapsed.
+
+    Returns:
+        Meshes object with the decimated meshes.
+
+    [1] Garland & Heckbert, Surface Simplification Using Quadric Error
+        Metrics, SIGGRAPH 1997
+    """
+    if not 0.0 < ratio <= 1.0:
+        raise ValueError("ratio must be in (0, 1].")
+
+    N = len(meshes)
+    with torch.no_grad():
+        verts = meshes.verts_packed().detach().clone()
+        faces = meshes.faces_packed()
+        verts_to_mesh = meshes.verts_packed_to_mesh_idx()
+        faces_to_mesh = meshes.faces_packed_to_mesh_idx()
+        target = torch.ceil(meshes.num_faces_per_mesh() * ratio).long()
+        quadrics = _vertex_quadrics(verts, faces, boundary_weight)
+        # The index of each remaining face among the input faces.
+        faces_idx = torch.arange(len(faces), device=faces.device)
+
+        for _ in range(max_iters):
+            num_faces = torch.bincount(faces_to_mesh[faces_idx], minlength=N)
+            excess = num_faces - target
+            if not (excess > 0).any():
+                break
+            edges, positions = _select_collapses(
+                verts, faces, verts_to_mesh, quadrics, excess
+            )
+            if len(edges) == 0:
+                break
+
+            # Merge the second vertex of each edge into the first one.
+            v0, v1 = edges.unbind(1)
+            verts[v0] = positions.to(verts.dtype)
+            quadrics[v0] += quadrics[v1]
+            verts_map = torch.arange(len(verts), device=verts.device)
+            verts_map[v1] = v0
+            faces = verts_map[faces]
+            keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2])
+            keep &= faces[:, 2] != faces[:, 0]
+            faces = faces[keep]
+            faces_idx = faces_idx[keep]
+
+        return _decimated_meshes(meshes, verts, faces, faces_idx)
+
+
+def select_mesh_lod(
+    lods: Sequence[Meshes],
+    cameras,
+    image_size: Union[int, Tuple[int, int]],
+    pixels_per_face: float = 8.0,
+) -> Tuple[Meshes, torch.Tensor]:
+    """
+    Choose one of the levels of detail of each mesh of a batch, e.g. made with
+    decimate_meshes, from the size of the mesh on the screen. The coarsest
+    level whose faces cover on average at most pixels_per_face pixels of the
+    projected bounding box of the mesh is chosen. The finest level is chosen
+    if there is no such level, or if the bounding box is not entirely in
+    front of the camera.
+
+    Args:
+        lods: sequence of Meshes objects with the same batch size, from the
+            finest to the coarsest level of detail.
+        cameras: cameras from which the meshes are rendered, with batch size
+            1 or the batch size of the meshes.
+        image_size: (H, W) of the rendered images, or their side if square.
+        pixels_per_face: the largest average area of the faces on the screen,
+            in pixels.
+
+    Returns:
+        2-element tuple containing
+
+        - **meshes**: Meshes object with the chosen level of each mesh.
+        - **levels**: LongTensor of shape (N,) giving the level of each mesh.
+
+    Example:
+
+    .. code-block:: python
+
+        lods = [meshes] + [decimate_meshes(meshes, r) for r in [0.25, 0.0625]]
+        meshes_lod, _ = select_mesh_lod(lods, cameras, image_size=512)
+        images = renderer(meshes_lod, cameras=cameras)
+    """
+    if isinstance(image_size, int):
+        image_size = (image_size, image_size)
+    bboxes = lods[0].get_bounding_boxes()
+    # The 8 corners of the bounding box of each mesh, of shape (N, 8, 3).
+    corner_idx = torch.tensor(list(product([0, 1], repeat=3)), device=bboxes.device)
+    corners = bboxes[:, torch.arange(3, device=bboxes.device), corner_idx]
+
+    depths = cameras.get_world_to_view_transform().transform_points(corners)[..., 2]
+    screen = cameras.transform_points_screen(corners, image_size=image_size)
+    extent = screen[..., :2].amax(dim=1) - screen[..., :2].amin(dim=1)
+    area = extent[:, 0] * extent[:, 1]
+
+    num_faces = torch.stack([lod.num_faces_per_mesh() for lod in lods])
+    enough_faces = num_faces * pixels_per_face >= area
+    levels = torch.arange(len(lods), device=bboxes.device)[:, None] * enough_faces
+    levels = levels.amax(dim=0)
+    levels[~(depths > 0).all(dim=1)] = 0
+
+    meshes = join_meshes_as_batch(
+        [lods[level][i] for i, level in enumerate(levels.tolist())]
+    )
+    return meshes, levels
+
+
+def _vertex_quadrics(
+    verts: torch.Tensor, faces: torch.Tensor, boundary_weight: float
+) -> torch.Tensor:
+    """
+    Args:
+        verts: FloatTensor of shape (V, 3) giving the packed vertices.
+        faces: LongTensor of shape (F, 3) giving the packed faces.
+        boundary_weight: same as decimate_meshes.
+
+    Returns:
+        DoubleTensor of shape (V, 4, 4) giving the sum of the quadrics of the
+        area-weighted planes of the faces of each vertex and of its boundary
+        edges.
+    """
+    V = len(verts)
+    face_verts = verts.double()[faces]
+    normals = torch.cross(
+        face_verts[:, 1] - face_verts[:, 0], face_verts[:, 2] - face_verts[:, 0], dim=1
+    )
+    double_areas = normals.norm(dim=1, keepdim=True)
+    normals = normals / double_areas.clamp(min=1e-12)
+    planes = torch.cat([normals, -(normals * face_verts[:, 0]).sum(1, True)], dim=1)
+    face_quadrics = 0.5 * double_areas[:, :, None] * planes[:, :, None]
+    face_quadrics = face_quadrics * planes[:, None]
+    quadrics = verts.new_zeros((V, 4, 4), dtype=torch.float64)
+    for k in range(3):
+        quadrics.index_add_(0, faces[:, k], face_quadrics)
+
+    # The edges of each face which are not shared with any other face.
+    starts = faces[:, [1, 2, 0]]
+    ends = faces[:, [2, 0, 1]]
+    keys = torch.minimum(starts, ends) * V + torch.maximum(starts, ends)
+    _, inverse, counts = torch.unique(keys, return_inverse=True, return_counts=True)
+    boundary = counts[inverse] == 1
+    if boundary.any():
+        edge_starts = verts.double()[starts[boundary]]
+        edge_vectors = verts.double()[ends[boundary]] - edge_starts
+        face_normals = normals[:, None].expand(-1, 3, -1)[boundary]
+        edge_normals = F.normalize(torch.cross(edge_vectors, face_normals, dim=1))
+        edge_planes = torch.cat(
+            [edge_normals, -(edge_normals * edge_starts).sum(1, True)], dim=1
+        )
+        weights = boundary_weight * (edge_vectors * edge_vectors).sum(1)
+        edge_quadrics = weights[:, None, None] * edge_planes[:, :, None]
+        edge_quadrics = edge_quadrics * edge_planes[:, None]
+        quadrics.index_add_(0, starts[boundary], edge_quadrics)
+        quadrics.index_add_(0, ends[boundary], edge_quadrics)
+    return quadrics
+
+
+def _select_collapses(
+    verts: torch.Tensor,
+    faces: torch.Tensor,
+    verts_to_mesh: torch.Tensor,
+    quadrics: torch.Tensor,
+    excess: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Choose the edges to collapse in one round of decimate_meshes.
+
+    Args:
+        verts: FloatTensor of shape (V, 3) giving the current packed vertices.
+        faces: LongTensor of shape (F, 3) giving the current packed faces.
+        verts_to_mesh: LongTensor of shape (V,) giving the mesh of each vertex.
+        quadrics: DoubleTensor of shape (V, 4, 4) of the vertex quadrics.
+        excess: LongTensor of shape (N,) giving the number of faces to remove
+            from each mesh.
+
+    Returns:
+        2-element tuple containing
+
+        - **edges**: LongTensor of shape (C, 2) of edges without shared vertices.
+        - **positions**: DoubleTensor of shape (C, 3) giving the position of
+          the merged vertex of each edge.
+    """
+    V = len(verts)
+    starts = faces[:, [1, 2, 0]].flatten()
+    ends = faces[:, [2, 0, 1]].flatten()
+    # Sorted keys of the edges, and the number of faces of each edge.
+    keys, edge_num_faces = torch.unique(
+        torch.minimum(starts, ends) * V + torch.maximum(starts, ends),
+        return_counts=True,
+    )
+    edges = torch.stack([keys // V, keys % V], dim=1)
+    E = len(edges)
+
+    # The error of the optimal position of the merged vertex of each edge. The
+    # ends and the midpoint of the edge are used when it is badly defined.
+    edge_quadrics = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+    end_verts = verts.double()[edges]
+    midpoints = end_verts.mean(dim=1)
+    optimal, info = torch.linalg.solve_ex(
+        edge_quadrics[:, :3, :3], -edge_quadrics[:, :3, 3]
+    )
+    candidates = torch.cat([optimal[:, None], end_verts, midpoints[:, None]], dim=1)
+    homogeneous = F.pad(candidates, (0, 1), value=1.0)
+    costs = torch.einsum("eci,eij,ecj->ec", homogeneous, edge_quadrics, homogeneous)
+    edge_lengths = (end_verts[:, 1] - end_verts[:, 0]).norm(dim=1)
+    bad_optimal = (info != 0) | ~torch.isfinite(optimal).all(dim=1)
+    bad_optimal |= (optimal - midpoints).norm(dim=1) > edge_lengths
+    costs[:, 0] = costs[:, 0].masked_fill(bad_optimal, float("inf"))
+    costs, best = costs.min(dim=1)
+    positions = candidates[torch.arange(E, device=verts.device), best]
+
+    # The boundary vertices and the neighbors of each vertex, for the link
+    # condition below.
+    boundary_verts = torch.zeros(V, dtype=torch.bool, device=verts.device)
+    boundary_verts[edges[edge_num_faces == 1].flatten()] = True
+    sources = torch.cat([edges[:, 0], edges[:, 1]])
+    neighbors = torch.cat([edges[:, 1], edges[:, 0]])
+    neighbors = neighbors[sources.argsort()]
+    neighbors_ptr = F.pad(torch.bincount(sources, minlength=V).cumsum(0), (1, 0))
+    face_normals = _face_normals(verts, faces)
+
+    # Edges whose collapse was given up, which are not picked again so that
+    # the other edges of their vertices can be.
+    blocked = edge_num_faces > 2
+    blocked |= excess[verts_to_mesh[edges[:, 0]]] <= 0
+    selected = edges.new_empty((0,))
+    while len(selected) == 0 and not blocked.all():
+        # Each vertex picks its edge of least error, and an edge is collapsed
+        # when it is picked by both its vertices.
+        idx = (~blocked).nonzero()[:, 0]
+        idx = idx[costs[idx].argsort()]
+        rank = torch.full((E,), E, dtype=torch.int64, device=verts.device)
+        rank[idx] = torch.arange(len(idx), device=verts.device)
+        best_rank = torch.full((V,), E, dtype=torch.int64, device=verts.device)
+        best_rank.scatter_reduce_(
+            0, edges[idx].flatten(), rank[idx].repeat_interleave(2), "amin"
+        )
+        picked = (best_rank[edges[idx, 0]] == rank[idx]) & (
+            best_rank[edges[idx, 1]] == rank[idx]
+        )
+        selected = idx[picked]
+
+        # Link condition: the ends of an edge have as many common neighbors as
+        # the edge has faces, and an interior edge does not join two boundary
+        # vertices.
+        v0, v1 = edges[selected].unbind(1)
+        degrees = neighbors_ptr[v0 + 1] - neighbors_ptr[v0]
+        owners = torch.arange(len(selected), device=verts.device)
+        owners = owners.repeat_interleave(degrees)
+        offsets = torch.arange(len(owners), device=verts.device)
+        offsets += (neighbors_ptr[v0] - (degrees.cumsum(0) - degrees))[owners]
+        v2 = neighbors[offsets]
+        common_keys = torch.minimum(v1[owners], v2) * V
+        common_keys += torch.maximum(v1[owners], v2)
+        found = keys[torch.searchsorted(keys, common_keys).clamp(max=E - 1)]
+        num_common = torch.bincount(
+            owners[found == common_keys], minlength=len(selected)
+        )
+        link = num_common == edge_num_faces[selected]
+        link &= (edge_num_faces[selected] == 1) | ~(
+            boundary_verts[v0] & boundary_verts[v1]
+        )
+        blocked[selected[~link]] = True
+        selected = selected[link]
+
+        # Give up the collapses which flip the faces around them, until none do.
+        while len(selected) > 0:
+            v0, v1 = edges[selected].unbind(1)
+            new_verts = verts.clone()
+            new_verts[v0] = positions[selected].to(verts.dtype)
+            new_verts[v1] = positions[selected].to(verts.dtype)
+            collapse_idx = torch.full((V,), -1, dtype=torch.int64, device=verts.device)
+            collapse_idx[v0] = torch.arange(len(selected), device=verts.device)
+            collapse_idx[v1] = torch.arange(len(selected), device=verts.device)
+            faces_collapses = collapse_idx[faces]
+            c0, c1, c2 = faces_collapses.unbind(1)
+            # Faces with two vertices merged by a collapse are removed.
+            removed = (c0 >= 0) & ((c0 == c1) | (c0 == c2))
+            removed |= (c1 >= 0) & (c1 == c2)
+            new_face_normals = _face_normals(new_verts, faces)
+            flipped = (face_normals * new_face_normals).sum(1) <= 0
+            flipped &= (faces_collapses >= 0).any(1) & ~removed
+            flipped &= face_normals.norm(dim=1) > 0
+            if not flipped.any():
+                break
+            given_up = faces_collapses[flipped].flatten()
+            keep = torch.ones(len(selected), dtype=torch.bool, device=verts.device)
+            keep[given_up[given_up >= 0]] = False
+            blocked[selected[~keep]] = True
+            selected = selected[keep]
+
+    # Each collapse removes two faces, or one at a boundary. The collapses of
+    # least error of each mesh are kept, so that no more faces than needed
+    # are removed.
+    meshes_idx, order = torch.sort(verts_to_mesh[edges[selected, 0]], stable=True)
+    selected = selected[order]
+    counts = torch.bincount(meshes_idx, minlength=len(excess))
+    first_idx = counts.cumsum(0) - counts
+    idx_in_mesh = torch.arange(len(selected), device=verts.device)
+    idx_in_mesh -= first_idx[meshes_idx]
+    selected = selected[idx_in_mesh < (excess[meshes_idx] + 1) // 2]
+    return edges[selected], positions[selected]
+
+
+def _face_normals(verts: torch.Tensor, faces: torch.Tensor) -> torch.Tensor:
+    face_verts = verts[faces]
+    return torch.cross(
+        face_verts[:, 1] - face_verts[:, 0], face_verts[:, 2] - face_verts[:, 0], dim=1
+    )
+
+
+def _decimated_meshes(
+    meshes: Meshes, verts: torch.Tensor, faces: torch.Tensor, faces_idx: torch.Tensor
+) -> Meshes:
+    """
+    Make the Meshes object of the remaining faces of decimate_meshes, with the
+    remaining vertices and their textures.
+
+    Args:
+        meshes: the input Meshes object.
+        verts: FloatTensor of shape (V, 3) giving the moved packed vertices.
+        faces: LongTensor of shape (F_remaining, 3) giving the remaining faces,
+            in terms of the packed vertices.
+        faces_idx: LongTensor of shape (F_remaining,) giving the index of each
+            remaining face in the packed faces of meshes.
+    """
+    faces_to_mesh = meshes.faces_packed_to_mesh_idx()[faces_idx]
+    verts_first_idx = meshes.mesh_to_verts_packed_first_idx()
+    faces_first_idx = meshes.mesh_to_faces_packed_first_idx()
+    verts_list, faces_list, verts_ids, faces_ids = [], [], [], []
+    for i in range(len(meshes)):
+        in_mesh = faces_to_mesh == i
+        mesh_verts_idx, mesh_faces = torch.unique(
+            faces[in_mesh], sorted=True, return_inverse=True
+        )
+        verts_list.append(verts[mesh_verts_idx])
+        faces_list.append(mesh_faces)
+        verts_ids.append([mesh_verts_idx - verts_first_idx[i]])
+        faces_ids.append([faces_idx[in_mesh] - faces_first_idx[i]])
+
+    textures = None
+    if meshes.textures is not None:
+        textures = meshes.textures.submeshes(verts_ids, faces_ids)
+    return meshes.__class__(verts=verts_list, faces=faces_list, textures=textures)
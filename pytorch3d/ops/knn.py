@@ -14,6 +14,8 @@ from pytorch3d import _C
 from torch.autograd import Function
 from torch.autograd.function import once_differentiable
 
+from .point_index import _build_points_grid, PointIndex
+
 
 _KNN = namedtuple("KNN", "dists idx knn")
 
@@ -35,6 +37,8 @@ class _knn_points(Function):
         version,
         norm: int = 2,
         return_sorted: bool = True,
+        method: str = "bruteforce",
+        grid=None,
     ):
         """
         K-Nearest neighbors on point clouds.
@@ -56,6 +60,9 @@ class _knn_points(Function):
             norm: (int) indicating the norm. Only supports 1 (for L1) and 2 (for L2).
             return_sorted: (bool) whether to return the nearest neighbors sorted in
                 ascending order of distance.
+            method: "bruteforce" or "grid", see knn_points.
+            grid: Optional _PointsGrid over p2 to use for the "grid" method,
+                made by _build_points_grid. It is made here if not given.
 
         Returns:
             p1_dists: Tensor of shape (N, P1, K) giving the squared distances to
@@ -71,10 +78,29 @@ class _knn_points(Function):
         if not ((norm == 1) or (norm == 2)):
             raise ValueError("Support for 1 or 2 norm.")
 
-        idx, dists = _C.knn_points_idx(p1, p2, lengths1, lengths2, norm, K, version)
-
-        # sort KNN in ascending order if K > 1
-        if K > 1 and return_sorted:
+        if method == "grid":
+            if grid is None:
+                grid = _build_points_grid(p2.detach(), lengths2)
+            idx, dists = _C.knn_points_idx_grid(
+                p1,
+                lengths1,
+                grid.points,
+                grid.idxs,
+                grid.cell_starts,
+                grid.grid_min,
+                grid.cell_size,
+                grid.resolution,
+                norm,
+                K,
+            )
+        else:
+            idx, dists = _C.knn_points_idx(
+                p1, p2, lengths1, lengths2, norm, K, version
+            )
+
+        # sort KNN in ascending order if K > 1. The grid kernel returns them
+        # sorted already.
+        if K > 1 and return_sorted and method != "grid":
             if lengths2.min() < K:
                 P1 = p1.shape[1]
                 mask = lengths2[:, None] <= torch.arange(K, device=dists.device)[None]
@@ -108,12 +134,12 @@ class _knn_points(Function):
         grad_p1, grad_p2 = _C.knn_points_backward(
             p1, p2, lengths1, lengths2, idx, norm, grad_dists
         )
-        return grad_p1, grad_p2, None, None, None, None, None, None
+        return grad_p1, grad_p2, None, None, None, None, None, None, None, None
 
 
 def knn_points(
     p1: torch.Tensor,
-    p2: torch.Tensor,
+    p2: Union[torch.Tensor, PointIndex],
     lengths1: Union[torch.Tensor, None] = None,
     lengths2: Union[torch.Tensor, None] = None,
     norm: int = 2,
@@ -121,6 +147,7 @@ def knn_points(
     version: int = -1,
     return_nn: bool = False,
     return_sorted: bool = True,
+    method: str = "bruteforce",
 ) -> _KNN:
     """
     K-Nearest neighbors on point clouds.
@@ -129,7 +156,9 @@ def knn_points(
         p1: Tensor of shape (N, P1, D) giving a batch of N point clouds, each
             containing up to P1 points of dimension D.
         p2: Tensor of shape (N, P2, D) giving a batch of N point clouds, each
-            containing up to P2 points of dimension D.
+            containing up to P2 points of dimension D. Or a PointIndex over such
+            a batch, in which case lengths2 must be None and the method of the
+            index is used.
         lengths1: LongTensor of shape (N,) of values in the range [0, P1], giving the
             length of each pointcloud in p1. Or None to indicate that every cloud has
             length P1.
@@ -143,6 +172,14 @@ def knn_points(
         return_nn: If set to True returns the K nearest neighbors in p2 for each point in p1.
         return_sorted: (bool) whether to return the nearest neighbors sorted in
             ascending order of distance.
+        method: Which algorithm to use. "bruteforce" compares each point in p1
+            with every point in p2. "grid" puts the points of each cloud in p2
+            into a uniform grid and only compares each point in p1 with the
+            points in the nearby cells, which is much faster for large clouds
+            which are spread out in space. "grid" is only supported for 3D
+            points on the CPU, ignores version, and always returns the nearest
+            neighbors sorted. Neighbors at equal distances may be returned in
+            a different order by the two methods.
 
     Returns:
         dists: Tensor of shape (N, P1, K) giving the squared distances to
@@ -170,10 +207,25 @@ def knn_points(
             of shape (N, P1, K, U).
 
     """
+    grid = None
+    if isinstance(p2, PointIndex):
+        if lengths2 is not None:
+            raise ValueError("lengths2 must be None when p2 is a PointIndex.")
+        lengths2 = p2.lengths
+        method = p2.method
+        grid = p2.grid
+        p2 = p2.points
     if p1.shape[0] != p2.shape[0]:
         raise ValueError("pts1 and pts2 must have the same batch dimension.")
     if p1.shape[2] != p2.shape[2]:
         raise ValueError("pts1 and pts2 must have the same point dimension.")
+    if method not in ("bruteforce", "grid"):
+        raise ValueError(f"Unknown method {method}.")
+    if method == "grid":
+        if p1.shape[2] != 3:
+            raise ValueError("The grid method only supports 3D points.")
+        if p1.is_cuda:
+            raise ValueError("The grid method is only implemented on CPU.")
 
     p1 = p1.contiguous()
     p2 = p2.contiguous()
@@ -187,7 +239,7 @@ def knn_points(
         lengths2 = torch.full((p1.shape[0],), P2, dtype=torch.int64, device=p1.device)
 
     p1_dists, p1_idx = _knn_points.apply(
-        p1, p2, lengths1, lengths2, K, version, norm, return_sorted
+        p1, p2, lengths1, lengths2, K, version, norm, return_sorted, method, grid
     )
 
     p2_nn = None
@@ -6,10 +6,12 @@
 
 # pyre-unsafe
 
-from typing import List, Optional, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import torch
+import torch.nn.functional as F
 from pytorch3d import _C
+from pytorch3d.common.datatypes import Device, make_device
 from pytorch3d.ops.marching_cubes_data import EDGE_TO_VERTICES, FACE_TABLE, INDEX
 from pytorch3d.transforms import Translate
 from torch.autograd import Function
@@ -251,15 +253,52 @@ class _marching_cubes(Function):
         raise ValueError("marching_cubes backward is not supported")
 
 
+class _marching_cubes_batch(Function):
+    """
+    Torch Function wrapper for the batched CPU marching_cubes implementation.
+    It returns the N vertices tensors, then the N faces tensors and then the
+    N ids tensors of the N volumes. This function is not differentiable.
+    """
+
+    @staticmethod
+    def forward(ctx, vol_batch, isolevels):
+        verts, faces, ids = _C.marching_cubes_batch(vol_batch, isolevels)
+        return (*verts, *faces, *ids)
+
+    @staticmethod
+    def backward(ctx, *grad_outputs):
+        raise ValueError("marching_cubes backward is not supported")
+
+
+class _marching_cubes_blocks(Function):
+    """
+    Torch Function wrapper for the block-wise marching_cubes implementation.
+    This function is not differentiable.
+    """
+
+    @staticmethod
+    def forward(ctx, blocks, block_origins, D, H, W, isolevel):
+        verts, faces, ids = _C.marching_cubes_blocks(
+            blocks, block_origins, D, H, W, isolevel
+        )
+        return verts, faces, ids
+
+    @staticmethod
+    def backward(ctx, grad_verts, grad_faces):
+        raise ValueError("marching_cubes backward is not supported")
+
+
 def marching_cubes(
     vol_batch: torch.Tensor,
     isolevel: Optional[float] = None,
     return_local_coords: bool = True,
+    block_size: Optional[int] = None,
 ) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
     """
     Run marching cubes over a volume scalar field with a designated isolevel.
     Returns vertices and faces of the obtained mesh.
-    This operation is non-differentiable.
+    This operation is non-differentiable. On the CPU, the volumes of the batch
+    and slabs of each volume are processed in parallel.
 
     Args:
         vol_batch: a Tensor of size (N, D, H, W) corresponding to
@@ -270,6 +309,12 @@ def marching_cubes(
         return_local_coords: bool. If True the output vertices will be in local coordinates in
             the range [-1, 1] x [-1, 1] x [-1, 1]. If False they will be in the range
             [0, W-1] x [0, H-1] x [0, D-1]
+        block_size: If not None, the volume is split into blocks of
+            block_size x block_size x block_size cells, and only the blocks
+            whose values straddle the isolevel are marched, on the CPU. This
+            is faster when the surface only crosses a small part of a large
+            volume. The mesh is the same as without blocks, up to the order
+            of the vertices and faces.
 
     Returns:
         verts: [{V_0}, {V_1}, ...] List of N sets of vertices of shape (|V_i|, 3) in FloatTensor
@@ -277,10 +322,37 @@ def marching_cubes(
     """
     batched_verts, batched_faces = [], []
     D, H, W = vol_batch.shape[1:]
+    thresholds = [
+        ((vol.max() + vol.min()) / 2).item() if isolevel is None else isolevel
+        for vol in vol_batch
+    ]
+    batch_outputs = None
+    N = len(vol_batch)
+    if N > 0 and block_size is None and not vol_batch.is_cuda:
+        # The CPU kernel marches all the volumes in one call, in parallel.
+        outputs = _marching_cubes_batch.apply(
+            vol_batch, torch.tensor(thresholds, dtype=torch.float32)
+        )
+        batch_outputs = list(zip(outputs[:N], outputs[N : 2 * N], outputs[2 * N :]))
     for i in range(len(vol_batch)):
         vol = vol_batch[i]
-        thresh = ((vol.max() + vol.min()) / 2).item() if isolevel is None else isolevel
-        verts, faces, ids = _marching_cubes.apply(vol, thresh)
+        thresh = thresholds[i]
+        if block_size is not None:
+            blocks, block_origins = _straddling_blocks(vol, thresh, block_size)
+            verts, faces = marching_cubes_blocks(
+                blocks, block_origins, (D, H, W), thresh, return_local_coords
+            )
+            if len(faces) > 0 and len(verts) > 0:
+                batched_verts.append(verts.to(vol.device))
+                batched_faces.append(faces.to(vol.device))
+            else:
+                batched_verts.append([])
+                batched_faces.append([])
+            continue
+        if batch_outputs is not None:
+            verts, faces, ids = batch_outputs[i]
+        else:
+            verts, faces, ids = _marching_cubes.apply(vol, thresh)
         if len(faces) > 0 and len(verts) > 0:
             # Convert from world coordinates ([0, D-1], [0, H-1], [0, W-1]) to
             # local coordinates in the range [-1, 1]
@@ -303,3 +375,226 @@ def marching_cubes(
             batched_verts.append([])
             batched_faces.append([])
     return batched_verts, batched_faces
+
+
+def _straddling_blocks(
+    vol: torch.Tensor, isolevel: float, block_size: int
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Split a volume into blocks of block_size x block_size x block_size cells
+    and return the ones whose values straddle the isolevel, i.e. the only
+    blocks which can contain faces of the mesh.
+
+    Args:
+        vol: a Tensor of size (D, H, W) corresponding to a 3D scalar field
+        isolevel: float, the isolevel of the surface
+        block_size: int, the number of cells along each side of a block
+
+    Returns:
+        blocks: a Tensor of size (B, block_size + 1, block_size + 1,
+            block_size + 1) with the values of the grid points of the blocks
+        block_origins: a LongTensor of size (B, 3) with the (z, y, x) index in
+            the volume of the first grid point of each block
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be positive.")
+    S = block_size
+    size = torch.tensor(vol.shape)
+    num_blocks = ((size - 2).clamp(min=0) // S + 1).tolist()
+    # Replicating the last values does not change the range of the values of
+    # the blocks which stick out of the volume.
+    pad = [0, num_blocks[2] * S + 1 - vol.shape[2]]
+    pad += [0, num_blocks[1] * S + 1 - vol.shape[1]]
+    pad += [0, num_blocks[0] * S + 1 - vol.shape[0]]
+    padded = F.pad(vol[None, None], pad, mode="replicate")
+    block_max = F.max_pool3d(padded, kernel_size=S + 1, stride=S)[0, 0]
+    block_min = -F.max_pool3d(-padded, kernel_size=S + 1, stride=S)[0, 0]
+    # A cell has faces if some of its values are below the isolevel and some
+    # are not.
+    active = (block_min < isolevel) & (block_max >= isolevel)
+    blocks = padded[0, 0].unfold(0, S + 1, S).unfold(1, S + 1, S).unfold(2, S + 1, S)
+    return blocks[active], active.nonzero() * S
+
+
+def marching_cubes_blocks(
+    blocks: torch.Tensor,
+    block_origins: torch.Tensor,
+    volume_size: Tuple[int, int, int],
+    isolevel: float,
+    return_local_coords: bool = True,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Run marching cubes over some blocks of the grid of a volume scalar field,
+    e.g. only the blocks close to the surface of a large sparse volume, and
+    return a single mesh. The vertices on the boundaries between blocks are
+    shared by the faces of the blocks on both sides, so the mesh is the same
+    as the one of the dense volume restricted to the cells of the blocks.
+    This operation is non-differentiable and runs on the CPU.
+
+    Args:
+        blocks: a Tensor of size (B, S + 1, S + 1, S + 1) with the values of
+            the grid points of B blocks of S x S x S cells. Neighbouring
+            blocks share their boundary grid points.
+        block_origins: a LongTensor of size (B, 3) with the (z, y, x) index in
+            the volume of the first grid point of each block. Grid points of
+            a block outside the volume are ignored.
+        volume_size: (D, H, W), the size of the grid of the volume
+        isolevel: float used as threshold to determine if a point is
+            inside/outside the volume.
+        return_local_coords: bool. If True the output vertices will be in local
+            coordinates in the range [-1, 1] x [-1, 1] x [-1, 1]. If False they
+            will be in the range [0, W-1] x [0, H-1] x [0, D-1]
+
+    Returns:
+        verts: FloatTensor of shape (V, 3) of the vertices
+        faces: LongTensor of shape (F, 3) of the faces
+    """
+    D, H, W = volume_size
+    verts, faces, _ = _marching_cubes_blocks.apply(
+        blocks.float().cpu(), block_origins.long().cpu(), D, H, W, isolevel
+    )
+    if return_local_coords and len(verts) > 0:
+        verts = (
+            Translate(x=+1.0, y=+1.0, z=+1.0)
+            .scale((verts.new_tensor([W, H, D])[None] - 1) * 0.5)
+            .inverse()
+        ).transform_points(verts[None])[0]
+    return verts, faces
+
+
+@torch.no_grad()
+def iter_marching_cubes_implicit(
+    fn: Callable[[torch.Tensor], torch.Tensor],
+    volume_size: Tuple[int, int, int],
+    isolevel: float = 0.0,
+    bounds: Optional[torch.Tensor] = None,
+    block_size: int = 16,
+    chunk_size: int = 1 << 20,
+    coarse_margin: Optional[float] = None,
+    device: Device = "cpu",
+) -> Iterator[Tuple[torch.Tensor, torch.Tensor, torch.Tensor]]:
+    """
+    Run marching cubes over an implicit function, e.g. an SDF or a density
+    network, sampled on a grid which is never held in memory as a whole.
+    The grid is split into blocks of block_size^3 cells, which are evaluated
+    in chunks of at most chunk_size points, and the mesh of each chunk is
+    yielded as soon as it is computed. This operation is non-differentiable.
+
+    Args:
+        fn: a callable which maps a Tensor of points of shape (P, 3) in
+            (x, y, z) order to their values, of shape (P,) or (P, 1).
+        volume_size: (D, H, W), the number of grid points along z, y and x.
+        isolevel: float used as threshold to determine if a point is
+            inside/outside the volume.
+        bounds: a Tensor of shape (2, 3) with the (x, y, z) coordinates of
+            the first and the last grid points. Defaults to the cube
+            [-1, 1] x [-1, 1] x [-1, 1].
+        block_size: the number of cells along each side of a block.
+        chunk_size: the maximum number of points passed to fn in one call.
+            At least one block is evaluated per call.
+        coarse_margin: If not None, fn is first evaluated at the centres of
+            the blocks, and the blocks whose value at the centre differs from
+            the isolevel by more than coarse_margin are skipped. For an SDF,
+            half the diagonal of a block is a margin which skips no face.
+        device: the device of the points passed to fn and of the outputs.
+
+    Yields:
+        verts: FloatTensor of shape (V, 3) of the vertices of a chunk, in the
+            coordinates of the points passed to fn
+        faces: LongTensor of shape (F, 3) of the faces of a chunk
+        ids: LongTensor of shape (V,) of ids of the vertices. Vertices on the
+            boundaries between chunks are yielded by each chunk, with the
+            same id.
+    """
+    if min(volume_size) < 2:
+        raise ValueError("volume_size must be at least 2 along each axis.")
+    if block_size < 1:
+        raise ValueError("block_size must be positive.")
+    device = make_device(device)
+    D, H, W = volume_size
+    if bounds is None:
+        bounds = torch.tensor([[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]])
+    bounds = bounds.to(device=device, dtype=torch.float32)
+    # The distance between neighbouring grid points along x, y and z
+    spacing = (bounds[1] - bounds[0]) / bounds.new_tensor([W - 1, H - 1, D - 1])
+
+    def evaluate(grid_points: torch.Tensor) -> torch.Tensor:
+        # grid_points are (z, y, x) indices in the grid.
+        points = bounds[0] + grid_points.flip(-1) * spacing
+        return fn(points).reshape(len(points))
+
+    S = block_size
+    block_origins = torch.cartesian_prod(
+        *[torch.arange((n - 2) // S + 1, device=device) * S for n in volume_size]
+    )
+    if coarse_margin is not None:
+        centers = (block_origins + S / 2).split(chunk_size)
+        values = torch.cat([evaluate(chunk) for chunk in centers])
+        block_origins = block_origins[(values - isolevel).abs() <= coarse_margin]
+
+    offsets = torch.arange(S + 1, device=device)
+    offsets = torch.stack(torch.meshgrid(offsets, offsets, offsets, indexing="ij"), -1)
+    blocks_per_chunk = max(1, chunk_size // (S + 1) ** 3)
+    for origins in block_origins.split(blocks_per_chunk):
+        blocks = evaluate((origins[:, None, None, None] + offsets).view(-1, 3))
+        blocks = blocks.view(-1, S + 1, S + 1, S + 1)
+        # Only the blocks which straddle the isolevel can contain faces.
+        values = blocks.flatten(1)
+        active = (values.min(1).values < isolevel) & (values.max(1).values >= isolevel)
+        if not active.any():
+            continue
+        verts, faces, ids = _marching_cubes_blocks.apply(
+            blocks[active].float().cpu(), origins[active].cpu(), D, H, W, isolevel
+        )
+        if len(faces) > 0:
+            verts = bounds[0] + verts.to(device) * spacing
+            yield verts, faces.to(device), ids.to(device)
+
+
+def marching_cubes_implicit(
+    fn: Callable[[torch.Tensor], torch.Tensor],
+    volume_size: Tuple[int, int, int],
+    isolevel: float = 0.0,
+    bounds: Optional[torch.Tensor] = None,
+    block_size: int = 16,
+    chunk_size: int = 1 << 20,
+    coarse_margin: Optional[float] = None,
+    device: Device = "cpu",
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Run marching cubes over an implicit function sampled on a grid, chunk by
+    chunk, and return a single mesh. See iter_marching_cubes_implicit for
+    the arguments.
+
+    Returns:
+        verts: FloatTensor of shape (V, 3) of the vertices, in the coordinates
+            of the points passed to fn
+        faces: LongTensor of shape (F, 3) of the faces
+    """
+    verts_list, faces_list, ids_list = [], [], []
+    num_verts = 0
+    for verts, faces, ids in iter_marching_cubes_implicit(
+        fn,
+        volume_size,
+        isolevel,
+        bounds,
+        block_size,
+        chunk_size,
+        coarse_margin,
+        device,
+    ):
+        verts_list.append(verts)
+        faces_list.append(faces + num_verts)
+        ids_list.append(ids)
+        num_verts += len(verts)
+    if num_verts == 0:
+        device = make_device(device)
+        verts = torch.zeros((0, 3), dtype=torch.float32, device=device)
+        return verts, torch.zeros((0, 3), dtype=torch.int64, device=device)
+
+    # Merge the vertices which were yielded by several chunks.
+    verts = torch.cat(verts_list)
+    unique_ids, inverse_idx = torch.unique(torch.cat(ids_list), return_inverse=True)
+    verts_ = verts.new_zeros(unique_ids.shape[0], 3)
+    verts_[inverse_idx] = verts
+    return verts_, inverse_idx[torch.cat(faces_list)]
@@ -0,0 +1,227 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-unsafe
+
+from collections import namedtuple
+from typing import Optional, Tuple, TYPE_CHECKING, Union
+
+import torch
+
+
+if TYPE_CHECKING:
+    from pytorch3d.structures import Pointclouds
+
+
+# A uniform grid over each cloud in a batch of 3D point clouds, as made by
+# _build_points_grid.
+_PointsGrid = namedtuple(
+    "PointsGrid", "points idxs cell_starts grid_min cell_size resolution"
+)
+
+
+def _build_points_grid(
+    points: torch.Tensor, lengths: torch.Tensor, points_per_cell: float = 2.0
+) -> _PointsGrid:
+    """
+    Sort the points of each cloud in a batch by the cell of a uniform grid of
+    cubic cells which contains them. The grid of each cloud covers its bounding
+    box, and has about one cell for each points_per_cell points.
+
+    Args:
+        points: FloatTensor of shape (N, P, 3) giving a batch of point clouds.
+        lengths: LongTensor of shape (N,) giving the length of each cloud.
+        points_per_cell: average number of points in each cell.
+
+    Returns:
+        _PointsGrid namedtuple with fields
+            points: FloatTensor of shape (N, P, 3) giving the points of each
+                cloud sorted by cell, followed by the padding points.
+            idxs: LongTensor of shape (N, P) giving the index in the input of
+                each point in points.
+            cell_starts: LongTensor of shape (N, C + 1) where C is the largest
+                number of cells of a grid, such that the points in cell c of
+                cloud n are points[n, cell_starts[n, c]:cell_starts[n, c + 1]].
+                Cell (x, y, z) is cell number
+                (x * resolution[n, 1] + y) * resolution[n, 2] + z.
+            grid_min: FloatTensor of shape (N, 3) giving the minimum corner of
+                each grid.
+            cell_size: FloatTensor of shape (N,) giving the side length of the
+                cells of each grid.
+            resolution: LongTensor of shape (N, 3) giving the number of cells
+                along each axis of each grid.
+    """
+    N, P, _ = points.shape
+    device = points.device
+    valid = torch.arange(P, device=device)[None] < lengths[:, None]
+    # valid has shape [N, P]
+    grid_min = points.masked_fill(~valid[..., None], float("inf")).min(1).values
+    grid_max = points.masked_fill(~valid[..., None], float("-inf")).max(1).values
+    empty = lengths == 0
+    grid_min[empty] = 0
+    grid_max[empty] = 0
+    extent = grid_max - grid_min
+    # extent has shape [N, 3]
+
+    num_cells = (lengths.to(points.dtype) / points_per_cell).clamp(min=1)
+    # Flat clouds are given a thickness so that they get about as many cells
+    # as the others.
+    max_extent = extent.max(1).values
+    thickness = max_extent * num_cells.pow(-1 / 3)
+    volume = torch.maximum(extent, thickness[:, None]).prod(1)
+    cell_size = (volume / num_cells).pow(1 / 3)
+    # Clouds with all points in the same place have one cell.
+    cell_size = torch.where(cell_size > 0, cell_size, torch.ones_like(cell_size))
+    resolution = (extent / cell_size[:, None]).ceil().long().clamp(min=1)
+    # resolution has shape [N, 3]
+
+    cells = ((points - grid_min[:, None]) / cell_size[:, None, None]).floor()
+    cells = torch.minimum(cells.long().clamp(min=0), resolution[:, None] - 1)
+    res_y = resolution[:, None, 1]
+    res_z = resolution[:, None, 2]
+    cell_ids = (cells[..., 0] * res_y + cells[..., 1]) * res_z + cells[..., 2]
+    # cell_ids has shape [N, P]
+    C = int(resolution.prod(1).max()) if N > 0 else 1
+    cell_ids = cell_ids.masked_fill(~valid, C)
+    sorted_ids, idxs = cell_ids.sort(dim=1, stable=True)
+    sorted_points = points.gather(1, idxs[..., None].expand(-1, -1, 3))
+    cell_starts = torch.searchsorted(
+        sorted_ids, torch.arange(C + 1, device=device).expand(N, -1).contiguous()
+    )
+    return _PointsGrid(
+        points=sorted_points.contiguous(),
+        idxs=idxs,
+        cell_starts=cell_starts,
+        grid_min=grid_min,
+        cell_size=cell_size,
+        resolution=resolution,
+    )
+
+
+class PointIndex:
+    """
+    A batch of point clouds together with a spatial index over them, which is
+    built once and can then answer many neighbor queries against the same
+    points. This is useful when the target points stay fixed over many
+    iterations, e.g. in iterative_closest_point or when fitting to a scan.
+
+    A PointIndex can be passed instead of the tensor p2 to knn_points and
+    ball_query, and instead of y to chamfer_distance.
+
+    Two methods are supported:
+        - "grid": the points of each cloud are sorted into a uniform grid, see
+          knn_points. Only supported for 3D points on the CPU.
+        - "bruteforce": no index is built, and the queries compare with every
+          point.
+    """
+
+    def __init__(
+        self,
+        points: Union[torch.Tensor, "Pointclouds"],
+        lengths: Optional[torch.Tensor] = None,
+        method: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            points: FloatTensor of shape (N, P, D) giving a batch of point
+                clouds, or a Pointclouds object, whose normals are kept too.
+            lengths: Optional LongTensor of shape (N,) giving the number of
+                points in each cloud, if points is a tensor.
+            method: "grid", "bruteforce" or None to use "grid" whenever it is
+                supported.
+        """
+        normals = None
+        if not torch.is_tensor(points):
+            if lengths is not None:
+                raise ValueError("lengths must be None for a Pointclouds object.")
+            lengths = points.num_points_per_cloud()
+            normals = points.normals_padded()
+            points = points.points_padded()
+        if points.ndim != 3:
+            raise ValueError("Expected points to be of shape (N, P, D)")
+        N, P, D = points.shape
+        if lengths is None:
+            lengths = torch.full((N,), P, dtype=torch.int64, device=points.device)
+
+        grid_supported = D == 3 and not points.is_cuda
+        if method is None:
+            method = "grid" if grid_supported else "bruteforce"
+        if method not in ("bruteforce", "grid"):
+            raise ValueError(f"Unknown method {method}.")
+        if method == "grid" and not grid_supported:
+            raise ValueError("The grid method only supports 3D points on the CPU.")
+
+        self.points = points.contiguous()
+        self.lengths = lengths
+        self.normals = normals
+        self.method = method
+        self.grid = None
+        if method == "grid":
+            self.grid = _build_points_grid(self.points.detach(), lengths)
+
+    def knn(
+        self,
+        p1: torch.Tensor,
+        lengths1: Optional[torch.Tensor] = None,
+        norm: int = 2,
+        K: int = 1,
+        return_nn: bool = False,
+        return_sorted: bool = True,
+    ):
+        """
+        K nearest neighbors in the indexed clouds of the points in p1.
+        The arguments and outputs are as for knn_points.
+        """
+        from .knn import knn_points
+
+        return knn_points(
+            p1,
+            self,
+            lengths1=lengths1,
+            norm=norm,
+            K=K,
+            return_nn=return_nn,
+            return_sorted=return_sorted,
+        )
+
+    def nearest(
+        self, p1: torch.Tensor, lengths1: Optional[torch.Tensor] = None, norm: int = 2
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Nearest neighbor in the indexed clouds of the points in p1.
+
+        Args:
+            p1: Tensor of shape (N, P1, D) giving the query points.
+            lengths1: Optional LongTensor of shape (N,) giving the number of
+                points in each cloud of p1.
+            norm: 1 for L1 or 2 for L2 distance.
+
+        Returns:
+            dists: Tensor of shape (N, P1) giving the (squared, for L2)
+                distance to the nearest neighbor.
+            idx: LongTensor of shape (N, P1) giving the index of the nearest
+                neighbor.
+        """
+        out = self.knn(p1, lengths1=lengths1, norm=norm, K=1)
+        return out.dists[..., 0], out.idx[..., 0]
+
+    def radius_query(
+        self,
+        p1: torch.Tensor,
+        lengths1: Optional[torch.Tensor] = None,
+        K: int = 500,
+        radius: float = 0.2,
+        return_nn: bool = True,
+    ):
+        """
+        Up to K neighbors in the indexed clouds within a radius of each of the
+        points in p1. The arguments and outputs are as for ball_query.
+        """
+        from .ball_query import ball_query
+
+        return ball_query(
+            p1, self, lengths1=lengths1, K=K, radius=radius, return_nn=return_nn
+        )
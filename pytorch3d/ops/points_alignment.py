@@ -11,6 +11,7 @@ from typing import List, NamedTuple, Optional, TYPE_CHECKING, Union
 
 import torch
 from pytorch3d.ops import knn_points
+from pytorch3d.ops.point_index import PointIndex
 from pytorch3d.structures import utils as strutil
 
 from . import utils as oputil
@@ -37,13 +38,14 @@ class ICPSolution(NamedTuple):
 
 def iterative_closest_point(
     X: Union[torch.Tensor, "Pointclouds"],
-    Y: Union[torch.Tensor, "Pointclouds"],
+    Y: Union[torch.Tensor, "Pointclouds", PointIndex],
     init_transform: Optional[SimilarityTransform] = None,
     max_iterations: int = 100,
     relative_rmse_thr: float = 1e-6,
     estimate_scale: bool = False,
     allow_reflection: bool = False,
     verbose: bool = False,
+    knn_method: str = "bruteforce",
 ) -> ICPSolution:
     """
     Executes the iterative closest point (ICP) algorithm [1, 2] in order to find
@@ -61,7 +63,10 @@ def iterative_closest_point(
         **X**: Batch of `d`-dimensional points
             of shape `(minibatch, num_points_X, d)` or a `Pointclouds` object.
         **Y**: Batch of `d`-dimensional points
-            of shape `(minibatch, num_points_Y, d)` or a `Pointclouds` object.
+            of shape `(minibatch, num_points_Y, d)` or a `Pointclouds` object,
+            or a `PointIndex` over them. Otherwise a `PointIndex` over `Y` is
+            built, which is used for the nearest neighbor search of every
+            iteration.
         **init_transform**: A named-tuple `SimilarityTransform` of tensors
             `R`, `T, `s`, where `R` is a batch of orthonormal matrices of
             shape `(minibatch, d, d)`, `T` is a batch of translations
@@ -76,6 +81,10 @@ def iterative_closest_point(
         **allow_reflection**: If `True`, allows the algorithm to return `R`
             which is orthonormal but has determinant==-1.
         **verbose**: If `True`, prints status messages during each ICP iteration.
+        **knn_method**: The method of the `PointIndex` which is built over `Y`,
+            "bruteforce" or "grid". "grid" is faster for large 3D point clouds
+            on the CPU, but ties between equally distant neighbors can be
+            resolved differently. Ignored if `Y` is a `PointIndex`.
 
     Returns:
         A named tuple `ICPSolution` with the following fields:
@@ -101,7 +110,12 @@ def iterative_closest_point(
     # make sure we convert input Pointclouds structures to
     # padded tensors of shape (N, P, 3)
     Xt, num_points_X = oputil.convert_pointclouds_to_tensor(X)
-    Yt, num_points_Y = oputil.convert_pointclouds_to_tensor(Y)
+    if isinstance(Y, PointIndex):
+        Y_index = Y
+        Yt, num_points_Y = Y.points, Y.lengths
+    else:
+        Yt, num_points_Y = oputil.convert_pointclouds_to_tensor(Y)
+        Y_index = None
 
     b, size_X, dim = Xt.shape
 
@@ -126,6 +140,10 @@ def iterative_closest_point(
     # clone the initial point cloud
     Xt_init = Xt.clone()
 
+    # Y is fixed, so the spatial index over it is only built once
+    if Y_index is None:
+        Y_index = PointIndex(Yt, num_points_Y, method=knn_method)
+
     if init_transform is not None:
         # parse the initial transform from the input and apply to Xt
         try:
@@ -163,7 +181,7 @@ def iterative_closest_point(
     # the main loop over ICP iterations
     for iteration in range(max_iterations):
         Xt_nn_points = knn_points(
-            Xt, Yt, lengths1=num_points_X, lengths2=num_points_Y, K=1, return_nn=True
+            Xt, Y_index, lengths1=num_points_X, K=1, return_nn=True
         ).knn[:, :, 0, :]
 
         # get the alignment of the nearest neighbors from Yt with Xt_init
@@ -50,6 +50,7 @@ from .implicit import (
 from .lighting import AmbientLights, diffuse, DirectionalLights, PointLights, specular
 from .materials import Materials
 from .mesh import (
+    CachingMeshRasterizer,
     gouraud_shading,
     HardFlatShader,
     HardGouraudShader,
@@ -72,6 +73,7 @@ from .mesh import (
 
 from .points import (
     AlphaCompositor,
+    IncrementalPointsRasterizer,
     NormWeightedCompositor,
     PointsRasterizationSettings,
     PointsRasterizer,
@@ -51,6 +51,12 @@ def _get_background_color(
     return background_color
 
 
+def _is_sparse(fragments) -> bool:
+    # SparseFragments are not imported from the mesh renderer, which imports
+    # this module.
+    return hasattr(fragments, "pixel_ptr")
+
+
 def hard_rgb_blend(
     colors: torch.Tensor, fragments, blend_params: BlendParams
 ) -> torch.Tensor:
@@ -135,6 +141,8 @@ def sigmoid_alpha_blend(colors, fragments, blend_params: BlendParams) -> torch.T
     [1] Liu et al, 'Soft Rasterizer: A Differentiable Renderer for Image-based
         3D Reasoning', ICCV 2019
     """
+    if _is_sparse(fragments):
+        return _sigmoid_alpha_blend_sparse(colors, fragments, blend_params)
     N, H, W, K = fragments.pix_to_face.shape
     pixel_colors = torch.ones((N, H, W, 4), dtype=colors.dtype, device=colors.device)
     pixel_colors[..., :3] = colors[..., 0, :]
@@ -143,6 +151,28 @@ def sigmoid_alpha_blend(colors, fragments, blend_params: BlendParams) -> torch.T
     return pixel_colors
 
 
+def _sigmoid_alpha_blend_sparse(
+    colors: torch.Tensor, fragments, blend_params: BlendParams
+) -> torch.Tensor:
+    """
+    sigmoid_alpha_blend for SparseFragments, where colors has shape (M, 3).
+    The RGB of pixels which no face overlaps is 1.
+    """
+    N, H, W, _ = fragments.shape
+    pixel_ptr = fragments.pixel_ptr
+    covered = pixel_ptr[1:] > pixel_ptr[:-1]
+    pixel_colors = colors.new_ones((N * H * W, 4))
+    pixel_colors[covered, :3] = colors[pixel_ptr[:-1][covered]]
+
+    prob = torch.sigmoid(-fragments.dists / blend_params.sigma)
+    # Product of (1 - prob) over the faces of each pixel.
+    alpha = prob.new_ones(N * H * W).scatter_reduce(
+        0, fragments.pixel_idx, 1.0 - prob, reduce="prod"
+    )
+    pixel_colors[:, 3] = 1.0 - alpha
+    return pixel_colors.view(N, H, W, 4)
+
+
 def softmax_rgb_blend(
     colors: torch.Tensor,
     fragments,
@@ -186,6 +216,8 @@ def softmax_rgb_blend(
     [0] Shichen Liu et al, 'Soft Rasterizer: A Differentiable Renderer for
     Image-based 3D Reasoning'
     """
+    if _is_sparse(fragments):
+        return _softmax_rgb_blend_sparse(colors, fragments, blend_params, znear, zfar)
 
     N, H, W, K = fragments.pix_to_face.shape
     pixel_colors = torch.ones((N, H, W, 4), dtype=colors.dtype, device=colors.device)
@@ -239,3 +271,55 @@ def softmax_rgb_blend(
     pixel_colors[..., 3] = 1.0 - alpha
 
     return pixel_colors
+
+
+def _softmax_rgb_blend_sparse(
+    colors: torch.Tensor,
+    fragments,
+    blend_params: BlendParams,
+    znear: Union[float, torch.Tensor] = 1.0,
+    zfar: Union[float, torch.Tensor] = 100,
+) -> torch.Tensor:
+    """
+    softmax_rgb_blend for SparseFragments, where colors has shape (M, 3). The
+    sums and maxima over the faces of each pixel are done with scatter
+    operations over the M faces.
+    """
+    N, H, W, _ = fragments.shape
+    pixel_idx = fragments.pixel_idx
+    background_color = _get_background_color(blend_params, colors.device)
+    eps = 1e-10
+
+    prob_map = torch.sigmoid(-fragments.dists / blend_params.sigma)
+    alpha = prob_map.new_ones(N * H * W).scatter_reduce(
+        0, pixel_idx, 1.0 - prob_map, reduce="prod"
+    )
+
+    # Per image znear and zfar are looked up for the image of each face.
+    if torch.is_tensor(zfar):
+        zfar = zfar[pixel_idx // (H * W)]
+    if torch.is_tensor(znear):
+        znear = znear[pixel_idx // (H * W)]
+
+    # pyre-fixme[6]: Expected `float` but got `Union[float, Tensor]`
+    z_inv = (zfar - fragments.zbuf) / (zfar - znear)
+    # As in softmax_rgb_blend, the maximum is at least 0, the value of padding.
+    z_inv_max = (
+        z_inv.new_zeros(N * H * W)
+        .scatter_reduce(0, pixel_idx, z_inv, reduce="amax")
+        .clamp(min=eps)
+    )
+    weights_num = prob_map * torch.exp(
+        (z_inv - z_inv_max[pixel_idx]) / blend_params.gamma
+    )
+    delta = torch.exp((eps - z_inv_max) / blend_params.gamma).clamp(min=eps)
+    denom = weights_num.new_zeros(N * H * W).index_add(0, pixel_idx, weights_num)
+    denom = denom + delta
+
+    weighted_colors = colors.new_zeros((N * H * W, colors.shape[-1])).index_add(
+        0, pixel_idx, weights_num[:, None] * colors
+    )
+    weighted_background = delta[:, None] * background_color
+    pixel_rgb = (weighted_colors + weighted_background) / denom[:, None]
+    pixel_colors = torch.cat([pixel_rgb, (1.0 - alpha)[:, None]], dim=-1)
+    return pixel_colors.view(N, H, W, 4)
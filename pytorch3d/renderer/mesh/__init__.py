@@ -14,7 +14,11 @@ from .clip import (
 )
 
 from .rasterize_meshes import rasterize_meshes
-from .rasterizer import MeshRasterizer, RasterizationSettings
+from .rasterizer import (
+    CachingMeshRasterizer,
+    MeshRasterizer,
+    RasterizationSettings,
+)
 from .renderer import MeshRenderer, MeshRendererWithFragments
 from .shader import (  # DEPRECATED
     BlendParams,
@@ -42,6 +42,8 @@ def rasterize_meshes(
     cull_backfaces: bool = False,
     z_clip_value: Optional[float] = None,
     cull_to_frustum: bool = False,
+    occlusion_culling: bool = False,
+    precull_faces: bool = False,
 ):
     """
     Rasterize a batch of meshes given the shape of the desired output image.
@@ -78,7 +80,8 @@ def rasterize_meshes(
         max_faces_per_bin: Only applicable when using coarse-to-fine rasterization
             (bin_size > 0); this is the maximum number of faces allowed within each
             bin. This should not affect the output values, but can affect
-            the memory usage in the forward pass.
+            the memory usage in the forward pass. It is ignored on the CPU,
+            where bins can hold any number of faces.
         perspective_correct: Bool, Whether to apply perspective correction when computing
             barycentric coordinates for pixels. This should be set to True if a perspective
             camera is used.
@@ -103,6 +106,20 @@ def rasterize_meshes(
         cull_to_frustum: if True, triangles outside the view frustum will be culled.
             Culling involves removing all faces which fall outside view frustum.
             Default is False so that it is turned on only when needed.
+        occlusion_culling: if True, the faces of each bin are sorted front to back
+            and faces entirely behind the nearest face found for a pixel are
+            skipped. This does not change the output, but speeds up hard
+            rasterization of scenes with a lot of occlusion. It is only used by
+            coarse-to-fine rasterization on the CPU with faces_per_pixel=1 and
+            blur_radius=0, and not when faces are clipped by z_clip_value.
+        precull_faces: if True, the faces which cannot appear in the image are
+            removed before rasterization: faces outside the image (expanded by
+            the blur radius), faces behind the camera and, if cull_backfaces,
+            back faces. This does not change the output, but speeds up
+            rendering when most faces are not visible, e.g. for a zoomed-in
+            view of a large scene. With z_clip_value, the faces which are
+            partly behind z_clip_value are kept for clipping, and the faces
+            entirely behind it are removed.
 
     Returns:
         4-element tuple containing
@@ -156,6 +173,25 @@ def rasterize_meshes(
     im_size = parse_image_size(image_size)
     max_image_size = max(*im_size)
 
+    culled_faces_to_faces_idx = None
+    if precull_faces:
+        # Remove the faces which cannot be seen before clipping, so that only
+        # the remaining faces are clipped.
+        (
+            face_verts,
+            mesh_to_face_first_idx,
+            num_faces_per_mesh,
+            culled_faces_to_faces_idx,
+        ) = _precull_faces(
+            face_verts,
+            meshes.faces_packed_to_mesh_idx(),
+            len(meshes),
+            im_size,
+            blur_radius,
+            cull_backfaces,
+            z_clip_value,
+        )
+
     clipped_faces_neighbor_idx = None
 
     if z_clip_value is not None or cull_to_frustum:
@@ -194,21 +230,19 @@ def rasterize_meshes(
 
     # TODO: Choose naive vs coarse-to-fine based on mesh size and image size.
     if bin_size is None:
-        if not verts_packed.is_cuda:
-            # Binned CPU rasterization is not supported.
-            bin_size = 0
+        # The same heuristic is used on the CPU, where each bin is rasterized
+        # by one task and the number of faces per bin is not limited.
+        # TODO better heuristics for bin size.
+        if max_image_size <= 64:
+            bin_size = 8
         else:
-            # TODO better heuristics for bin size.
-            if max_image_size <= 64:
-                bin_size = 8
-            else:
-                # Heuristic based formula maps max_image_size -> bin_size as follows:
-                # max_image_size < 64 -> 8
-                # 16 < max_image_size < 256 -> 16
-                # 256 < max_image_size < 512 -> 32
-                # 512 < max_image_size < 1024 -> 64
-                # 1024 < max_image_size < 2048 -> 128
-                bin_size = int(2 ** max(np.ceil(np.log2(max_image_size)) - 4, 4))
+            # Heuristic based formula maps max_image_size -> bin_size as follows:
+            # max_image_size < 64 -> 8
+            # 16 < max_image_size < 256 -> 16
+            # 256 < max_image_size < 512 -> 32
+            # 512 < max_image_size < 1024 -> 64
+            # 1024 < max_image_size < 2048 -> 128
+            bin_size = int(2 ** max(np.ceil(np.log2(max_image_size)) - 4, 4))
 
     if bin_size != 0:
         # There is a limit on the number of faces per bin in the cuda kernel.
@@ -235,6 +269,7 @@ def rasterize_meshes(
         perspective_correct,
         clip_barycentric_coords,
         cull_backfaces,
+        occlusion_culling,
     )
 
     if z_clip_value is not None or cull_to_frustum:
@@ -249,9 +284,90 @@ def rasterize_meshes(
         )
         pix_to_face, barycentric_coords = outputs
 
+    if culled_faces_to_faces_idx is not None:
+        # Map the indices of the remaining faces to the packed faces of meshes.
+        pix_to_face = torch.where(
+            pix_to_face >= 0,
+            culled_faces_to_faces_idx[pix_to_face.clamp(min=0)],
+            pix_to_face,
+        )
+
     return pix_to_face, zbuf, barycentric_coords, dists
 
 
+def _precull_faces(
+    face_verts: torch.Tensor,
+    faces_to_mesh_idx: torch.Tensor,
+    num_meshes: int,
+    image_size: Tuple[int, int],
+    blur_radius: float,
+    cull_backfaces: bool,
+    z_clip_value: Optional[float] = None,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, Optional[torch.Tensor]]:
+    """
+    Remove the faces which the rasterizer would skip for every pixel.
+
+    Args:
+        face_verts: Tensor of shape (F, 3, 3) giving the packed vertex positions
+            of the faces in NDC.
+        faces_to_mesh_idx: LongTensor of shape (F,) giving the mesh of each face.
+        num_meshes: number of meshes N.
+        image_size, blur_radius, cull_backfaces: same as rasterize_meshes.
+        z_clip_value: same as rasterize_meshes. The faces which will be clipped
+            are only removed if they lie entirely behind z_clip_value.
+
+    Returns:
+        4-element tuple containing
+
+        - **face_verts**: Tensor of shape (F_culled, 3, 3) of the remaining faces.
+        - **mesh_to_face_first_idx**: LongTensor of shape (N,) giving the index
+          of the first remaining face of each mesh.
+        - **num_faces_per_mesh**: LongTensor of shape (N,) giving the number
+          of remaining faces of each mesh.
+        - **culled_faces_to_faces_idx**: LongTensor of shape (F_culled,) giving
+          the index of each remaining face in the input, or None if no face
+          was removed, in which case the other outputs are the inputs.
+    """
+    H, W = image_size
+    # All pixel centers lie strictly inside these bounds.
+    x_bound = non_square_ndc_range(W, H) / 2.0 + np.sqrt(blur_radius)
+    y_bound = non_square_ndc_range(H, W) / 2.0 + np.sqrt(blur_radius)
+    with torch.no_grad():
+        x, y, z = face_verts.unbind(2)
+        x_min, x_max = x.aminmax(dim=1)
+        y_min, y_max = y.aminmax(dim=1)
+        # Faces with a vertex behind the camera are skipped by the rasterizer.
+        keep = (z.amin(dim=1) >= kEpsilon) & (x_min <= x_bound)
+        keep &= (x_max >= -x_bound) & (y_min <= y_bound) & (y_max >= -y_bound)
+        if cull_backfaces:
+            # The same signed area as in the rasterizer, which skips faces with
+            # a negative area. The margin makes up for rounding differences,
+            # as faces of smaller area are skipped for being degenerate.
+            area = (x[:, 0] - x[:, 1]) * (y[:, 2] - y[:, 1])
+            area -= (y[:, 0] - y[:, 1]) * (x[:, 2] - x[:, 1])
+            keep &= area >= -kEpsilon
+        if z_clip_value is not None:
+            # Clipping leaves the faces in front of z_clip_value as they are,
+            # and removes the faces behind it.
+            clipped = z < z_clip_value
+            keep &= ~clipped.any(dim=1)
+            keep |= clipped.any(dim=1) & ~clipped.all(dim=1)
+        culled_faces_to_faces_idx = keep.nonzero()[:, 0]
+
+    num_faces_per_mesh = torch.bincount(
+        faces_to_mesh_idx[culled_faces_to_faces_idx], minlength=num_meshes
+    )
+    mesh_to_face_first_idx = num_faces_per_mesh.cumsum(0) - num_faces_per_mesh
+    if len(culled_faces_to_faces_idx) == len(face_verts):
+        return face_verts, mesh_to_face_first_idx, num_faces_per_mesh, None
+    return (
+        face_verts[culled_faces_to_faces_idx],
+        mesh_to_face_first_idx,
+        num_faces_per_mesh,
+        culled_faces_to_faces_idx,
+    )
+
+
 class _RasterizeFaceVerts(torch.autograd.Function):
     """
     Torch autograd wrapper for forward and backward pass of rasterize_meshes
@@ -271,6 +387,7 @@ class _RasterizeFaceVerts(torch.autograd.Function):
         image_size, blur_radius, faces_per_pixel: same as rasterize_meshes.
         perspective_correct: same as rasterize_meshes.
         cull_backfaces: same as rasterize_meshes.
+        occlusion_culling: same as rasterize_meshes.
 
     Returns:
         same as rasterize_meshes function.
@@ -291,6 +408,7 @@ class _RasterizeFaceVerts(torch.autograd.Function):
         perspective_correct: bool = False,
         clip_barycentric_coords: bool = False,
         cull_backfaces: bool = False,
+        occlusion_culling: bool = False,
         z_clip_value: Optional[float] = None,
         cull_to_frustum: bool = True,
     ):
@@ -308,6 +426,7 @@ class _RasterizeFaceVerts(torch.autograd.Function):
             perspective_correct,
             clip_barycentric_coords,
             cull_backfaces,
+            occlusion_culling,
         )
 
         ctx.save_for_backward(face_verts, pix_to_face)
@@ -330,6 +449,7 @@ class _RasterizeFaceVerts(torch.autograd.Function):
         grad_perspective_correct = None
         grad_clip_barycentric_coords = None
         grad_cull_backfaces = None
+        grad_occlusion_culling = None
         face_verts, pix_to_face = ctx.saved_tensors
         grad_face_verts = _C.rasterize_meshes_backward(
             face_verts,
@@ -353,6 +473,7 @@ class _RasterizeFaceVerts(torch.autograd.Function):
             grad_perspective_correct,
             grad_clip_barycentric_coords,
             grad_cull_backfaces,
+            grad_occlusion_culling,
         )
         return grads
 
@@ -401,6 +522,38 @@ def pix_to_non_square_ndc(i, S1, S2):
     return -offset + (ndc_range * i + offset) / S1
 
 
+def ndc_tile_transform(
+    image_size: Tuple[int, int], tile: Tuple[int, int, int, int]
+) -> Tuple[float, float, float]:
+    """
+    Find the transform of the x/y coordinates in NDC space which maps a tile of
+    an image to a whole image of the size of the tile, so that rasterizing the
+    transformed inputs at the size of the tile gives that tile of the image.
+
+    Args:
+        image_size: (H, W) of the whole image.
+        tile: (y_start, y_end, x_start, x_end) giving the rows and columns of
+            the tile in the output image.
+
+    Returns:
+        3-element tuple of floats (scale, x_offset, y_offset); the transformed
+        coordinates are (scale * x + x_offset, scale * y + y_offset). Distances
+        in NDC units are multiplied by scale.
+    """
+    H, W = image_size
+    y_start, y_end, x_start, x_end = tile
+    h = y_end - y_start
+    w = x_end - x_start
+    scale = (non_square_ndc_range(w, h) / w) / (non_square_ndc_range(W, H) / W)
+    # The +X and +Y axes in NDC point left and up in the output image, so the
+    # first pixel of the tile in NDC is its last pixel in the image.
+    x_first = pix_to_non_square_ndc(W - x_end, W, H)
+    y_first = pix_to_non_square_ndc(H - y_end, H, W)
+    x_offset = pix_to_non_square_ndc(0, w, h) - scale * x_first
+    y_offset = pix_to_non_square_ndc(0, h, w) - scale * y_first
+    return scale, x_offset, y_offset
+
+
 def rasterize_meshes_python(  # noqa: C901
     meshes,
     image_size: Union[int, Tuple[int, int]] = 256,
@@ -6,14 +6,19 @@
 
 # pyre-unsafe
 
+import dataclasses
+import hashlib
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from pytorch3d.renderer.cameras import try_get_projection_transform
 
-from .rasterize_meshes import rasterize_meshes
+from ..utils import _update_fingerprint, parse_image_size
+from .rasterize_meshes import ndc_tile_transform, rasterize_meshes
 
 
 @dataclass(frozen=True)
@@ -70,6 +75,138 @@ class Fragments:
             dists=self.dists.detach() if self.dists is not None else self.dists,
         )
 
+    def to_sparse(self) -> "SparseFragments":
+        """
+        Returns:
+            SparseFragments holding only the faces which overlap each pixel,
+            without the padding.
+        """
+        N, H, W, K = self.pix_to_face.shape
+        mask = self.pix_to_face >= 0
+        # The faces of each pixel come first, so each pixel has a contiguous
+        # range of them when the mask is applied in row-major order.
+        num_fragments_per_pixel = mask.sum(dim=-1).view(-1)
+        pixel_ptr = F.pad(num_fragments_per_pixel.cumsum(dim=0), (1, 0))
+        pixel_idx = torch.arange(
+            N * H * W, device=self.pix_to_face.device
+        ).repeat_interleave(num_fragments_per_pixel)
+        return SparseFragments(
+            pix_to_face=self.pix_to_face[mask],
+            zbuf=self.zbuf[mask],
+            bary_coords=self.bary_coords[mask],
+            dists=self.dists[mask] if self.dists is not None else None,
+            pixel_ptr=pixel_ptr,
+            pixel_idx=pixel_idx,
+            shape=(N, H, W, K),
+        )
+
+
+@dataclass(frozen=True)
+class SparseFragments:
+    """
+    A compact representation of the outputs of a rasterizer, which only holds
+    the M faces which actually overlap each pixel, in a CSR-style layout,
+    instead of padding every pixel to faces_per_pixel faces. The faces of each
+    pixel are contiguous and sorted in ascending z-order, and the pixels are in
+    the row-major order of the (N, H, W) images.
+
+    Members:
+        pix_to_face: LongTensor of shape (M,) giving the index of each face
+            (in the packed representation).
+        zbuf: FloatTensor of shape (M,) giving the NDC z-coordinates.
+        bary_coords: FloatTensor of shape (M, 3) giving the barycentric
+            coordinates.
+        dists: FloatTensor of shape (M,) giving the signed Euclidean distances,
+            or None.
+        pixel_ptr: LongTensor of shape (N * H * W + 1,). The faces which
+            overlap pixel p of the flattened (N, H, W) images are the entries
+            pixel_ptr[p] to pixel_ptr[p + 1] - 1.
+        pixel_idx: LongTensor of shape (M,) giving the pixel of the flattened
+            (N, H, W) images which each face overlaps.
+        shape: (N, H, W, K) of the corresponding Fragments.
+    """
+
+    pix_to_face: torch.Tensor
+    zbuf: torch.Tensor
+    bary_coords: torch.Tensor
+    dists: Optional[torch.Tensor]
+    pixel_ptr: torch.Tensor
+    pixel_idx: torch.Tensor
+    shape: Tuple[int, int, int, int]
+
+    def detach(self) -> "SparseFragments":
+        return dataclasses.replace(
+            self,
+            zbuf=self.zbuf.detach(),
+            bary_coords=self.bary_coords.detach(),
+            dists=self.dists.detach() if self.dists is not None else self.dists,
+        )
+
+    def to_dense(self) -> Fragments:
+        """
+        Returns:
+            Fragments of shape (N, H, W, K), padded as by the rasterizer.
+        """
+        N, H, W, K = self.shape
+        # Position of each face among the faces of its pixel.
+        k = torch.arange(len(self.pixel_idx), device=self.pixel_idx.device)
+        k = k - self.pixel_ptr[self.pixel_idx]
+        idx = (self.pixel_idx, k)
+
+        def scatter(values, fill_value, *dims):
+            out = values.new_full((N * H * W, K) + dims, fill_value)
+            out = out.index_put(idx, values)
+            return out.view(N, H, W, K, *dims)
+
+        return Fragments(
+            pix_to_face=scatter(self.pix_to_face, -1),
+            zbuf=scatter(self.zbuf, -1),
+            bary_coords=scatter(self.bary_coords, -1, 3),
+            dists=scatter(self.dists, -1) if self.dists is not None else None,
+        )
+
+    def padded(self) -> Fragments:
+        """
+        Returns the faces of each image in a Fragments object of shape
+        (N, 1, P, 1), where P is the largest number of faces in an image,
+        padded with -1. This allows computations which need the image of each
+        face, e.g. texture sampling and shading, to work on the sparse
+        fragments. Use unpad to convert the results back.
+        """
+        N, H, W, _ = self.shape
+        num_fragments = self.pixel_ptr[:: H * W]
+        num_fragments = num_fragments[1:] - num_fragments[:-1]
+        P = int(num_fragments.max()) if N > 0 else 0
+        mask = torch.arange(P, device=num_fragments.device) < num_fragments[:, None]
+
+        def pad(values, *dims):
+            out = values.new_full((N, P) + dims, -1)
+            out[mask] = values
+            return out.view(N, 1, P, 1, *dims)
+
+        return Fragments(
+            pix_to_face=pad(self.pix_to_face),
+            zbuf=pad(self.zbuf),
+            bary_coords=pad(self.bary_coords, 3),
+            dists=pad(self.dists) if self.dists is not None else None,
+        )
+
+    def unpad(self, values: torch.Tensor) -> torch.Tensor:
+        """
+        Args:
+            values: tensor of shape (N, 1, P, 1, ...) computed from the output
+                of padded.
+
+        Returns:
+            tensor of shape (M, ...) of the values for each face.
+        """
+        N, H, W, _ = self.shape
+        num_fragments = self.pixel_ptr[:: H * W]
+        num_fragments = num_fragments[1:] - num_fragments[:-1]
+        P = values.shape[2]
+        mask = torch.arange(P, device=values.device) < num_fragments[:, None]
+        return values[:, 0, :, 0][mask]
+
 
 @dataclass
 class RasterizationSettings:
@@ -121,6 +258,21 @@ class RasterizationSettings:
         cull_to_frustum: Whether to cull triangles outside the view frustum.
             Culling involves removing all faces which fall outside view frustum.
             Default is False for performance as often not needed.
+        occlusion_culling: Whether to skip faces which are entirely behind the
+            nearest face found for a pixel. This does not change the output,
+            and is only used for coarse-to-fine rasterization on the CPU with
+            faces_per_pixel=1 and blur_radius=0, e.g. with the hard shaders.
+        precull_faces: Whether to remove the faces which cannot be seen, i.e.
+            which are outside the image, behind the camera or back faces with
+            cull_backfaces, before rasterization. This does not change the
+            output, and speeds up rendering when few of the faces are visible.
+            This also applies with the z_clip_value inferred for perspective
+            cameras, where the faces partly behind it are kept for clipping.
+        sparse_fragments: Whether to return SparseFragments, which only hold
+            the faces which overlap each pixel, instead of Fragments padded to
+            faces_per_pixel faces. This saves memory and shading work when
+            faces_per_pixel is large, and is supported by the SoftPhongShader
+            and the SoftSilhouetteShader.
     """
 
     image_size: Union[int, Tuple[int, int]] = 256
@@ -134,6 +286,9 @@ class RasterizationSettings:
     cull_backfaces: bool = False
     z_clip_value: Optional[float] = None
     cull_to_frustum: bool = False
+    occlusion_culling: bool = False
+    precull_faces: bool = False
+    sparse_fragments: bool = False
 
 
 class MeshRasterizer(nn.Module):
@@ -215,13 +370,19 @@ class MeshRasterizer(nn.Module):
         meshes_ndc = meshes_world.update_padded(new_verts_padded=verts_ndc)
         return meshes_ndc
 
-    def forward(self, meshes_world, **kwargs) -> Fragments:
+    def forward(self, meshes_world, **kwargs) -> Union[Fragments, SparseFragments]:
         """
         Args:
             meshes_world: a Meshes object representing a batch of meshes with
                           coordinates in world space.
+            tile: (optional) tuple (y_start, y_end, x_start, x_end) of the rows
+                and columns of the image to rasterize, if only a tile of the
+                image is needed. The outputs then have the size of the tile,
+                and are the same as that part of the outputs for the whole
+                image.
         Returns:
-            Fragments: Rasterization outputs as a named tuple.
+            Fragments: Rasterization outputs as a named tuple, or
+            SparseFragments if raster_settings.sparse_fragments is True.
         """
         meshes_proj = self.transform(meshes_world, **kwargs)
         raster_settings = kwargs.get("raster_settings", self.raster_settings)
@@ -247,14 +408,31 @@ class MeshRasterizer(nn.Module):
                 znear = znear.min().item()
             z_clip = None if not perspective_correct or znear is None else znear / 2
 
+        image_size = raster_settings.image_size
+        blur_radius = raster_settings.blur_radius
+        tile = kwargs.get("tile", None)
+        if tile is not None:
+            # Rasterize the tile as a whole image of the size of the tile.
+            scale, x_offset, y_offset = ndc_tile_transform(
+                parse_image_size(image_size), tile
+            )
+            verts = meshes_proj.verts_padded()
+            verts_xy = verts[..., :2] * scale + verts.new_tensor([x_offset, y_offset])
+            meshes_proj = meshes_proj.update_padded(
+                torch.cat([verts_xy, verts[..., 2:]], dim=-1)
+            )
+            image_size = (tile[1] - tile[0], tile[3] - tile[2])
+            # blur_radius is a squared distance.
+            blur_radius = blur_radius * scale * scale
+
         # By default, turn on clip_barycentric_coords if blur_radius > 0.
         # When blur_radius > 0, a face can be matched to a pixel that is outside the
         # face, resulting in negative barycentric coordinates.
 
         pix_to_face, zbuf, bary_coords, dists = rasterize_meshes(
             meshes_proj,
-            image_size=raster_settings.image_size,
-            blur_radius=raster_settings.blur_radius,
+            image_size=image_size,
+            blur_radius=blur_radius,
             faces_per_pixel=raster_settings.faces_per_pixel,
             bin_size=raster_settings.bin_size,
             max_faces_per_bin=raster_settings.max_faces_per_bin,
@@ -263,11 +441,127 @@ class MeshRasterizer(nn.Module):
             cull_backfaces=raster_settings.cull_backfaces,
             z_clip_value=z_clip,
             cull_to_frustum=raster_settings.cull_to_frustum,
+            occlusion_culling=raster_settings.occlusion_culling,
+            precull_faces=raster_settings.precull_faces,
         )
+        if tile is not None:
+            # Give the distances in the NDC units of the whole image.
+            dists = torch.where(pix_to_face < 0, dists, dists / (scale * scale))
 
-        return Fragments(
+        fragments = Fragments(
             pix_to_face=pix_to_face,
             zbuf=zbuf,
             bary_coords=bary_coords,
             dists=dists,
         )
+        if raster_settings.sparse_fragments:
+            return fragments.to_sparse()
+        return fragments
+
+
+# Keyword arguments of a renderer which are only used by the shader.
+_SHADING_KWARGS = frozenset(["lights", "materials", "blend_params"])
+
+
+class CachingMeshRasterizer(MeshRasterizer):
+    """
+    A MeshRasterizer which keeps the Fragments of the most recent inputs, so
+    that rendering the same geometry from the same cameras again, e.g. while
+    only the lights, materials or textures change, skips rasterization.
+
+    The Fragments are looked up by a fingerprint of the contents of the
+    vertices and faces of the meshes, the cameras, the rasterization settings
+    and any other keyword arguments, except those which are only used by the
+    shader (lights, materials and blend_params). Textures are not part of the
+    fingerprint. Computing the fingerprint reads all these tensors on the CPU,
+    which is much cheaper than rasterizing. Tensors on other devices are not
+    read, which would synchronize with the device, but identified by their
+    memory and version counter instead. So on these devices, the Fragments
+    are only reused for the same tensors, e.g. the same Meshes object, and the
+    cache keeps these tensors alive.
+
+    When gradients are enabled and the vertices or the cameras require
+    gradients, the Fragments depend on them through autograd, so they are
+    neither looked up nor stored.
+    """
+
+    def __init__(
+        self, cameras=None, raster_settings=None, max_cache_size: int = 8
+    ) -> None:
+        """
+        Args:
+            cameras, raster_settings: As for MeshRasterizer.
+            max_cache_size: The maximum number of Fragments to keep. When the
+                cache is full, the least recently used Fragments are dropped.
+        """
+        super().__init__(cameras=cameras, raster_settings=raster_settings)
+        if max_cache_size < 1:
+            raise ValueError("max_cache_size must be positive.")
+        self.max_cache_size = max_cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, Union[Fragments, SparseFragments]]" = (
+            OrderedDict()
+        )
+        # The tensors on devices which the keys of the cache identify
+        self._cache_tensors: Dict[str, List[torch.Tensor]] = {}
+
+    def to(self, device):
+        self.clear_cache()
+        return super().to(device)
+
+    def clear_cache(self) -> None:
+        """
+        Drop all the cached Fragments, e.g. after changing the meshes or
+        cameras in a way which the fingerprint does not see.
+        """
+        self._cache.clear()
+        self._cache_tensors.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dictionary with the number of "hits" and "misses" of the cache.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def forward(self, meshes_world, **kwargs) -> Union[Fragments, SparseFragments]:
+        """
+        Args:
+            meshes_world: a Meshes object representing a batch of meshes with
+                          coordinates in world space.
+        Returns:
+            Fragments or SparseFragments: Rasterization outputs, which may be
+            the same object as returned by an earlier call.
+        """
+        digest = hashlib.sha1()
+        inputs = {
+            "verts": meshes_world.verts_packed(),
+            "faces": meshes_world.faces_packed(),
+            "num_verts_per_mesh": meshes_world.num_verts_per_mesh(),
+            "num_faces_per_mesh": meshes_world.num_faces_per_mesh(),
+            "cameras": kwargs.get("cameras", self.cameras),
+            "raster_settings": kwargs.get("raster_settings", self.raster_settings),
+        }
+        for name, value in kwargs.items():
+            if name not in _SHADING_KWARGS and name not in inputs:
+                inputs[name] = value
+        device_tensors = []
+        requires_grad = _update_fingerprint(digest, inputs, device_tensors)
+        if requires_grad and torch.is_grad_enabled():
+            return super().forward(meshes_world, **kwargs)
+
+        key = digest.hexdigest()
+        fragments = self._cache.get(key)
+        if fragments is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return fragments
+        self.misses += 1
+        fragments = super().forward(meshes_world, **kwargs)
+        self._cache[key] = fragments
+        self._cache_tensors[key] = device_tensors
+        if len(self._cache) > self.max_cache_size:
+            old_key, _ = self._cache.popitem(last=False)
+            del self._cache_tensors[old_key]
+        return fragments
@@ -6,12 +6,14 @@
 
 # pyre-unsafe
 
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
 import torch
 import torch.nn as nn
 
 from ...structures.meshes import Meshes
+from ..utils import _render_tiles
+from .rasterizer import MeshRasterizer
 
 # A renderer class should be initialized with a
 # function for rasterization and a function for shading.
@@ -36,10 +38,30 @@ class MeshRenderer(nn.Module):
     and shader class which each have a forward function.
     """
 
-    def __init__(self, rasterizer, shader) -> None:
+    def __init__(
+        self,
+        rasterizer,
+        shader,
+        tile_size: Optional[Union[int, Tuple[int, int]]] = None,
+    ) -> None:
+        """
+        Args:
+            rasterizer: a MeshRasterizer or a MeshRasterizerOpenGL.
+            shader: a shader, e.g. a HardPhongShader.
+            tile_size: If given, the images are rendered in tiles of at most
+                this size (an int for square tiles or a tuple (H, W)), which
+                are then stitched together. This bounds the size of the
+                fragments, which is otherwise proportional to the size of the
+                whole images, without changing the output. It needs a
+                MeshRasterizer, and a shader which shades each pixel on its own,
+                i.e. not the SplatterPhongShader.
+        """
         super().__init__()
+        if tile_size is not None and not isinstance(rasterizer, MeshRasterizer):
+            raise ValueError("Tiled rendering requires a MeshRasterizer.")
         self.rasterizer = rasterizer
         self.shader = shader
+        self.tile_size = tile_size
 
     def to(self, device):
         # Rasterizer and shader have submodules which are not of type nn.Module
@@ -60,6 +82,18 @@ class MeshRenderer(nn.Module):
         the range for the corresponding face.
         For this set rasterizer.raster_settings.clip_barycentric_coords=True
         """
+        if self.tile_size is not None:
+            raster_settings = kwargs.get(
+                "raster_settings", self.rasterizer.raster_settings
+            )
+            return _render_tiles(
+                lambda tile: self._render(meshes_world, tile=tile, **kwargs),
+                raster_settings.image_size,
+                self.tile_size,
+            )
+        return self._render(meshes_world, **kwargs)
+
+    def _render(self, meshes_world: Meshes, **kwargs) -> torch.Tensor:
         fragments = self.rasterizer(meshes_world, **kwargs)
         images = self.shader(fragments, meshes_world, **kwargs)
 
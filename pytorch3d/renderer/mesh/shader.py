@@ -7,7 +7,7 @@
 # pyre-unsafe
 
 import warnings
-from typing import Optional
+from typing import Optional, Union
 
 import torch
 import torch.nn as nn
@@ -24,7 +24,7 @@ from ..lighting import PointLights
 from ..materials import Materials
 from ..splatter_blend import SplatterBlender
 from ..utils import TensorProperties
-from .rasterizer import Fragments
+from .rasterizer import Fragments, SparseFragments
 from .shading import (
     _phong_shading_with_pixels,
     flat_shading,
@@ -121,22 +121,32 @@ class SoftPhongShader(ShaderBase):
     .. code-block::
 
         shader = SoftPhongShader(device=torch.device("cuda:0"))
+
+    The fragments can also be SparseFragments, see RasterizationSettings.
     """
 
-    def forward(self, fragments: Fragments, meshes: Meshes, **kwargs) -> torch.Tensor:
+    def forward(
+        self, fragments: Union[Fragments, SparseFragments], meshes: Meshes, **kwargs
+    ) -> torch.Tensor:
         cameras = super()._get_cameras(**kwargs)
-        texels = meshes.sample_textures(fragments)
+        sparse = isinstance(fragments, SparseFragments)
+        # SparseFragments are shaded in their padded form, with the faces of
+        # each image in one row.
+        shading_fragments = fragments.padded() if sparse else fragments
+        texels = meshes.sample_textures(shading_fragments)
         lights = kwargs.get("lights", self.lights)
         materials = kwargs.get("materials", self.materials)
         blend_params = kwargs.get("blend_params", self.blend_params)
         colors = phong_shading(
             meshes=meshes,
-            fragments=fragments,
+            fragments=shading_fragments,
             texels=texels,
             lights=lights,
             cameras=cameras,
             materials=materials,
         )
+        if sparse:
+            colors = fragments.unpad(colors)
         znear = kwargs.get("znear", getattr(cameras, "znear", 1.0))
         zfar = kwargs.get("zfar", getattr(cameras, "zfar", 100.0))
         images = softmax_rgb_blend(
@@ -297,7 +307,8 @@ class SoftSilhouetteShader(nn.Module):
     def forward(self, fragments: Fragments, meshes: Meshes, **kwargs) -> torch.Tensor:
         """
         Only want to render the silhouette so RGB values can be ones.
-        There is no need for lighting or texturing
+        There is no need for lighting or texturing. fragments can also be
+        SparseFragments.
         """
         colors = torch.ones_like(fragments.bary_coords)
         blend_params = kwargs.get("blend_params", self.blend_params)
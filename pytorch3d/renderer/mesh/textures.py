@@ -16,6 +16,7 @@ from pytorch3d.ops import interpolate_face_attributes
 from pytorch3d.structures.utils import list_to_packed, list_to_padded, padded_to_list
 from torch.nn.functional import interpolate
 
+from .rasterizer import SparseFragments
 from .utils import pack_unique_rectangles, PackedRectangle, Rectangle
 
 
@@ -303,9 +304,24 @@ class TexturesBase:
         Using `fragments.pix_to_face` and `fragments.bary_coords`
         this function should return the sampled texture values for
         each pixel in the output image.
+        For SparseFragments, it should return the texture values of shape
+        (M, C) for each of the M faces, e.g. with _sample_textures_sparse.
         """
         raise NotImplementedError()
 
+    def _sample_textures_sparse(
+        self, fragments: SparseFragments, **kwargs
+    ) -> torch.Tensor:
+        """
+        Sample the textures for SparseFragments by sampling them for the
+        padded faces of each image.
+
+        Returns:
+            texels: tensor of shape (M, C).
+        """
+        texels = self.sample_textures(fragments.padded(), **kwargs)
+        return fragments.unpad(texels)
+
     def submeshes(
         self,
         vertex_ids_list: List[List[torch.LongTensor]],
@@ -580,8 +596,10 @@ class TexturesAtlas(TexturesBase):
                 representation) which overlap the pixel.
 
         Returns:
-            texels: (N, H, W, K, C)
+            texels: (N, H, W, K, C), or (M, C) for SparseFragments.
         """
+        if isinstance(fragments, SparseFragments):
+            return self._sample_textures_sparse(fragments, **kwargs)
         N, H, W, K = fragments.pix_to_face.shape
         atlas_packed = self.atlas_packed()
         R = atlas_packed.shape[1]
@@ -1173,8 +1191,11 @@ class TexturesUV(TexturesBase):
 
         Returns:
             texels: tensor of shape (N, H, W, K, C) giving the interpolated
-            texture for each pixel in the rasterized image.
+            texture for each pixel in the rasterized image, or (M, C) for
+            SparseFragments.
         """
+        if isinstance(fragments, SparseFragments):
+            return self._sample_textures_sparse(fragments, **kwargs)
         if self.isempty():
             faces_verts_uvs = torch.zeros(
                 (self._N, 3, 2), dtype=torch.float32, device=self.device
@@ -1828,8 +1849,10 @@ class TexturesVertex(TexturesBase):
         Returns:
             texels: An texture per pixel of shape (N, H, W, K, C).
             There will be one C dimensional value for each element in
-            fragments.pix_to_face.
+            fragments.pix_to_face, i.e. the shape is (M, C) for SparseFragments.
         """
+        if isinstance(fragments, SparseFragments):
+            return self._sample_textures_sparse(fragments, faces_packed=faces_packed)
         verts_features_packed = self.verts_features_packed()
         faces_verts_features = verts_features_packed[faces_packed]
 
@@ -13,7 +13,11 @@ from .compositor import AlphaCompositor, NormWeightedCompositor
 from .pulsar.unified import PulsarPointsRenderer
 
 from .rasterize_points import rasterize_points
-from .rasterizer import PointsRasterizationSettings, PointsRasterizer
+from .rasterizer import (
+    IncrementalPointsRasterizer,
+    PointsRasterizationSettings,
+    PointsRasterizer,
+)
 from .renderer import PointsRenderer
 
 
@@ -7,14 +7,19 @@
 
 # pyre-unsafe
 
+import dataclasses
+import hashlib
 from dataclasses import dataclass
-from typing import NamedTuple, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 import torch
 import torch.nn as nn
 from pytorch3d.renderer.cameras import try_get_projection_transform
+from pytorch3d.renderer.mesh.rasterize_meshes import ndc_tile_transform
 from pytorch3d.structures import Pointclouds
+from pytorch3d.structures.utils import list_to_padded
 
+from ..utils import _update_fingerprint, parse_image_size
 from .rasterize_points import rasterize_points
 
 
@@ -153,17 +158,242 @@ class PointsRasterizer(nn.Module):
         """
         Args:
             point_clouds: a set of point clouds with coordinates in world space.
+            tile: (optional) tuple (y_start, y_end, x_start, x_end) of the rows
+                and columns of the image to rasterize, if only a tile of the
+                image is needed. The outputs then have the size of the tile,
+                and are the same as that part of the outputs for the whole
+                image.
         Returns:
             PointFragments: Rasterization outputs as a named tuple.
         """
         points_proj = self.transform(point_clouds, **kwargs)
         raster_settings = kwargs.get("raster_settings", self.raster_settings)
+        image_size = raster_settings.image_size
+        radius = raster_settings.radius
+        tile = kwargs.get("tile", None)
+        if tile is not None:
+            # Rasterize the tile as a whole image of the size of the tile.
+            scale, x_offset, y_offset = ndc_tile_transform(
+                parse_image_size(image_size), tile
+            )
+            points = points_proj.points_padded()
+            offset = points.new_tensor([x_offset, y_offset])
+            points_xy = points[..., :2] * scale + offset
+            points_proj = points_proj.update_padded(
+                torch.cat([points_xy, points[..., 2:]], dim=-1)
+            )
+            image_size = (tile[1] - tile[0], tile[3] - tile[2])
+            radius = radius * scale
+
         idx, zbuf, dists2 = rasterize_points(
             points_proj,
-            image_size=raster_settings.image_size,
-            radius=raster_settings.radius,
+            image_size=image_size,
+            radius=radius,
             points_per_pixel=raster_settings.points_per_pixel,
             bin_size=raster_settings.bin_size,
             max_points_per_bin=raster_settings.max_points_per_bin,
         )
+        if tile is not None:
+            # Give the distances in the NDC units of the whole image.
+            dists2 = torch.where(idx < 0, dists2, dists2 / (scale * scale))
         return PointFragments(idx=idx, zbuf=zbuf, dists=dists2)
+
+
+class _IncrementalState(NamedTuple):
+    key: str
+    points: torch.Tensor
+    lengths: torch.Tensor
+    fragments: PointFragments
+    # The tensors on devices which the key identifies
+    device_tensors: List[torch.Tensor]
+
+
+class IncrementalPointsRasterizer(PointsRasterizer):
+    """
+    A PointsRasterizer for point clouds which grow from call to call while the
+    cameras stay the same, e.g. to show a reconstruction while it is built.
+
+    The PointFragments of the most recent call are kept. If the next point
+    clouds start with the same points as the previous ones, and the cameras,
+    the rasterization settings and the other keyword arguments are the same,
+    only the added points are rasterized, and the nearest points_per_pixel
+    points at each pixel are merged from the two. The result is the same as
+    rasterizing all the points, except maybe for the order of points at the
+    same depth.
+
+    When gradients are enabled and the points or the cameras require
+    gradients, all the points are rasterized and nothing is kept.
+    """
+
+    def __init__(self, cameras=None, raster_settings=None) -> None:
+        """
+        Args:
+            cameras, raster_settings: As for PointsRasterizer.
+        """
+        super().__init__(cameras=cameras, raster_settings=raster_settings)
+        self.num_incremental = 0
+        self.num_full = 0
+        self._state: Optional[_IncrementalState] = None
+
+    def to(self, device):
+        self.clear_cache()
+        return super().to(device)
+
+    def clear_cache(self) -> None:
+        """
+        Drop the kept PointFragments, so that the next call rasterizes all
+        the points.
+        """
+        self._state = None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dictionary with the number of calls which only rasterized the added
+            points ("incremental") and which rasterized all of them ("full").
+        """
+        return {"incremental": self.num_incremental, "full": self.num_full}
+
+    def forward(self, point_clouds, **kwargs) -> PointFragments:
+        """
+        Args:
+            point_clouds: a set of point clouds with coordinates in world space.
+        Returns:
+            PointFragments: Rasterization outputs as a named tuple.
+        """
+        raster_settings = kwargs.get("raster_settings", self.raster_settings)
+        radius = _radius_list(raster_settings.radius, point_clouds)
+        points = point_clouds.points_padded()
+        lengths = point_clouds.num_points_per_cloud()
+        if radius is not None:
+            # A radius per point is checked together with the points.
+            points = torch.cat([points, list_to_padded(radius)[..., None]], dim=-1)
+            raster_settings = dataclasses.replace(raster_settings, radius=None)
+
+        digest = hashlib.sha1()
+        inputs = {
+            "cameras": kwargs.get("cameras", self.cameras),
+            "raster_settings": raster_settings,
+        }
+        for name, value in kwargs.items():
+            if name not in inputs:
+                inputs[name] = value
+        device_tensors = []
+        requires_grad = _update_fingerprint(digest, inputs, device_tensors)
+        requires_grad = requires_grad or points.requires_grad
+        if requires_grad and torch.is_grad_enabled():
+            self.clear_cache()
+            return super().forward(point_clouds, **kwargs)
+
+        key = digest.hexdigest()
+        state = self._state
+        if state is not None and self._extends(state, key, points, lengths):
+            self.num_incremental += 1
+            fragments = self._add_points(point_clouds, state, radius, **kwargs)
+        else:
+            self.num_full += 1
+            fragments = super().forward(point_clouds, **kwargs)
+        self._state = _IncrementalState(
+            key=key,
+            points=points.detach().clone(),
+            lengths=lengths,
+            fragments=fragments,
+            device_tensors=device_tensors,
+        )
+        return fragments
+
+    @staticmethod
+    def _extends(
+        state: _IncrementalState,
+        key: str,
+        points: torch.Tensor,
+        lengths: torch.Tensor,
+    ) -> bool:
+        """
+        Whether the point clouds with padded points and lengths start with the
+        points of the state, for the same other inputs.
+        """
+        if state.key != key or state.lengths.shape != lengths.shape:
+            return False
+        if state.points.device != points.device or (state.lengths > lengths).any():
+            return False
+        P = state.points.shape[1]
+        old_mask = torch.arange(P, device=points.device) < state.lengths[:, None]
+        same = (points[:, :P] == state.points).all(dim=-1)
+        return bool((same | ~old_mask).all())
+
+    def _add_points(
+        self,
+        point_clouds: Pointclouds,
+        state: _IncrementalState,
+        radius: Optional[List[torch.Tensor]],
+        **kwargs,
+    ) -> PointFragments:
+        """
+        Rasterize the points of point_clouds which are not in the state, and
+        merge them into the PointFragments of the state.
+        """
+        old_lengths = state.lengths
+        lengths = point_clouds.num_points_per_cloud()
+        fragments = state.fragments
+        if (lengths == old_lengths).all():
+            return fragments
+
+        old_lengths_list = old_lengths.tolist()
+        added_points = [
+            points[old_length:]
+            for points, old_length in zip(point_clouds.points_list(), old_lengths_list)
+        ]
+        added = Pointclouds(points=added_points)
+        raster_settings = kwargs.pop("raster_settings", self.raster_settings)
+        if radius is not None:
+            added_radius = [r[n:] for r, n in zip(radius, old_lengths_list)]
+            raster_settings = dataclasses.replace(
+                raster_settings, radius=list_to_padded(added_radius)
+            )
+        added_fragments = super().forward(
+            added, raster_settings=raster_settings, **kwargs
+        )
+
+        # Make the indices refer to the packed points of point_clouds. The
+        # added points follow the old points of the same cloud.
+        first_idx = point_clouds.cloud_to_packed_first_idx()
+        old_first_idx = old_lengths.cumsum(0) - old_lengths
+        old_offset = first_idx - old_first_idx
+        added_offset = first_idx + old_lengths - added.cloud_to_packed_first_idx()
+        idx = torch.cat([fragments.idx, added_fragments.idx], dim=-1)
+        offset = torch.cat(
+            [
+                old_offset.view(-1, 1, 1, 1).expand_as(fragments.idx),
+                added_offset.view(-1, 1, 1, 1).expand_as(added_fragments.idx),
+            ],
+            dim=-1,
+        )
+        idx = torch.where(idx < 0, idx, idx + offset)
+        zbuf = torch.cat([fragments.zbuf, added_fragments.zbuf], dim=-1)
+        dists = torch.cat([fragments.dists, added_fragments.dists], dim=-1)
+
+        # Keep the nearest points of both, with the missing ones last.
+        K = fragments.idx.shape[-1]
+        depth = torch.where(idx < 0, torch.full_like(zbuf, float("inf")), zbuf)
+        order = depth.argsort(dim=-1, stable=True)[..., :K]
+        return PointFragments(
+            idx=idx.gather(-1, order),
+            zbuf=zbuf.gather(-1, order),
+            dists=dists.gather(-1, order),
+        )
+
+
+def _radius_list(radius, point_clouds) -> Optional[List[torch.Tensor]]:
+    """
+    The radius of the points of each cloud, if radius is given per point.
+    """
+    if isinstance(radius, (list, tuple)):
+        radius = torch.tensor(radius)
+    if not isinstance(radius, torch.Tensor) or radius.ndim == 0:
+        return None
+    radius = radius.to(point_clouds.device)
+    if len(point_clouds) == 1 and radius.ndim == 1:
+        radius = radius[None]
+    lengths = point_clouds.num_points_per_cloud().tolist()
+    return [r[:length] for r, length in zip(radius, lengths)]
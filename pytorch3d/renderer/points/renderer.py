@@ -7,9 +7,13 @@
 
 # pyre-unsafe
 
+from typing import Optional, Tuple, Union
+
 import torch
 import torch.nn as nn
 
+from ..utils import _render_tiles
+
 
 # A renderer class should be initialized with a
 # function for rasterization and a function for compositing.
@@ -40,10 +44,26 @@ class PointsRenderer(nn.Module):
     (https://arxiv.org/pdf/1912.08804.pdf) for more details.
     """
 
-    def __init__(self, rasterizer, compositor) -> None:
+    def __init__(
+        self,
+        rasterizer,
+        compositor,
+        tile_size: Optional[Union[int, Tuple[int, int]]] = None,
+    ) -> None:
+        """
+        Args:
+            rasterizer: a PointsRasterizer.
+            compositor: a compositor, e.g. an AlphaCompositor.
+            tile_size: If given, the images are rendered in tiles of at most
+                this size (an int for square tiles or a tuple (H, W)), which
+                are then stitched together. This bounds the size of the
+                fragments, which is otherwise proportional to the size of the
+                whole images, without changing the output.
+        """
         super().__init__()
         self.rasterizer = rasterizer
         self.compositor = compositor
+        self.tile_size = tile_size
 
     def to(self, device):
         # Manually move to device rasterizer as the cameras
@@ -53,6 +73,18 @@ class PointsRenderer(nn.Module):
         return self
 
     def forward(self, point_clouds, **kwargs) -> torch.Tensor:
+        if self.tile_size is not None:
+            raster_settings = kwargs.get(
+                "raster_settings", self.rasterizer.raster_settings
+            )
+            return _render_tiles(
+                lambda tile: self._render(point_clouds, tile=tile, **kwargs),
+                raster_settings.image_size,
+                self.tile_size,
+            )
+        return self._render(point_clouds, **kwargs)
+
+    def _render(self, point_clouds, **kwargs) -> torch.Tensor:
         fragments = self.rasterizer(point_clouds, **kwargs)
 
         # Construct weights based on the distance of a point to the true point.
@@ -8,9 +8,10 @@
 
 
 import copy
+import dataclasses
 import inspect
 import warnings
-from typing import Any, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, Union
 
 import numpy as np
 import torch
@@ -460,3 +461,98 @@ def parse_image_size(
     if not all(isinstance(i, int) for i in image_size):
         raise ValueError("Image sizes must be integers; got %f, %f" % image_size)
     return tuple(image_size)
+
+
+def _render_tiles(
+    render_tile: Callable[[Tuple[int, int, int, int]], torch.Tensor],
+    image_size: Union[List[int], Tuple[int, int], int],
+    tile_size: Union[List[int], Tuple[int, int], int],
+) -> torch.Tensor:
+    """
+    Render an image tile by tile and stitch the tiles together, so that only
+    the intermediate outputs of one tile, e.g. its fragments, are needed at a
+    time.
+
+    Args:
+        render_tile: function which takes a tile (y_start, y_end, x_start, x_end)
+            of the rows and columns of the image, and returns the rendered tile
+            as a tensor of shape (N, y_end - y_start, x_end - x_start, C).
+        image_size: A single int (for square images) or a tuple/list of two
+            ints giving the size of the whole image.
+        tile_size: A single int (for square tiles) or a tuple/list of two ints
+            giving the maximum size of a tile.
+
+    Returns:
+        images: tensor of shape (N, H, W, C).
+    """
+    H, W = parse_image_size(image_size)
+    tile_h, tile_w = parse_image_size(tile_size)
+    rows = []
+    for y_start in range(0, H, tile_h):
+        y_end = min(y_start + tile_h, H)
+        tiles = [
+            render_tile((y_start, y_end, x_start, min(x_start + tile_w, W)))
+            for x_start in range(0, W, tile_w)
+        ]
+        rows.append(torch.cat(tiles, dim=2))
+    return torch.cat(rows, dim=1)
+
+
+# Attributes which every nn.Module has, which are not part of the properties
+# of a TensorProperties object.
+_MODULE_ATTRS = frozenset(vars(nn.Module()))
+
+
+def _update_fingerprint(
+    digest, value, device_tensors: Optional[List[torch.Tensor]] = None
+) -> bool:
+    """
+    Add value, which may be a tensor, a TensorProperties object such as
+    cameras, a dataclass or a container of these, to a hashlib digest.
+
+    The contents of CPU tensors are added. Reading the contents of tensors on
+    other devices would copy them to the host and synchronize, so only their
+    identity is added: their storage, layout and version counter, which
+    changes on every in-place modification. These tensors are appended to
+    device_tensors, which the caller must keep alive as long as the digest is
+    used, so that their memory is not reused by other tensors.
+
+    Returns:
+        Whether any tensor in value requires gradients.
+    """
+    if device_tensors is None:
+        device_tensors = []
+    requires_grad = False
+    if isinstance(value, torch.Tensor):
+        digest.update(repr((value.dtype, tuple(value.shape), value.device)).encode())
+        if value.device.type == "cpu":
+            data = value.detach().contiguous().reshape(-1)
+            digest.update(data.view(torch.uint8).numpy().tobytes())
+        else:
+            identity = (value.data_ptr(), value.stride(), value._version)
+            digest.update(repr(identity).encode())
+            device_tensors.append(value)
+        requires_grad = value.requires_grad
+    elif isinstance(value, TensorProperties):
+        digest.update(type(value).__name__.encode())
+        properties = {k: v for k, v in vars(value).items() if k not in _MODULE_ATTRS}
+        requires_grad = _update_fingerprint(digest, properties, device_tensors)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        digest.update(type(value).__name__.encode())
+        for field in dataclasses.fields(value):
+            digest.update(field.name.encode())
+            if _update_fingerprint(digest, getattr(value, field.name), device_tensors):
+                requires_grad = True
+    elif isinstance(value, dict):
+        for k in sorted(value):
+            digest.update(repr(k).encode())
+            if _update_fingerprint(digest, value[k], device_tensors):
+                requires_grad = True
+    elif isinstance(value, (list, tuple)):
+        digest.update(repr((type(value).__name__, len(value))).encode())
+        for v in value:
+            if _update_fingerprint(digest, v, device_tensors):
+                requires_grad = True
+    else:
+        digest.update(repr(value).encode())
+    return requires_grad
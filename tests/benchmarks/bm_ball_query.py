@@ -6,6 +6,7 @@
 
 from itertools import product
 
+import torch
 from fvcore.common.benchmark import benchmark
 from tests.test_ball_query import TestBallQuery
 
@@ -35,6 +36,26 @@ def bm_ball_query() -> None:
         TestBallQuery.ball_query_ragged, "BALLQUERY_RAGGED", kwargs_list, warmup_iters=1
     )
 
+    # Scaling of the CPU implementation with the number of threads.
+    num_threads = torch.get_num_threads()
+    kwargs_list = []
+    Ns = [1, 32]
+    P1s = [4096]
+    P2s = [4096]
+    threads = [1, 2, 4, 8, 16]
+    for N, P1, P2, t in product(Ns, P1s, P2s, threads):
+        kwargs_list.append(
+            {"N": N, "P1": P1, "P2": P2, "D": 3, "K": 24, "radius": 0.2, "threads": t}
+        )
+
+    benchmark(
+        TestBallQuery.ball_query_cpu_num_threads,
+        "BALLQUERY_CPU_THREADS",
+        kwargs_list,
+        warmup_iters=1,
+    )
+    torch.set_num_threads(num_threads)
+
 
 if __name__ == "__main__":
     bm_ball_query()
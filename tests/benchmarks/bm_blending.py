@@ -7,8 +7,10 @@
 
 from itertools import product
 
+import torch
 from fvcore.common.benchmark import benchmark
 from tests.test_blending import TestBlending
+from tests.test_compositing import TestAccumulatePoints
 
 
 def bm_blending() -> None:
@@ -69,6 +71,41 @@ def bm_blending() -> None:
         warmup_iters=1,
     )
 
+    # Scaling of the CPU implementations with the number of threads.
+    num_threads = torch.get_num_threads()
+    threads = [1, 2, 4, 8, 16]
+    kwargs_list = []
+    for s, t in product([128, 256], threads):
+        kwargs_list.append(
+            {"num_meshes": 8, "image_size": s, "faces_per_pixel": 50, "threads": t}
+        )
+    benchmark(
+        TestBlending.bm_sigmoid_alpha_blending_cpu_num_threads,
+        "SIGMOID_ALPHA_BLENDING_CPU_THREADS",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
+    kwargs_list = []
+    methods = ["alpha_composite", "weighted_sum", "norm_weighted_sum"]
+    for m, t in product(methods, threads):
+        kwargs_list.append(
+            {
+                "method": m,
+                "num_clouds": 8,
+                "image_size": 256,
+                "points_per_pixel": 8,
+                "threads": t,
+            }
+        )
+    benchmark(
+        TestAccumulatePoints.bm_compositing_cpu_num_threads,
+        "COMPOSITING_CPU_THREADS",
+        kwargs_list,
+        warmup_iters=1,
+    )
+    torch.set_num_threads(num_threads)
+
 
 if __name__ == "__main__":
     bm_blending()
@@ -12,7 +12,17 @@ from tests.test_chamfer import TestChamfer
 
 
 def bm_chamfer() -> None:
-    # Currently disabled.
+    # Throughput of the CPU methods against the number of points.
+    kwargs_list = [{"P": P, "method": "bruteforce"} for P in [1000, 10000]]
+    kwargs_list += [{"P": P, "method": "grid"} for P in [1000, 10000, 100000, 1000000]]
+    benchmark(
+        TestChamfer.chamfer_cpu_method,
+        "CHAMFER_CPU_METHOD",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
+    # The rest is currently disabled.
     return
     devices = ["cpu"]
     if torch.cuda.is_available():
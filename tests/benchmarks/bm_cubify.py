@@ -16,6 +16,18 @@ def bm_cubify() -> None:
     ]
     benchmark(TestCubify.cubify_with_init, "CUBIFY", kwargs_list, warmup_iters=1)
 
+    kwargs_list = [
+        {"batch_size": 1, "V": 256, "num_voxels": 10000},
+        {"batch_size": 1, "V": 512, "num_voxels": 100000},
+        {"batch_size": 4, "V": 1024, "num_voxels": 100000},
+    ]
+    benchmark(
+        TestCubify.cubify_sparse_with_init,
+        "CUBIFY_SPARSE",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
 
 if __name__ == "__main__":
     bm_cubify()
@@ -0,0 +1,32 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+
+from itertools import product
+
+from fvcore.common.benchmark import benchmark
+from tests.test_decimate_meshes import TestDecimateMeshes
+
+
+def bm_decimate() -> None:
+    kwargs_list = []
+    num_meshes = [1, 8]
+    ico_level = [4, 5]
+    ratio = [0.25, 0.05]
+    test_cases = product(num_meshes, ico_level, ratio)
+    for case in test_cases:
+        n, ic, r = case
+        kwargs_list.append({"num_meshes": n, "ico_level": ic, "ratio": r})
+    benchmark(
+        TestDecimateMeshes.decimate_meshes_with_init,
+        "DECIMATE",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
+
+if __name__ == "__main__":
+    bm_decimate()
@@ -6,6 +6,7 @@
 
 from itertools import product
 
+import torch
 from fvcore.common.benchmark import benchmark
 from tests.test_knn import TestKNN
 
@@ -29,6 +30,31 @@ def bm_knn() -> None:
 
     benchmark(TestKNN.knn_ragged, "KNN_RAGGED", kwargs_list, warmup_iters=1)
 
+    # Scaling of the CPU implementation with the number of threads.
+    num_threads = torch.get_num_threads()
+    kwargs_list = []
+    Ns = [1, 32]
+    P1s = [4096]
+    P2s = [4096]
+    Ks = [8]
+    threads = [1, 2, 4, 8, 16]
+    for N, P1, P2, K, t in product(Ns, P1s, P2s, Ks, threads):
+        kwargs_list.append({"N": N, "P1": P1, "P2": P2, "D": 3, "K": K, "threads": t})
+
+    benchmark(
+        TestKNN.knn_cpu_num_threads, "KNN_CPU_THREADS", kwargs_list, warmup_iters=1
+    )
+    torch.set_num_threads(num_threads)
+
+    # The grid method against the brute force method on large clouds.
+    kwargs_list = []
+    Ps = [10000, 100000]
+    methods = ["bruteforce", "grid"]
+    for P, K, method in product(Ps, [1, 8], methods):
+        kwargs_list.append({"P1": P, "P2": P, "K": K, "method": method})
+
+    benchmark(TestKNN.knn_cpu_method, "KNN_CPU_METHOD", kwargs_list, warmup_iters=1)
+
 
 if __name__ == "__main__":
     bm_knn()
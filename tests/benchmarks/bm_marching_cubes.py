@@ -6,6 +6,7 @@
 
 import itertools
 
+import torch
 from fvcore.common.benchmark import benchmark
 from tests.test_marching_cubes import TestMarchingCubes
 
@@ -30,6 +31,31 @@ def bm_marching_cubes() -> None:
         warmup_iters=1,
     )
 
+    # A block_size of 0 marches the whole volume.
+    case_grid = {"V": [64, 128, 256], "block_size": [0, 8, 16, 32]}
+    test_cases = itertools.product(*case_grid.values())
+    kwargs_list = [dict(zip(case_grid.keys(), case)) for case in test_cases]
+
+    benchmark(
+        TestMarchingCubes.marching_cubes_sphere_with_init,
+        "MARCHING_CUBES_SPHERE",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
+    num_threads = torch.get_num_threads()
+    case_grid = {"batch_size": [1, 8], "V": [64, 128], "threads": [1, 2, 4, 8, 16]}
+    test_cases = itertools.product(*case_grid.values())
+    kwargs_list = [dict(zip(case_grid.keys(), case)) for case in test_cases]
+
+    benchmark(
+        TestMarchingCubes.marching_cubes_cpu_num_threads,
+        "MARCHING_CUBES_CPU_THREADS",
+        kwargs_list,
+        warmup_iters=1,
+    )
+    torch.set_num_threads(num_threads)
+
 
 if __name__ == "__main__":
     bm_marching_cubes()
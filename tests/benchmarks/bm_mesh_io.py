@@ -68,6 +68,18 @@ def bm_save_load() -> None:
         warmup_iters=1,
     )
 
+    # Compare the vectorized obj parser with the line by line one.
+    parse_kwargs_list = [
+        {"V": 500000, "F": 1000000, "vectorized": vectorized}
+        for vectorized in [False, True]
+    ]
+    benchmark(
+        TestMeshObjIO.bm_parse_obj,
+        "PARSE_OBJ",
+        parse_kwargs_list,
+        warmup_iters=1,
+    )
+
     # Texture loading benchmarks
     kwargs_list = [{"R": 2}, {"R": 4}, {"R": 10}, {"R": 15}, {"R": 20}]
     benchmark(
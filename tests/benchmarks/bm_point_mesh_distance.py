@@ -39,6 +39,21 @@ def bm_point_mesh_distance() -> None:
         warmup_iters=1,
     )
 
+    # The CPU implementation searches a BVH of each mesh, so it scales with
+    # the logarithm of the number of faces.
+    kwargs_list = []
+    ico_levels = [2, 4, 6]
+    num_points = [10000, 100000]
+    for level, p in product(ico_levels, num_points):
+        kwargs_list.append({"ico_level": level, "P": p})
+
+    benchmark(
+        TestPointMeshDistance.point_mesh_face_cpu_sphere,
+        "POINT_MESH_FACE_CPU_SPHERE",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
 
 if __name__ == "__main__":
     bm_point_mesh_distance()
@@ -8,6 +8,7 @@
 import logging
 import sys
 from os import path
+from typing import Optional
 
 import torch
 from fvcore.common.benchmark import benchmark
@@ -30,10 +31,13 @@ C++ by activating `PULSAR_TIMINGS_BATCHED_ENABLED` in the file
 """
 
 
-def _bm_pulsar():
-    n_points = 1_000_000
-    width = 1_000
-    height = 1_000
+def _bm_pulsar(
+    n_points: int = 1_000_000,
+    width: int = 1_000,
+    height: int = 1_000,
+    device: str = "cuda",
+    threads: Optional[int] = None,
+):
     renderer = Renderer(width, height, n_points)
     # Generate sample data.
     torch.manual_seed(1)
@@ -45,7 +49,7 @@ def _bm_pulsar():
     cam_params = torch.tensor(
         [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 5.0, 2.0], dtype=torch.float32
     )
-    device = torch.device("cuda")
+    device = torch.device(device)
     vert_pos = vert_pos.to(device)
     vert_col = vert_col.to(device)
     vert_rad = vert_rad.to(device)
@@ -55,6 +59,8 @@ def _bm_pulsar():
     vert_col_var = Variable(vert_col, requires_grad=False)
     vert_rad_var = Variable(vert_rad, requires_grad=False)
     cam_params_var = Variable(cam_params, requires_grad=False)
+    if threads is not None:
+        torch.set_num_threads(threads)
 
     def bm_closure():
         renderer.forward(
@@ -66,15 +72,19 @@ def _bm_pulsar():
             45.0,
             percent_allowed_difference=0.01,
         )
-        torch.cuda.synchronize()
+        if device.type == "cuda":
+            torch.cuda.synchronize()
 
     return bm_closure
 
 
-def _bm_pulsar_backward():
-    n_points = 1_000_000
-    width = 1_000
-    height = 1_000
+def _bm_pulsar_backward(
+    n_points: int = 1_000_000,
+    width: int = 1_000,
+    height: int = 1_000,
+    device: str = "cuda",
+    threads: Optional[int] = None,
+):
     renderer = Renderer(width, height, n_points)
     # Generate sample data.
     torch.manual_seed(1)
@@ -86,7 +96,7 @@ def _bm_pulsar_backward():
     cam_params = torch.tensor(
         [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 5.0, 2.0], dtype=torch.float32
     )
-    device = torch.device("cuda")
+    device = torch.device(device)
     vert_pos = vert_pos.to(device)
     vert_col = vert_col.to(device)
     vert_rad = vert_rad.to(device)
@@ -96,6 +106,8 @@ def _bm_pulsar_backward():
     vert_col_var = Variable(vert_col, requires_grad=True)
     vert_rad_var = Variable(vert_rad, requires_grad=True)
     cam_params_var = Variable(cam_params, requires_grad=True)
+    if threads is not None:
+        torch.set_num_threads(threads)
     res = renderer.forward(
         vert_pos_var,
         vert_col_var,
@@ -109,12 +121,30 @@ def _bm_pulsar_backward():
 
     def bm_closure():
         loss.backward(retain_graph=True)
-        torch.cuda.synchronize()
+        if device.type == "cuda":
+            torch.cuda.synchronize()
 
     return bm_closure
 
 
 def bm_pulsar() -> None:
+    # On the CPU, the number of rendered spheres per second for each number
+    # of threads is n_points divided by the reported time.
+    num_threads = torch.get_num_threads()
+    kwargs_list = [
+        {
+            "n_points": 100_000,
+            "width": 512,
+            "height": 512,
+            "device": "cpu",
+            "threads": threads,
+        }
+        for threads in [1, 2, 4, 8, 16]
+    ]
+    benchmark(_bm_pulsar, "PULSAR_FORWARD_CPU", kwargs_list, warmup_iters=1)
+    benchmark(_bm_pulsar_backward, "PULSAR_BACKWARD_CPU", kwargs_list, warmup_iters=1)
+    torch.set_num_threads(num_threads)
+
     if not torch.cuda.is_available():
         return
 
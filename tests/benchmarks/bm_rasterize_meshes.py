@@ -65,6 +65,85 @@ def bm_rasterize_meshes() -> None:
         warmup_iters=1,
     )
 
+    # Naive (bin_size=0) against coarse-to-fine (bin_size=None) on the CPU.
+    kwargs_list = []
+    ico_level = [4, 5]
+    image_size = [256, 512, (512, 256)]
+    bin_size = [0, None]
+    test_cases = product(ico_level, image_size, bin_size)
+    for case in test_cases:
+        ic, im, bs = case
+        kwargs_list.append(
+            {
+                "num_meshes": 1,
+                "ico_level": ic,
+                "image_size": im,
+                "blur_radius": 0.0,
+                "faces_per_pixel": 1,
+                "bin_size": bs,
+            }
+        )
+    benchmark(
+        TestRasterizeMeshes.rasterize_meshes_cpu_with_init,
+        "RASTERIZE_MESHES_CPU_BINNED",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
+    # Hard rasterization on the CPU with and without occlusion culling.
+    kwargs_list = []
+    ico_level = [4, 5]
+    image_size = [256, 512]
+    occlusion_culling = [False, True]
+    test_cases = product(ico_level, image_size, occlusion_culling)
+    for case in test_cases:
+        ic, im, oc = case
+        kwargs_list.append(
+            {
+                "num_meshes": 1,
+                "ico_level": ic,
+                "image_size": im,
+                "blur_radius": 0.0,
+                "faces_per_pixel": 1,
+                "bin_size": None,
+                "occlusion_culling": oc,
+            }
+        )
+    benchmark(
+        TestRasterizeMeshes.rasterize_meshes_cpu_with_init,
+        "RASTERIZE_MESHES_CPU_OCCLUSION_CULLING",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
+    # Zoomed-in views on the CPU, with and without removing the faces outside
+    # the image before rasterization.
+    kwargs_list = []
+    ico_level = [5, 6]
+    zoom = [1.0, 8.0]
+    precull_faces = [False, True]
+    test_cases = product(ico_level, zoom, precull_faces)
+    for case in test_cases:
+        ic, z, pc = case
+        kwargs_list.append(
+            {
+                "num_meshes": 1,
+                "ico_level": ic,
+                "image_size": 256,
+                "blur_radius": 1e-4,
+                "faces_per_pixel": 8,
+                "bin_size": None,
+                "precull_faces": pc,
+                "zoom": z,
+            }
+        )
+    benchmark(
+        TestRasterizeMeshes.rasterize_meshes_cpu_with_init,
+        "RASTERIZE_MESHES_CPU_PRECULL_FACES",
+        kwargs_list,
+        warmup_iters=1,
+    )
+
     if torch.cuda.is_available():
         kwargs_list = []
         num_meshes = [8, 16]
@@ -6,6 +6,7 @@
 
 from itertools import product
 
+import torch
 from fvcore.common.benchmark import benchmark
 from tests.test_sample_farthest_points import TestFPS
 
@@ -41,6 +42,23 @@ def bm_fps() -> None:
 
     benchmark(TestFPS.sample_farthest_points, "FPS", kwargs_list, warmup_iters=1)
 
+    # Scaling of the CPU implementation with the number of threads, both
+    # across the batch and within a single large point cloud.
+    num_threads = torch.get_num_threads()
+    kwargs_list = []
+    NPs = [(32, 8192), (1, 262144)]
+    threads = [1, 2, 4, 8, 16]
+    for (N, P), t in product(NPs, threads):
+        kwargs_list.append({"N": N, "P": P, "D": 3, "K": 48, "threads": t})
+
+    benchmark(
+        TestFPS.sample_farthest_points_cpu_num_threads,
+        "FPS_CPU_THREADS",
+        kwargs_list,
+        warmup_iters=1,
+    )
+    torch.set_num_threads(num_threads)
+
 
 if __name__ == "__main__":
     bm_fps()
@@ -351,6 +351,44 @@ class TestForward(unittest.TestCase):
                 )
             )
 
+    def test_num_threads(self):
+        """Test that the CPU results do not depend on the number of threads."""
+        from pytorch3d.renderer.points.pulsar import Renderer
+
+        LOGGER.info("Setting up rendering test for multiple threads...")
+        n_points = 100
+        width = 100
+        height = 80
+        renderer = Renderer(width, height, n_points)
+        torch.manual_seed(1)
+        vert_pos = torch.rand(n_points, 3, dtype=torch.float32) * 10.0
+        vert_pos[:, 2] += 25.0
+        vert_pos[:, :2] -= 5.0
+        vert_col = torch.rand(n_points, 3, dtype=torch.float32)
+        vert_rad = torch.rand(n_points, dtype=torch.float32)
+        cam_params = torch.tensor(
+            [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 5.0, 2.0], dtype=torch.float32
+        )
+        num_threads = torch.get_num_threads()
+        results = []
+        try:
+            for threads in [1, 4]:
+                torch.set_num_threads(threads)
+                inputs = [
+                    tensor.clone().requires_grad_()
+                    for tensor in [vert_pos, vert_col, vert_rad, cam_params]
+                ]
+                result = renderer.forward(*inputs, 1.0e-1, 45.0)
+                result.sum().backward()
+                results.append([result.detach()] + [t.grad for t in inputs])
+        finally:
+            torch.set_num_threads(num_threads)
+        # The images are the same, the gradients are accumulated in a
+        # different order.
+        self.assertTrue(torch.equal(results[0][0], results[1][0]))
+        for grad_1, grad_4 in zip(results[0][1:], results[1][1:]):
+            self.assertTrue(torch.allclose(grad_1, grad_4, rtol=1e-4, atol=1e-5))
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
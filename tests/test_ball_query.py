@@ -190,6 +190,27 @@ class TestBallQuery(TestCaseMixin, unittest.TestCase):
         self.assertTrue(naive_out_allzeros)
         self.assertTrue(cuda_out_allzeros)
 
+    def test_cpu_num_threads(self):
+        """
+        The CPU implementation gives identical results for any number of threads.
+        """
+        N, P1, P2, K, D = 5, 300, 200, 7, 3
+        x = torch.rand((N, P1, D))
+        y = torch.rand((N, P2, D))
+        lengths1 = torch.randint(low=1, high=P1, size=(N,))
+        lengths2 = torch.randint(low=1, high=P2, size=(N,))
+        old_num_threads = torch.get_num_threads()
+        outputs = []
+        try:
+            for num_threads in [1, 4]:
+                torch.set_num_threads(num_threads)
+                out = ball_query(x, y, lengths1, lengths2, K=K, radius=0.2)
+                outputs.append(out)
+        finally:
+            torch.set_num_threads(old_num_threads)
+        self.assertTrue(torch.equal(outputs[0].dists, outputs[1].dists))
+        self.assertTrue(torch.equal(outputs[0].idx, outputs[1].idx))
+
     @staticmethod
     def ball_query_square(
         N: int, P1: int, P2: int, D: int, K: int, radius: float, device: str
@@ -229,3 +250,19 @@ class TestBallQuery(TestCaseMixin, unittest.TestCase):
             torch.cuda.synchronize()
 
         return output
+
+    @staticmethod
+    def ball_query_cpu_num_threads(
+        N: int, P1: int, P2: int, D: int, K: int, radius: float, threads: int
+    ):
+        torch.set_num_threads(threads)
+        pts1 = torch.randn(N, P1, D, requires_grad=True)
+        pts2 = torch.randn(N, P2, D, requires_grad=True)
+        grad_dists = torch.randn(N, P1, K)
+
+        def output():
+            out = ball_query(pts1, pts2, K=K, radius=radius)
+            loss = (out.dists * grad_dists).sum()
+            loss.backward()
+
+        return output
@@ -227,6 +227,38 @@ class TestBlending(TestCaseMixin, unittest.TestCase):
         )
         self.assertTrue(torch.allclose(dists.grad, grad_dists, atol=1e-7))
 
+    def test_sigmoid_alpha_blend_cpu_num_threads(self):
+        """
+        The CPU implementation gives identical results for any number of threads.
+        """
+        torch.manual_seed(231)
+        N, S, K = 3, 19, 4
+        pix_to_face = torch.randint(-1, 32, size=(N, S, S, K))
+        colors = torch.randn((N, S, S, K, 3))
+        empty = torch.tensor([])
+        grad_out = torch.randn((N, S, S, 4))
+        blend_params = BlendParams(sigma=1e-2)
+        old_num_threads = torch.get_num_threads()
+        outputs = []
+        try:
+            for num_threads in [1, 4]:
+                torch.set_num_threads(num_threads)
+                dists = torch.linspace(-0.1, 0.1, N * S * S * K).view(N, S, S, K)
+                dists.requires_grad_(True)
+                fragments = Fragments(
+                    pix_to_face=pix_to_face,
+                    bary_coords=empty,  # dummy
+                    zbuf=empty,  # dummy
+                    dists=dists,
+                )
+                images = sigmoid_alpha_blend(colors, fragments, blend_params)
+                images.backward(grad_out)
+                outputs.append((images.detach(), dists.grad))
+        finally:
+            torch.set_num_threads(old_num_threads)
+        self.assertTrue(torch.equal(outputs[0][0], outputs[1][0]))
+        self.assertTrue(torch.equal(outputs[0][1], outputs[1][1]))
+
     def test_sigmoid_alpha_blend_python(self):
         """
         Test outputs of python tensorised function and python loop
@@ -374,6 +406,36 @@ class TestBlending(TestCaseMixin, unittest.TestCase):
 
         return fn
 
+    @staticmethod
+    def bm_sigmoid_alpha_blending_cpu_num_threads(
+        num_meshes: int, image_size: int, faces_per_pixel: int, threads: int
+    ):
+        torch.set_num_threads(threads)
+        torch.manual_seed(231)
+
+        # Create dummy outputs of rasterization
+        N, S, K = num_meshes, image_size, faces_per_pixel
+        F = 32  # num faces in the mesh
+        pix_to_face = torch.randint(low=-1, high=F + 1, size=(N, S, S, K))
+        colors = torch.randn((N, S, S, K, 3))
+        empty = torch.tensor([])
+
+        dists1 = torch.randn(size=(N, S, S, K), requires_grad=True)
+        fragments = Fragments(
+            pix_to_face=pix_to_face,
+            bary_coords=empty,  # dummy
+            zbuf=empty,  # dummy
+            dists=dists1,
+        )
+        blend_params = BlendParams(sigma=1e-3)
+
+        def fn():
+            # test forward and backward pass
+            images = sigmoid_alpha_blend(colors, fragments, blend_params)
+            images.sum().backward()
+
+        return fn
+
     @staticmethod
     def bm_softmax_blending(
         num_meshes: int = 16,
@@ -463,6 +525,51 @@ class TestBlending(TestCaseMixin, unittest.TestCase):
 
         return fn
 
+    def test_sparse_fragments(self):
+        """
+        Blending SparseFragments gives the same images and gradients as
+        blending the padded Fragments.
+        """
+        N, S, K = 2, 6, 4
+        # Each pixel is overlapped by between 0 and K faces.
+        num_faces = torch.randint(low=0, high=K + 1, size=(N, S, S, 1))
+        mask = torch.arange(K) < num_faces
+        pix_to_face = torch.where(mask, torch.randint(100, size=(N, S, S, K)), -1)
+        zbuf = torch.where(mask, torch.rand(N, S, S, K) * 10 + 1, -1.0)
+        dists = torch.where(mask, torch.randn(N, S, S, K) * 1e-3, -1.0)
+        # sigmoid_alpha_blend gives white at the pixels which no face covers.
+        colors = torch.where(mask[..., None], torch.rand((N, S, S, K, 3)), 1.0)
+        blend_params = BlendParams(sigma=1e-3, gamma=1e-2)
+
+        for blend, kwargs in [
+            (sigmoid_alpha_blend, {}),
+            (softmax_rgb_blend, {}),
+            (softmax_rgb_blend, {"znear": torch.ones(N), "zfar": torch.rand(N) + 10}),
+        ]:
+            images = []
+            grads = []
+            for sparse in [False, True]:
+                zbuf_ = zbuf.clone().requires_grad_(True)
+                dists_ = dists.clone().requires_grad_(True)
+                fragments = Fragments(
+                    pix_to_face=pix_to_face,
+                    zbuf=zbuf_,
+                    bary_coords=torch.rand(N, S, S, K, 3),
+                    dists=dists_,
+                )
+                colors_ = colors
+                if sparse:
+                    fragments = fragments.to_sparse()
+                    colors_ = colors[mask]
+                out = blend(colors_, fragments, blend_params, **kwargs)
+                out.sum().backward()
+                images.append(out)
+                grads.append((zbuf_.grad, dists_.grad))
+            self.assertClose(images[0], images[1], atol=1e-6)
+            self.assertClose(grads[0][1], grads[1][1], atol=1e-4)
+            if blend is softmax_rgb_blend:
+                self.assertClose(grads[0][0], grads[1][0], atol=1e-4)
+
     def test_blend_params(self):
         """Test color parameter of BlendParams().
         Assert passed value overrides default value.
@@ -6,6 +6,7 @@
 
 import unittest
 from collections import namedtuple
+from itertools import product
 
 import numpy as np
 import torch
@@ -1175,6 +1176,62 @@ class TestChamfer(TestCaseMixin, unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Support for 1 or 2 norm."):
             chamfer_distance(p1, p2, norm=3)
 
+    def test_chamfer_grid_method(self):
+        """
+        The grid method gives the same results as the brute force method.
+        """
+        N, P1, P2 = 4, 200, 300
+        points_normals = TestChamfer.init_pointclouds(N, P1, P2, "cpu")
+        p1, p2 = points_normals.p1, points_normals.p2
+        kwargs = {
+            "x_lengths": points_normals.p1_lengths,
+            "y_lengths": points_normals.p2_lengths,
+            "x_normals": points_normals.n1,
+            "y_normals": points_normals.n2,
+            "weights": points_normals.weights,
+        }
+        for point_reduction, batch_reduction, norm in product(
+            ["mean", "sum", None], ["mean", None], [1, 2]
+        ):
+            if point_reduction is None and batch_reduction is not None:
+                continue
+            losses = [
+                chamfer_distance(
+                    p1,
+                    p2,
+                    point_reduction=point_reduction,
+                    batch_reduction=batch_reduction,
+                    norm=norm,
+                    method=method,
+                    **kwargs,
+                )
+                for method in ["bruteforce", "grid"]
+            ]
+            self.assertClose(losses[1], losses[0])
+            if point_reduction is not None:
+                grads = [
+                    torch.autograd.grad(loss.sum() + loss_normals.sum(), [p1, p2])
+                    for loss, loss_normals in losses
+                ]
+                self.assertClose(grads[1][0], grads[0][0], atol=1e-6)
+                self.assertClose(grads[1][1], grads[0][1], atol=1e-6)
+
+        for single_directional in [True, False]:
+            expected = chamfer_distance(
+                p1, p2, point_reduction="max", single_directional=single_directional
+            )
+            actual = chamfer_distance(
+                p1,
+                p2,
+                point_reduction="max",
+                single_directional=single_directional,
+                method="grid",
+            )
+            self.assertClose(actual[0], expected[0])
+
+        with self.assertRaisesRegex(ValueError, "method must be one of"):
+            chamfer_distance(p1, p2, method="kdtree")
+
     def test_empty_clouds(self):
         # Check that point_reduction doesn't divide by zero
         points1 = Pointclouds(points=[torch.zeros(0, 3), torch.zeros(10, 3)])
@@ -1219,6 +1276,17 @@ class TestChamfer(TestCaseMixin, unittest.TestCase):
 
         return loss
 
+    @staticmethod
+    def chamfer_cpu_method(P: int, method: str):
+        p1 = torch.rand((1, P, 3), requires_grad=True)
+        p2 = torch.rand((1, P, 3), requires_grad=True)
+
+        def loss():
+            loss, _ = chamfer_distance(p1, p2, method=method)
+            loss.backward()
+
+        return loss
+
     @staticmethod
     def chamfer_naive_with_init(
         batch_size: int, P1: int, P2: int, return_normals: bool, device="cpu"
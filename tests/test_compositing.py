@@ -131,6 +131,34 @@ class TestAccumulatePoints(TestCaseMixin, unittest.TestCase):
         self._simple_wsum(weighted_sum, device)
         self._simple_wsumnorm(norm_weighted_sum, device)
 
+    def test_cpu_num_threads(self):
+        """
+        The CPU implementations give the same results for any number of
+        threads, up to the summation order of the gradients of the features.
+        """
+        torch.manual_seed(231)
+        N, K, H, W, C, P = 3, 5, 17, 9, 4, 20
+        alphas = torch.rand(N, K, H, W)
+        features = torch.randn(C, P)
+        inds = torch.randint(P + 1, size=(N, K, H, W)) - 1
+        grad_res = torch.randn(N, C, H, W)
+        old_num_threads = torch.get_num_threads()
+        for accumulate_func in [alpha_composite, weighted_sum, norm_weighted_sum]:
+            outputs = []
+            try:
+                for num_threads in [1, 4]:
+                    torch.set_num_threads(num_threads)
+                    alphas_t = alphas.clone().requires_grad_(True)
+                    features_t = features.clone().requires_grad_(True)
+                    res = accumulate_func(inds, alphas_t, features_t)
+                    (res * grad_res).sum().backward()
+                    outputs.append((res.detach(), alphas_t.grad, features_t.grad))
+            finally:
+                torch.set_num_threads(old_num_threads)
+            self.assertTrue(torch.equal(outputs[0][0], outputs[1][0]))
+            self.assertTrue(torch.equal(outputs[0][1], outputs[1][1]))
+            self.assertClose(outputs[0][2], outputs[1][2], atol=1e-5)
+
     def test_python_vs_cpu_vs_cuda(self):
         self._python_vs_cpu_vs_cuda(
             self.accumulate_alphacomposite_python, alpha_composite
@@ -426,3 +454,31 @@ class TestAccumulatePoints(TestCaseMixin, unittest.TestCase):
         ).to(device)
 
         self.assertTrue((result == true_result).all().item())
+
+    @staticmethod
+    def bm_compositing_cpu_num_threads(
+        method: str,
+        num_clouds: int,
+        image_size: int,
+        points_per_pixel: int,
+        threads: int,
+    ):
+        torch.set_num_threads(threads)
+        torch.manual_seed(231)
+        N, S, K = num_clouds, image_size, points_per_pixel
+        C, P = 3, 10000
+        accumulate_func = {
+            "alpha_composite": alpha_composite,
+            "weighted_sum": weighted_sum,
+            "norm_weighted_sum": norm_weighted_sum,
+        }[method]
+        alphas = torch.rand(N, K, S, S, requires_grad=True)
+        features = torch.randn(C, P, requires_grad=True)
+        inds = torch.randint(P + 1, size=(N, K, S, S)) - 1
+
+        def fn():
+            # test forward and backward pass
+            res = accumulate_func(inds, alphas, features)
+            res.sum().backward()
+
+        return fn
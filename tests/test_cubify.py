@@ -303,6 +303,45 @@ class TestCubify(TestCaseMixin, unittest.TestCase):
         self.assertClose(verts.min(), torch.tensor(-1.0, device=device))
         self.assertClose(verts.max(), torch.tensor(0.0, device=device))
 
+    def test_sparse(self):
+        device = torch.device("cuda:0")
+        torch.manual_seed(1)
+        voxels = torch.rand((3, 5, 6, 7), dtype=torch.float32, device=device)
+        voxels[1] = 0.0
+        feats = torch.rand((3, 3, 5, 6, 7), dtype=torch.float32, device=device)
+        for align in ["topleft", "corner", "center"]:
+            meshes = cubify(voxels, 0.5, feats=feats, align=align)
+            # Sparse COO voxels give the same meshes.
+            meshes_sparse = cubify(voxels.to_sparse(), 0.5, feats=feats, align=align)
+            self.assertClose(
+                meshes.num_verts_per_mesh(), meshes_sparse.num_verts_per_mesh()
+            )
+            self.assertClose(meshes.verts_packed(), meshes_sparse.verts_packed())
+            self.assertClose(meshes.faces_packed(), meshes_sparse.faces_packed())
+            if align == "center":
+                self.assertClose(
+                    meshes.textures.atlas_packed(),
+                    meshes_sparse.textures.atlas_packed(),
+                )
+
+        # A few voxels of a grid which is too large to be dense.
+        V = 1024
+        indices = torch.tensor(
+            [[0, 0, 1, 1], [3, 3, V - 1, 0], [3, 3, V - 1, 0], [4, 5, V - 1, 0]],
+            device=device,
+        )
+        values = torch.tensor([1.0, 1.0, 1.0, 0.2], device=device)
+        voxels = torch.sparse_coo_tensor(indices, values, (2, V, V, V))
+        meshes = cubify(voxels, 0.5, align="corner")
+        # Two neighbouring cubes share 4 vertices and lose 2 faces each.
+        self.assertEqual(meshes.num_verts_per_mesh().tolist(), [12, 8])
+        self.assertEqual(meshes.num_faces_per_mesh().tolist(), [20, 12])
+        verts = meshes.verts_list()[1]
+        self.assertClose(verts.max(0).values, torch.ones(3, device=device))
+
+        voxels = torch.sparse_coo_tensor(indices[:, :0], values[:0], (2, V, V, V))
+        self.assertTrue(cubify(voxels, 0.5).isempty())
+
     @staticmethod
     def cubify_with_init(batch_size: int, V: int):
         device = torch.device("cuda:0")
@@ -315,6 +354,25 @@ class TestCubify(TestCaseMixin, unittest.TestCase):
 
         return convert
 
+    @staticmethod
+    def cubify_sparse_with_init(batch_size: int, V: int, num_voxels: int):
+        device = torch.device("cuda:0")
+        indices = torch.stack(
+            [
+                torch.randint(batch_size, (num_voxels,), device=device),
+                *torch.randint(V, (3, num_voxels), device=device),
+            ]
+        )
+        values = torch.ones(num_voxels, device=device)
+        voxels = torch.sparse_coo_tensor(indices, values, (batch_size, V, V, V))
+        torch.cuda.synchronize()
+
+        def convert():
+            cubify(voxels, 0.5)
+            torch.cuda.synchronize()
+
+        return convert
+
     def test_cubify_with_feats(self):
         N, V = 3, 2
         device = torch.device("cuda:0")
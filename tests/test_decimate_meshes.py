@@ -0,0 +1,151 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+
+import unittest
+
+import torch
+from pytorch3d.ops import decimate_meshes, select_mesh_lod
+from pytorch3d.renderer import (
+    FoVPerspectiveCameras,
+    look_at_view_transform,
+    TexturesAtlas,
+    TexturesVertex,
+)
+from pytorch3d.structures.meshes import Meshes
+from pytorch3d.utils.ico_sphere import ico_sphere
+
+from .common_testing import TestCaseMixin
+
+
+class TestDecimateMeshes(TestCaseMixin, unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        torch.manual_seed(1)
+
+    @staticmethod
+    def grid_mesh(n: int) -> Meshes:
+        """
+        A flat square in the z=0 plane made of n x n squares.
+        """
+        x, y = torch.meshgrid(
+            torch.linspace(0, 1, n + 1), torch.linspace(0, 1, n + 1), indexing="ij"
+        )
+        verts = torch.stack([x, y, torch.zeros_like(x)], dim=2).view(-1, 3)
+        idx = torch.arange((n + 1) * (n + 1)).view(n + 1, n + 1)
+        v0, v1 = idx[:-1, :-1].flatten(), idx[1:, :-1].flatten()
+        v2, v3 = idx[1:, 1:].flatten(), idx[:-1, 1:].flatten()
+        faces = torch.cat([torch.stack([v0, v1, v2], 1), torch.stack([v0, v2, v3], 1)])
+        return Meshes(verts=[verts], faces=[faces])
+
+    def test_sphere(self):
+        sphere = ico_sphere(3)
+        meshes = sphere.extend(2)
+        meshes = meshes.update_padded(
+            meshes.verts_padded() * torch.tensor([1.0, 2.0])[:, None, None]
+        )
+        F = sphere.num_faces_per_mesh()[0].item()
+        for ratio in [0.5, 0.1]:
+            decimated = decimate_meshes(meshes, ratio)
+            self.assertEqual(len(decimated), 2)
+            for i, radius in enumerate([1.0, 2.0]):
+                verts, faces = decimated.get_mesh_verts_faces(i)
+                num_faces = len(faces)
+                self.assertLessEqual(num_faces, int(F * ratio) + 1)
+                self.assertGreater(num_faces, F * ratio / 2)
+                # The vertices stay close to the sphere.
+                self.assertClose(
+                    verts.norm(dim=1), torch.full((len(verts),), radius), atol=0.1
+                )
+                # The mesh is still closed and manifold: each edge has two
+                # faces and the Euler characteristic is that of a sphere.
+                edges = faces[:, [0, 1, 1, 2, 2, 0]].view(-1, 2)
+                _, counts = torch.unique(
+                    edges.sort(dim=1).values, dim=0, return_counts=True
+                )
+                self.assertTrue((counts == 2).all())
+                self.assertEqual(len(verts) - len(counts) + num_faces, 2)
+                # No face is flipped.
+                face_verts = verts[faces]
+                normals = torch.cross(
+                    face_verts[:, 1] - face_verts[:, 0],
+                    face_verts[:, 2] - face_verts[:, 0],
+                    dim=1,
+                )
+                self.assertTrue(((normals * face_verts.mean(1)).sum(1) > 0).all())
+
+        decimated = decimate_meshes(meshes, 1.0)
+        self.assertClose(decimated.verts_packed(), meshes.verts_packed())
+        self.assertClose(decimated.faces_packed(), meshes.faces_packed())
+
+        with self.assertRaisesRegex(ValueError, "ratio"):
+            decimate_meshes(meshes, 0.0)
+
+    def test_boundary(self):
+        grid = self.grid_mesh(10)
+        decimated = decimate_meshes(grid, 0.2)
+        verts = decimated.verts_packed()
+        self.assertLessEqual(len(decimated.faces_packed()), 41)
+        self.assertClose(verts[:, 2], torch.zeros(len(verts)), atol=1e-6)
+        # The corners and the sides of the square are kept.
+        self.assertClose(decimated.get_bounding_boxes(), grid.get_bounding_boxes())
+        area = decimated.faces_areas_packed().sum()
+        self.assertClose(area, torch.tensor(1.0), atol=1e-5)
+
+    def test_textures(self):
+        sphere = ico_sphere(2)
+        V = sphere.num_verts_per_mesh()[0].item()
+        F = sphere.num_faces_per_mesh()[0].item()
+        features = torch.rand(1, V, 3)
+        atlas = torch.rand(1, F, 2, 2, 3)
+        for textures in [TexturesVertex(features), TexturesAtlas(atlas)]:
+            meshes = Meshes(
+                verts=sphere.verts_padded(),
+                faces=sphere.faces_padded(),
+                textures=textures,
+            )
+            decimated = decimate_meshes(meshes, 0.25)
+            verts = decimated.verts_packed()
+            faces = decimated.faces_packed()
+            if isinstance(textures, TexturesVertex):
+                new_features = decimated.textures.verts_features_packed()
+                self.assertEqual(new_features.shape, verts.shape)
+                # Each remaining vertex keeps the features it had.
+                self.assertTrue(
+                    torch.isin(new_features[:, 0], features[0, :, 0]).all()
+                )
+            else:
+                new_atlas = decimated.textures.atlas_packed()
+                self.assertEqual(new_atlas.shape, (len(faces), 2, 2, 3))
+                self.assertTrue(
+                    torch.isin(new_atlas[:, 0, 0, 0], atlas[0, :, 0, 0, 0]).all()
+                )
+
+    def test_select_mesh_lod(self):
+        meshes = ico_sphere(3).extend(3)
+        lods = [meshes] + [decimate_meshes(meshes, r) for r in [0.25, 0.0625]]
+        num_faces = torch.stack([lod.num_faces_per_mesh() for lod in lods])
+        # Close, far and behind the camera.
+        R, T = look_at_view_transform(dist=torch.tensor([2.5, 100.0, 1.0]))
+        T[2, 2] = -5.0
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+        selected, levels = select_mesh_lod(lods, cameras, image_size=256)
+        self.assertEqual(levels.tolist(), [0, 2, 0])
+        self.assertClose(
+            selected.num_faces_per_mesh(), num_faces[levels, torch.arange(3)]
+        )
+        # With a smaller image, the close mesh can be coarser.
+        _, levels = select_mesh_lod(lods, cameras, image_size=(32, 48))
+        self.assertEqual(levels.tolist(), [1, 2, 0])
+
+    @staticmethod
+    def decimate_meshes_with_init(num_meshes: int, ico_level: int, ratio: float):
+        meshes = ico_sphere(ico_level).extend(num_meshes)
+
+        def decimate():
+            decimate_meshes(meshes, ratio)
+
+        return decimate
@@ -12,6 +12,7 @@ from io import StringIO
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 
+import numpy as np
 import torch
 from iopath.common.file_io import PathManager
 from pytorch3d.io import IO, load_obj, load_objs_as_meshes, save_obj
@@ -20,6 +21,7 @@ from pytorch3d.io.mtl_io import (
     _bilinear_interpolation_vectorized,
     _parse_mtl,
 )
+from pytorch3d.io.obj_io import _parse_obj
 from pytorch3d.renderer import TexturesAtlas, TexturesUV, TexturesVertex
 from pytorch3d.structures import join_meshes_as_batch, Meshes
 from pytorch3d.utils import torus
@@ -319,6 +321,57 @@ class TestMeshObjIO(TestCaseMixin, unittest.TestCase):
             self.assertTrue(materials is None)
             self.assertTrue(tex_maps is None)
 
+    def _check_parse_obj_vectorized(self, obj_file: str):
+        # The vectorized parser must return the same as the reference parser.
+        expected = _parse_obj(StringIO(obj_file), "data", vectorized=False)
+        actual = _parse_obj(StringIO(obj_file), "data")
+        self.assertEqual(expected[7:], actual[7:])
+        for e, a in zip(expected[:7], actual[:7]):
+            if len(e) == 0:
+                self.assertEqual(a, [])
+            else:
+                self.assertClose(torch.tensor(e), torch.tensor(a))
+
+    def test_parse_obj_vectorized(self):
+        obj_file = "\n".join(
+            [
+                "mtllib model.mtl",
+                "v 0.1 0.2 0.3",
+                "v  0.2 0.3 0.4 0.9 0.8 0.7",
+                "v 3.0e-1 -0.4 5",
+                "v 0.4 0.5 0.6",
+                "vt 0.1 0.2",
+                "vt 0.2 0.3 0.0",
+                "vn 0 0 1",
+                "vn 1 0 0",
+                "# comment",
+                "f 1 2 3",
+                "usemtl material_1",
+                "f 1/1 2/2 3/1 4/2",
+                "",
+                "usemtl material_2",
+                "f -4//1 -3//2 -2//1",
+                "f 1/2/1 2/1/2 3/1/1 4/2/2 1/1/1",
+                "usemtl material_1",
+                "g group\r",
+                "f 4/1/2 3/2/1 2/1/2\r",
+            ]
+        )
+        self._check_parse_obj_vectorized(obj_file)
+        self._check_parse_obj_vectorized(obj_file.replace("\n", "\r\n"))
+        self._check_parse_obj_vectorized("")
+        self._check_parse_obj_vectorized("v 0.1 0.2 0.3\nv 0.1 0.2 0.3\n")
+
+        # Files which the vectorized parser hands to the reference parser.
+        self._check_parse_obj_vectorized("  v 1 2 3\nv 1 2 3\nv 3 4 5\nf 1 2 3 ")
+        self._check_parse_obj_vectorized("v 1 2 3\nv 1 2 3\nv 3 4 5\nf 1/ 2/ 3/")
+
+        with open(TUTORIAL_DATA_DIR / "cow_mesh/cow.obj") as f:
+            self._check_parse_obj_vectorized(f.read())
+
+        with self.assertRaisesRegex(ValueError, "does not have 3 values"):
+            _parse_obj(StringIO("v 0.1 0.2 0.3\nf 1 1 1\nv 0.1 0.2\n"), "data")
+
     def test_load_obj_error_textures(self):
         obj_file = "\n".join(["vt 0.1"])
         with NamedTemporaryFile(mode="w", suffix=".obj") as f:
@@ -894,6 +947,38 @@ class TestMeshObjIO(TestCaseMixin, unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "same type of texture"):
             join_meshes_as_batch([mesh_atlas, mesh_rgb, mesh_atlas])
 
+    def test_load_objs_as_meshes_num_workers(self):
+        obj_filename = TUTORIAL_DATA_DIR / "cow_mesh/cow.obj"
+        teapot_obj = TUTORIAL_DATA_DIR / "teapot.obj"
+        files = [obj_filename, teapot_obj, obj_filename]
+        expected = load_objs_as_meshes(files, load_textures=False)
+        for use_processes in [False, True]:
+            meshes = load_objs_as_meshes(
+                files,
+                load_textures=False,
+                num_workers=2,
+                use_processes=use_processes,
+            )
+            self.assertEqual(len(meshes), 3)
+            for i in range(3):
+                self.assertClose(meshes.verts_list()[i], expected.verts_list()[i])
+                self.assertClose(meshes.faces_list()[i], expected.faces_list()[i])
+
+        mesh = load_objs_as_meshes([obj_filename])
+        mesh2 = load_objs_as_meshes([obj_filename, obj_filename], num_workers=2)
+        maps = mesh.textures.maps_padded()
+        self.assertClose(mesh2.textures.maps_padded(), torch.cat([maps, maps]))
+
+        # The error from the first bad file is raised.
+        with TemporaryDirectory() as temp_dir:
+            bad_files = [
+                obj_filename,
+                os.path.join(temp_dir, "missing1.obj"),
+                os.path.join(temp_dir, "missing2.obj"),
+            ]
+            with self.assertRaisesRegex(FileNotFoundError, "missing1.obj"):
+                load_objs_as_meshes(bad_files, num_workers=3)
+
     def test_save_obj_with_normal(self):
         verts = torch.tensor(
             [[0.01, 0.2, 0.301], [0.2, 0.03, 0.408], [0.3, 0.4, 0.05], [0.6, 0.7, 0.8]],
@@ -1291,6 +1376,16 @@ class TestMeshObjIO(TestCaseMixin, unittest.TestCase):
         [verts], [faces] = meshes.verts_list(), meshes.faces_list()
         return TestMeshObjIO._bm_load_obj(verts, faces, decimal_places=5)
 
+    @staticmethod
+    def bm_parse_obj(V: int, F: int, vectorized: bool):
+        rng = np.random.default_rng(0)
+        verts = torch.from_numpy(rng.random((V, 3), dtype=np.float32))
+        faces = torch.from_numpy(rng.integers(0, V, (F, 3)))
+        f = StringIO()
+        save_obj(f, verts, faces, normals=verts, faces_normals_idx=faces)
+        s = f.getvalue()
+        return lambda: _parse_obj(StringIO(s), "", vectorized=vectorized)
+
     @staticmethod
     def bm_load_texture_atlas(R: int):
         device = torch.device("cuda:0")
@@ -0,0 +1,206 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import unittest
+from io import BytesIO
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+
+import torch
+from iopath.common.file_io import PathManager
+from pytorch3d.io import (
+    IO,
+    load_mesh_cached,
+    load_pointcloud_cached,
+    load_tensors_packed,
+    save_tensors_packed,
+)
+from pytorch3d.io.packed_io import _load_mesh_packed, _save_mesh_packed
+from pytorch3d.renderer import TexturesAtlas, TexturesUV, TexturesVertex
+from pytorch3d.structures import Meshes, Pointclouds
+from pytorch3d.utils import ico_sphere
+
+from .common_testing import get_pytorch3d_dir, TestCaseMixin
+
+
+TUTORIAL_DATA_DIR = get_pytorch3d_dir() / "docs/tutorials/data"
+
+
+class TestPackedIO(TestCaseMixin, unittest.TestCase):
+    def test_save_load_mesh(self):
+        sphere = ico_sphere(1)
+        verts = sphere.verts_packed()
+        faces = sphere.faces_packed()
+        V, F = verts.shape[0], faces.shape[0]
+        textures = [
+            None,
+            TexturesVertex([torch.rand(V, 3)]),
+            TexturesAtlas([torch.rand(F, 2, 2, 3)]),
+            TexturesUV(
+                maps=[torch.rand(8, 16, 3)],
+                faces_uvs=[torch.randint(10, size=(F, 3))],
+                verts_uvs=[torch.rand(10, 2)],
+                align_corners=False,
+            ),
+        ]
+        io = IO()
+        for texture in textures:
+            mesh = Meshes(
+                verts=[verts],
+                faces=[faces],
+                textures=texture,
+                verts_normals=[torch.rand(V, 3)],
+            )
+            with NamedTemporaryFile(mode="rb", suffix=".p3d") as f:
+                io.save_mesh(mesh, f.name)
+                for mmap in [True, False]:
+                    mesh2 = io.load_mesh(f.name, mmap=mmap)
+                    self.assertClose(mesh2.verts_packed(), verts)
+                    self.assertClose(mesh2.faces_packed(), faces)
+                    self.assertClose(
+                        mesh2.verts_normals_packed(), mesh.verts_normals_packed()
+                    )
+                    self.assertEqual(type(mesh2.textures), type(texture))
+                mesh_notex = io.load_mesh(f.name, include_textures=False)
+                self.assertIsNone(mesh_notex.textures)
+
+            if isinstance(texture, TexturesVertex):
+                self.assertClose(
+                    mesh2.textures.verts_features_packed(),
+                    texture.verts_features_packed(),
+                )
+            elif isinstance(texture, TexturesAtlas):
+                self.assertClose(mesh2.textures.atlas_packed(), texture.atlas_packed())
+            elif isinstance(texture, TexturesUV):
+                self.assertClose(mesh2.textures.maps_padded(), texture.maps_padded())
+                self.assertClose(
+                    mesh2.textures.faces_uvs_padded(), texture.faces_uvs_padded()
+                )
+                self.assertClose(
+                    mesh2.textures.verts_uvs_padded(), texture.verts_uvs_padded()
+                )
+                self.assertFalse(mesh2.textures.align_corners)
+
+    def test_save_load_pointcloud(self):
+        points = torch.rand(100, 3)
+        io = IO()
+        for normals, features in [
+            (None, None),
+            (torch.rand(100, 3), None),
+            (torch.rand(100, 3), torch.rand(100, 5)),
+        ]:
+            pointcloud = Pointclouds(
+                points=[points],
+                normals=None if normals is None else [normals],
+                features=None if features is None else [features],
+            )
+            with NamedTemporaryFile(mode="rb", suffix=".p3d") as f:
+                io.save_pointcloud(pointcloud, f.name)
+                pointcloud2 = io.load_pointcloud(f.name)
+            self.assertClose(pointcloud2.points_packed(), points)
+            if normals is None:
+                self.assertIsNone(pointcloud2.normals_packed())
+            else:
+                self.assertClose(pointcloud2.normals_packed(), normals)
+            if features is None:
+                self.assertIsNone(pointcloud2.features_packed())
+            else:
+                self.assertClose(pointcloud2.features_packed(), features)
+
+            with NamedTemporaryFile(mode="rb", suffix=".p3d") as f:
+                io.save_pointcloud(pointcloud, f.name)
+                with self.assertRaisesRegex(ValueError, "Expected a mesh"):
+                    io.load_mesh(f.name)
+
+    def test_stream(self):
+        mesh = ico_sphere(1)
+        stream = BytesIO()
+        _save_mesh_packed(stream, mesh)
+        stream.seek(0)
+        mesh2 = _load_mesh_packed(
+            stream,
+            path_manager=PathManager(),
+            include_textures=True,
+            device="cpu",
+            mmap=True,
+        )
+        self.assertClose(mesh2.verts_packed(), mesh.verts_packed())
+        self.assertClose(mesh2.faces_packed(), mesh.faces_packed())
+
+        # Streams in other formats are left alone.
+        stream = BytesIO(b"ply\n")
+        self.assertIsNone(
+            _load_mesh_packed(
+                stream,
+                path_manager=PathManager(),
+                include_textures=True,
+                device="cpu",
+                mmap=True,
+            )
+        )
+        self.assertEqual(stream.tell(), 0)
+
+    def test_save_load_tensors(self):
+        tensors = {
+            "verts": torch.rand(10, 3),
+            "faces": torch.randint(10, size=(7, 3)),
+            "empty": torch.zeros(0, dtype=torch.uint8),
+        }
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "tensors.p3d")
+            save_tensors_packed(path, tensors)
+            for mmap in [True, False]:
+                loaded = load_tensors_packed(path, mmap=mmap)
+                self.assertEqual(sorted(loaded), sorted(tensors))
+                for name, tensor in tensors.items():
+                    self.assertEqual(loaded[name].dtype, tensor.dtype)
+                    self.assertClose(loaded[name], tensor)
+            with self.assertRaises(FileNotFoundError):
+                load_tensors_packed(os.path.join(tmp_dir, "missing.p3d"))
+
+    def test_load_cached(self):
+        obj_filename = TUTORIAL_DATA_DIR / "cow_mesh/cow.obj"
+        expected = IO().load_mesh(obj_filename)
+        with TemporaryDirectory() as cache_dir:
+            mesh = load_mesh_cached(obj_filename, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            mesh2 = load_mesh_cached(obj_filename, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            for m in [mesh, mesh2]:
+                self.assertClose(m.verts_packed(), expected.verts_packed())
+                self.assertClose(m.faces_packed(), expected.faces_packed())
+                self.assertClose(
+                    m.textures.maps_padded(), expected.textures.maps_padded()
+                )
+            load_mesh_cached(obj_filename, cache_dir, include_textures=False)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            # The keyword arguments of the loader are part of the key.
+            mesh3 = load_mesh_cached(obj_filename, cache_dir, create_texture_atlas=True)
+            mesh4 = load_mesh_cached(obj_filename, cache_dir, create_texture_atlas=True)
+            self.assertEqual(len(os.listdir(cache_dir)), 3)
+            for m in [mesh3, mesh4]:
+                self.assertIsInstance(m.textures, TexturesAtlas)
+
+        pointcloud = Pointclouds(points=[torch.rand(10, 3)])
+        with TemporaryDirectory() as temp_dir:
+            ply_filename = os.path.join(temp_dir, "cloud.ply")
+            cache_dir = os.path.join(temp_dir, "cache")
+            IO().save_pointcloud(pointcloud, ply_filename)
+            pointcloud2 = load_pointcloud_cached(ply_filename, cache_dir)
+            pointcloud3 = load_pointcloud_cached(ply_filename, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertClose(pointcloud2.points_packed(), pointcloud.points_packed())
+            self.assertClose(pointcloud3.points_packed(), pointcloud.points_packed())
+
+            # A modified source file is loaded again.
+            pointcloud = Pointclouds(points=[torch.rand(12, 3)])
+            IO().save_pointcloud(pointcloud, ply_filename)
+            stat = os.stat(ply_filename)
+            os.utime(ply_filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            pointcloud4 = load_pointcloud_cached(ply_filename, cache_dir)
+            self.assertClose(pointcloud4.points_packed(), pointcloud.points_packed())
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
@@ -642,6 +642,119 @@ class TestMeshPlyIO(TestCaseMixin, unittest.TestCase):
                 data2 = f.read()
                 self.assertEqual(data2, actual_data)
 
+    def test_load_mmap(self):
+        verts = torch.rand(100, 3)
+        normals = torch.rand(100, 3)
+        colors = torch.rand(100, 3)
+        faces = torch.randint(100, size=(20, 3))
+        mesh = Meshes(verts=[verts], faces=[faces], verts_normals=[normals])
+        pointcloud = Pointclouds(points=[verts], normals=[normals], features=[colors])
+        io = IO()
+        for colors_as_uint8 in [True, False]:
+            with NamedTemporaryFile(mode="rb", suffix=".ply") as f:
+                io.save_mesh(mesh, f.name)
+                verts_read, faces_read = load_ply(f.name)
+                verts_mapped, faces_mapped = load_ply(f.name, mmap=True)
+                self.assertClose(verts_read, verts_mapped)
+                self.assertClose(faces_read, faces_mapped)
+                # The verts are a view of the (x, y, z, nx, ny, nz) records.
+                self.assertEqual(verts_mapped.stride(), (6, 1))
+
+                io.save_pointcloud(
+                    pointcloud, f.name, colors_as_uint8=colors_as_uint8
+                )
+                pointcloud_read = io.load_pointcloud(f.name)
+                pointcloud_mapped = io.load_pointcloud(f.name, mmap=True)
+                self.assertClose(
+                    pointcloud_read.points_packed(), pointcloud_mapped.points_packed()
+                )
+                self.assertClose(
+                    pointcloud_read.normals_packed(),
+                    pointcloud_mapped.normals_packed(),
+                )
+                self.assertClose(
+                    pointcloud_read.features_packed(),
+                    pointcloud_mapped.features_packed(),
+                )
+
+        # Files which are not on disk are read as usual.
+        with NamedTemporaryFile(mode="rb", suffix=".ply") as f:
+            io.save_mesh(mesh, f.name)
+            data = f.read()
+        verts_mapped, faces_mapped = load_ply(BytesIO(data), mmap=True)
+        self.assertClose(verts_mapped, verts)
+        self.assertClose(faces_mapped, faces)
+
+        with NamedTemporaryFile(mode="wb", suffix=".ply") as f:
+            f.write(data[:300])
+            f.flush()
+            with self.assertRaisesRegex(ValueError, "Not enough data for vertex."):
+                load_ply(f.name, mmap=True)
+
+    def test_iter_pointcloud_chunks(self):
+        points = torch.rand(100, 3)
+        normals = torch.rand(100, 3)
+        colors = torch.rand(100, 3)
+        faces = torch.randint(100, size=(20, 3))
+        pointcloud = Pointclouds(points=[points], normals=[normals], features=[colors])
+        io = IO()
+        for binary, colors_as_uint8 in itertools.product([True, False], [True, False]):
+            with NamedTemporaryFile(mode="rb", suffix=".ply") as f:
+                io.save_pointcloud(
+                    pointcloud, f.name, binary=binary, colors_as_uint8=colors_as_uint8
+                )
+                expected = io.load_pointcloud(f.name)
+                chunks = list(io.iter_pointcloud_chunks(f.name, chunk_points=30))
+            self.assertEqual([len(c.points_packed()) for c in chunks], [30, 30, 30, 10])
+            for chunk in chunks:
+                self.assertEqual(len(chunk), 1)
+            self.assertClose(
+                torch.cat([c.points_packed() for c in chunks]),
+                expected.points_packed(),
+            )
+            self.assertClose(
+                torch.cat([c.normals_packed() for c in chunks]),
+                expected.normals_packed(),
+            )
+            self.assertClose(
+                torch.cat([c.features_packed() for c in chunks]),
+                expected.features_packed(),
+            )
+
+        # Faces after the vertices are not read.
+        mesh = Meshes(verts=[points], faces=[faces])
+        with NamedTemporaryFile(mode="rb", suffix=".ply") as f:
+            io.save_mesh(mesh, f.name)
+            chunks = list(io.iter_pointcloud_chunks(f.name, chunk_points=64))
+        self.assertClose(torch.cat([c.points_packed() for c in chunks]), points)
+
+        # Elements before the vertices are skipped.
+        lines = [
+            "ply",
+            "format ascii 1.0",
+            "element info 2",
+            "property list uchar int stuff",
+            "element vertex 3",
+            "property float x",
+            "property float y",
+            "property float z",
+            "end_header",
+            "2 7 8",
+            "1 9",
+            "0 0 0",
+            "1 2 3",
+            "4 5 6",
+        ]
+        chunks = list(io.iter_pointcloud_chunks(StringIO("\n".join(lines)), 2))
+        self.assertEqual(len(chunks), 2)
+        expected_points = torch.tensor([[0, 0, 0], [1, 2, 3], [4, 5, 6]])
+        self.assertClose(
+            torch.cat([c.points_packed() for c in chunks]), expected_points.float()
+        )
+
+        with self.assertRaisesRegex(ValueError, "chunk_points must be positive."):
+            io.iter_pointcloud_chunks(StringIO("\n".join(lines)), 0)
+
     def test_load_pointcloud_bad_order(self):
         """
         Ply file with a strange property order
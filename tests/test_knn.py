@@ -228,6 +228,68 @@ class TestKNN(TestCaseMixin, unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Support for 1 or 2 norm."):
             knn_points(x, y, K=K, norm=0)
 
+    def test_cpu_num_threads(self):
+        """
+        The CPU implementation gives identical results for any number of threads.
+        """
+        N, P1, P2, K, D = 5, 300, 200, 7, 3
+        x = torch.rand((N, P1, D), requires_grad=True)
+        y = torch.rand((N, P2, D), requires_grad=True)
+        lengths1 = torch.randint(low=1, high=P1, size=(N,))
+        lengths2 = torch.randint(low=1, high=P2, size=(N,))
+        grad_dists = torch.rand((N, P1, K))
+        old_num_threads = torch.get_num_threads()
+        outputs = []
+        try:
+            for num_threads in [1, 4]:
+                torch.set_num_threads(num_threads)
+                out = knn_points(x, y, lengths1, lengths2, K=K)
+                grad_x, grad_y = torch.autograd.grad(
+                    (out.dists * grad_dists).sum(), [x, y]
+                )
+                outputs.append((out.dists, out.idx, grad_x, grad_y))
+        finally:
+            torch.set_num_threads(old_num_threads)
+        for actual, expected in zip(*outputs):
+            self.assertTrue(torch.equal(actual, expected))
+
+    def test_knn_grid_vs_bruteforce(self):
+        N, P1, P2 = 4, 200, 300
+        x = torch.rand((N, P1, 3), requires_grad=True)
+        y = torch.rand((N, P2, 3))
+        # A flat cloud, a cloud with all points in the same place and a cloud
+        # far from the query points.
+        y[1, :, 2] = 0.5
+        y[2] = 0.25
+        y[3] = y[3] * 0.1 + 2
+        y.requires_grad = True
+        lengths1 = torch.randint(low=1, high=P1, size=(N,))
+        lengths2 = torch.tensor([P2, 150, 10, 3])
+        for K, norm in product([1, 4, 8], [1, 2]):
+            expected = knn_points(x, y, lengths1, lengths2, K=K, norm=norm)
+            actual = knn_points(
+                x, y, lengths1, lengths2, K=K, norm=norm, method="grid"
+            )
+            self.assertClose(actual.dists, expected.dists)
+            # Neighbors at equal distances may be in any order.
+            for n in [0, 1, 3]:
+                self.assertClose(actual.idx[n], expected.idx[n])
+
+            grad_dists = torch.rand((N, P1, K))
+            grads = [
+                torch.autograd.grad((out.dists * grad_dists).sum(), [x, y])
+                for out in [actual, expected]
+            ]
+            self.assertClose(grads[0][0], grads[1][0], atol=1e-5)
+            self.assertClose(grads[0][1][[0, 1, 3]], grads[1][1][[0, 1, 3]], atol=1e-5)
+
+    def test_knn_grid_invalid(self):
+        x = torch.rand((2, 10, 2))
+        with self.assertRaisesRegex(ValueError, "only supports 3D"):
+            knn_points(x, x, method="grid")
+        with self.assertRaisesRegex(ValueError, "Unknown method"):
+            knn_points(x, x, method="kdtree")
+
     @staticmethod
     def knn_square(N: int, P1: int, P2: int, D: int, K: int, device: str):
         device = torch.device(device)
@@ -261,3 +323,27 @@ class TestKNN(TestCaseMixin, unittest.TestCase):
             torch.cuda.synchronize()
 
         return output
+
+    @staticmethod
+    def knn_cpu_num_threads(N: int, P1: int, P2: int, D: int, K: int, threads: int):
+        torch.set_num_threads(threads)
+        pts1 = torch.randn(N, P1, D, requires_grad=True)
+        pts2 = torch.randn(N, P2, D, requires_grad=True)
+        grad_dists = torch.randn(N, P1, K)
+
+        def output():
+            out = knn_points(pts1, pts2, K=K)
+            loss = (out.dists * grad_dists).sum()
+            loss.backward()
+
+        return output
+
+    @staticmethod
+    def knn_cpu_method(P1: int, P2: int, K: int, method: str):
+        pts1 = torch.rand(1, P1, 3)
+        pts2 = torch.rand(1, P2, 3)
+
+        def output():
+            knn_points(pts1, pts2, K=K, method=method)
+
+        return output
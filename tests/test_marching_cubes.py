@@ -9,7 +9,13 @@ import pickle
 import unittest
 
 import torch
-from pytorch3d.ops.marching_cubes import marching_cubes, marching_cubes_naive
+from pytorch3d.ops.marching_cubes import (
+    iter_marching_cubes_implicit,
+    marching_cubes,
+    marching_cubes_blocks,
+    marching_cubes_implicit,
+    marching_cubes_naive,
+)
 
 from .common_testing import get_tests_dir, TestCaseMixin
 
@@ -957,6 +963,161 @@ class TestMarchingCubes(TestCaseMixin, unittest.TestCase):
         self.assertEqual(len(verts3), len(verts))
         self.assertEqual(len(faces3), len(faces))
 
+    def test_cpu_num_threads(self):
+        torch.manual_seed(1)
+        volume = torch.rand(3, 12, 10, 9)
+        expected = marching_cubes_naive(volume, 0.5, return_local_coords=False)
+        old_num_threads = torch.get_num_threads()
+        try:
+            for num_threads in [1, 4]:
+                torch.set_num_threads(num_threads)
+                verts, faces = marching_cubes(volume, 0.5, return_local_coords=False)
+                for i in range(3):
+                    self.assertClose(verts[i], expected[0][i])
+                    self.assertClose(faces[i], expected[1][i])
+        finally:
+            torch.set_num_threads(old_num_threads)
+
+    def test_empty_batch(self):
+        volume = torch.zeros(0, 5, 6, 7)
+        for block_size in [None, 4]:
+            verts, faces = marching_cubes(volume, block_size=block_size)
+            self.assertEqual(verts, [])
+            self.assertEqual(faces, [])
+
+    def test_no_grad(self):
+        volume = torch.rand(2, 6, 6, 6, requires_grad=True)
+        for device in ["cpu", "cuda:0"]:
+            verts, _ = marching_cubes(volume.to(device), 0.5)
+            with self.assertRaisesRegex(ValueError, "backward is not supported"):
+                verts[0].sum().backward()
+
+    def _assert_same_mesh(self, verts, faces, verts2, faces2):
+        # The meshes are equal up to the order of the vertices and faces.
+        self.assertEqual(verts.shape, verts2.shape)
+        self.assertEqual(faces.shape, faces2.shape)
+        self.assertClose(torch.unique(verts, dim=0), torch.unique(verts2, dim=0))
+        face_verts = torch.unique(verts[faces].flatten(1), dim=0)
+        face_verts2 = torch.unique(verts2[faces2].flatten(1), dim=0)
+        self.assertClose(face_verts, face_verts2)
+
+    def test_blocks(self):
+        axis_tensor = torch.arange(0, 30)
+        X, Y, Z = torch.meshgrid(axis_tensor, axis_tensor, axis_tensor, indexing="ij")
+        u = (X - 12) ** 2 + (Y - 15) ** 2 + (Z - 17) ** 2 - 8**2
+        u = torch.stack([u[:, :25], u.permute(1, 2, 0)[:, :25]]).float()
+        for return_local_coords in [False, True]:
+            verts, faces = marching_cubes(u, 0, return_local_coords)
+            for block_size in [1, 4, 7, 64]:
+                verts2, faces2 = marching_cubes(
+                    u, 0, return_local_coords, block_size=block_size
+                )
+                for i in range(2):
+                    self._assert_same_mesh(verts[i], faces[i], verts2[i], faces2[i])
+
+        # The surface does not cross the volume.
+        verts, faces = marching_cubes(u, -1000, block_size=4)
+        self.assertEqual(verts, [[], []])
+        self.assertEqual(faces, [[], []])
+
+        with self.assertRaisesRegex(ValueError, "block_size"):
+            marching_cubes(u, 0, block_size=0)
+
+    def test_blocks_sparse(self):
+        # The blocks around a sphere of radius 8 in a volume of 1000^3 which
+        # is never allocated.
+        size, center, S = 1000, 12, 4
+        origins = torch.arange(0, 2 * center, S)
+        origins = torch.cartesian_prod(origins, origins, origins)
+        offsets = torch.arange(S + 1)
+        Z, Y, X = torch.meshgrid(offsets, offsets, offsets, indexing="ij")
+        points = torch.stack([Z, Y, X], dim=-1) + origins[:, None, None, None]
+        blocks = ((points - center) ** 2).sum(-1).float() - 8**2
+        verts, faces = marching_cubes_blocks(
+            blocks, origins, (size, size, size), 0, return_local_coords=False
+        )
+
+        axis_tensor = torch.arange(0, 2 * center + 1)
+        Z, Y, X = torch.meshgrid(axis_tensor, axis_tensor, axis_tensor, indexing="ij")
+        u = (X - center) ** 2 + (Y - center) ** 2 + (Z - center) ** 2 - 8**2
+        verts2, faces2 = marching_cubes(u[None].float(), 0, return_local_coords=False)
+        self._assert_same_mesh(verts, faces, verts2[0], faces2[0])
+
+        # Vertices on the boundaries between blocks are not duplicated.
+        edges = faces[:, [0, 1, 1, 2, 2, 0]].view(-1, 2)
+        _, counts = torch.unique(edges.sort(dim=1).values, dim=0, return_counts=True)
+        self.assertTrue((counts == 2).all())
+
+        # Parts of the blocks outside the volume are ignored.
+        verts, faces = marching_cubes_blocks(
+            blocks, origins, (size, size, center + 1), 0, return_local_coords=False
+        )
+        self.assertTrue(verts[:, 0].le(center).all())
+        self.assertGreater(len(faces), 0)
+        self.assertLess(len(faces), len(faces2[0]))
+
+    def test_implicit(self):
+        num_points = []
+
+        def sphere(points):
+            # The values at the grid points are computed exactly.
+            num_points.append(len(points))
+            center = points.new_tensor([12.0, 10.0, 9.0])
+            return ((points - center) ** 2).sum(-1) - 7.5**2
+
+        # With these bounds, the grid points are at integer coordinates.
+        bounds = torch.tensor([[0.0, 0.0, 0.0], [29.0, 23.0, 20.0]])
+        X, Y, Z = torch.meshgrid(
+            torch.arange(30.0), torch.arange(24.0), torch.arange(21.0), indexing="ij"
+        )
+        volume = sphere(torch.stack([X, Y, Z], dim=-1)).permute(2, 1, 0)
+        verts, faces = marching_cubes(volume[None], 0, return_local_coords=False)
+
+        for block_size, chunk_size in [(4, 1), (5, 1000), (8, 10**6)]:
+            num_points.clear()
+            verts2, faces2 = marching_cubes_implicit(
+                sphere, (21, 24, 30), 0, bounds, block_size, chunk_size
+            )
+            self._assert_same_mesh(verts[0], faces[0], verts2, faces2)
+            block_points = (block_size + 1) ** 3
+            self.assertLessEqual(max(num_points), max(chunk_size, block_points))
+
+        # The vertices on the boundaries between chunks are merged.
+        edges = faces2[:, [0, 1, 1, 2, 2, 0]].view(-1, 2)
+        _, counts = torch.unique(edges.sort(dim=1).values, dim=0, return_counts=True)
+        self.assertTrue((counts == 2).all())
+
+        # The coarse pass skips the blocks far from the surface. The values
+        # in a block differ from the value at its centre by at most
+        # h * (2 * r + h) for a distance r to the centre of the sphere and
+        # half a diagonal h.
+        num_points.clear()
+        h = 2 * 3**0.5
+        verts2, faces2 = marching_cubes_implicit(
+            sphere, (21, 24, 30), 0, bounds, 4, 1, coarse_margin=h * (15 + 3 * h)
+        )
+        self._assert_same_mesh(verts[0], faces[0], verts2, faces2)
+        num_blocks = 8 * 6 * 5
+        self.assertLess(sum(num_points), num_blocks * 5**3)
+
+        # Each chunk is yielded as a separate mesh.
+        chunks = list(
+            iter_marching_cubes_implicit(sphere, (21, 24, 30), 0, bounds, 4, 1)
+        )
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(len(faces) for _, faces, _ in chunks), len(faces[0]))
+
+        # The default bounds are the cube [-1, 1]^3.
+        verts3, faces3 = marching_cubes_implicit(
+            lambda points: points.norm(dim=-1) - 0.5, (20, 20, 20)
+        )
+        radius = torch.full((len(verts3),), 0.5)
+        self.assertClose(verts3.norm(dim=-1), radius, atol=0.02)
+
+        verts3, faces3 = marching_cubes_implicit(sphere, (21, 24, 30), -100.0, bounds)
+        self.assertEqual(verts3.shape, (0, 3))
+        self.assertEqual(faces3.shape, (0, 3))
+
     @staticmethod
     def marching_cubes_with_init(algo_type: str, batch_size: int, V: int, device: str):
         device = torch.device(device)
@@ -973,3 +1134,25 @@ class TestMarchingCubes(TestCaseMixin, unittest.TestCase):
             torch.cuda.synchronize()
 
         return convert
+
+    @staticmethod
+    def marching_cubes_sphere_with_init(V: int, block_size: int):
+        axis_tensor = torch.arange(0, V, dtype=torch.float32)
+        X, Y, Z = torch.meshgrid(axis_tensor, axis_tensor, axis_tensor, indexing="ij")
+        u = (X - V / 2) ** 2 + (Y - V / 2) ** 2 + (Z - V / 2) ** 2 - (V / 4) ** 2
+        block_size = block_size if block_size > 0 else None
+
+        def convert():
+            marching_cubes(u[None], 0, return_local_coords=False, block_size=block_size)
+
+        return convert
+
+    @staticmethod
+    def marching_cubes_cpu_num_threads(batch_size: int, V: int, threads: int):
+        volume_data = torch.rand((batch_size, V, V, V), dtype=torch.float32)
+
+        def convert():
+            torch.set_num_threads(threads)
+            marching_cubes(volume_data, return_local_coords=False)
+
+        return convert
@@ -0,0 +1,58 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import torch
+from pytorch3d.datasets import ModelCache
+
+from .common_testing import TestCaseMixin
+
+
+class TestModelCache(TestCaseMixin, unittest.TestCase):
+    def test_get_put(self):
+        verts = torch.rand(10, 3)
+        faces = torch.randint(10, size=(5, 3))
+        with TemporaryDirectory() as cache_dir:
+            cache = ModelCache(cache_dir)
+            self.assertIsNone(cache.get("a"))
+            cache.put("a", {"verts": verts, "faces": faces})
+            entry = cache.get("a")
+            self.assertClose(entry["verts"], verts)
+            self.assertClose(entry["faces"], faces)
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 2})
+
+            # Another object, e.g. in a DataLoader worker, sees the entries.
+            cache2 = ModelCache(cache_dir)
+            self.assertClose(cache2.get("a")["verts"], verts)
+            self.assertEqual(cache2.stats(), {"hits": 1, "misses": 0})
+
+    def test_eviction(self):
+        tensor = torch.rand(1000, 3)
+        with TemporaryDirectory() as cache_dir:
+            cache = ModelCache(cache_dir)
+            cache.put("size", {"tensor": tensor})
+            [entry_file] = os.listdir(cache_dir)
+            entry_size = os.path.getsize(os.path.join(cache_dir, entry_file))
+
+        with TemporaryDirectory() as cache_dir:
+            cache = ModelCache(cache_dir, max_size_bytes=2 * entry_size)
+            for i, key in enumerate(["a", "b", "c"]):
+                cache.put(key, {"tensor": tensor + i})
+                # Make the order of use unambiguous.
+                entry_file = cache._entry_file(key)
+                os.utime(entry_file, ns=(i * 10**9, i * 10**9))
+                if key == "b":
+                    # Using "a" makes "b" the least recently used.
+                    self.assertIsNotNone(cache.get("a"))
+                    os.utime(cache._entry_file("a"), ns=(2 * 10**9, 2 * 10**9))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            self.assertIsNone(cache.get("b"))
+            self.assertClose(cache.get("a")["tensor"], tensor)
+            self.assertClose(cache.get("c")["tensor"], tensor + 2)
@@ -0,0 +1,92 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+
+import torch
+from pytorch3d.loss import chamfer_distance
+from pytorch3d.ops import ball_query, iterative_closest_point, knn_points, PointIndex
+from pytorch3d.structures import Pointclouds
+
+from .common_testing import TestCaseMixin
+
+
+class TestPointIndex(TestCaseMixin, unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        torch.manual_seed(1)
+
+    def test_knn(self):
+        N, P1, P2, K = 3, 100, 200, 5
+        x = torch.rand((N, P1, 3))
+        y = torch.rand((N, P2, 3))
+        lengths1 = torch.randint(low=1, high=P1, size=(N,))
+        lengths2 = torch.randint(low=K, high=P2, size=(N,))
+        expected = knn_points(x, y, lengths1, lengths2, K=K, return_nn=True)
+        for method in ["grid", "bruteforce"]:
+            index = PointIndex(y, lengths2, method=method)
+            actual = index.knn(x, lengths1, K=K, return_nn=True)
+            self.assertClose(actual.dists, expected.dists)
+            self.assertClose(actual.idx, expected.idx)
+            self.assertClose(actual.knn, expected.knn)
+            dists, idx = index.nearest(x, lengths1)
+            self.assertClose(dists, expected.dists[..., 0])
+            self.assertClose(idx, expected.idx[..., 0])
+
+    def test_radius_query(self):
+        N, P1, P2, K, radius = 3, 100, 200, 8, 0.15
+        x = torch.rand((N, P1, 3))
+        y = torch.rand((N, P2, 3))
+        lengths1 = torch.randint(low=1, high=P1, size=(N,))
+        lengths2 = torch.randint(low=1, high=P2, size=(N,))
+        expected = ball_query(x, y, lengths1, lengths2, K=K, radius=radius)
+        bruteforce = PointIndex(y, lengths2, method="bruteforce")
+        actual = bruteforce.radius_query(x, lengths1, K=K, radius=radius)
+        self.assertClose(actual.idx, expected.idx)
+        self.assertClose(actual.dists, expected.dists)
+
+        # The grid method gives the nearest neighbors within the radius.
+        actual = PointIndex(y, lengths2).radius_query(x, lengths1, K=K, radius=radius)
+        nearest = knn_points(x, y, lengths1, lengths2, K=K)
+        valid = actual.idx >= 0
+        self.assertEqual(valid.sum(-1).tolist(), (expected.idx >= 0).sum(-1).tolist())
+        self.assertClose(actual.idx[valid], nearest.idx[valid])
+        self.assertClose(actual.dists, nearest.dists * valid)
+        self.assertClose(actual.knn[~valid], torch.zeros_like(actual.knn[~valid]))
+
+    def test_pointclouds(self):
+        points = [torch.rand((30, 3)), torch.rand((50, 3))]
+        normals = [torch.rand((30, 3)), torch.rand((50, 3))]
+        pointclouds = Pointclouds(points=points, normals=normals)
+        index = PointIndex(pointclouds)
+        self.assertEqual(index.method, "grid")
+        self.assertClose(index.lengths, torch.tensor([30, 50]))
+        self.assertClose(index.points, pointclouds.points_padded())
+        self.assertClose(index.normals, pointclouds.normals_padded())
+
+        x = Pointclouds(
+            points=[torch.rand((40, 3)), torch.rand((20, 3))],
+            normals=[torch.rand((40, 3)), torch.rand((20, 3))],
+        )
+        for single_directional in [False, True]:
+            expected = chamfer_distance(
+                x, pointclouds, single_directional=single_directional
+            )
+            actual = chamfer_distance(x, index, single_directional=single_directional)
+            self.assertClose(actual[0], expected[0])
+            self.assertClose(actual[1], expected[1])
+
+        with self.assertRaisesRegex(ValueError, "only supports 3D"):
+            PointIndex(torch.rand((2, 10, 2)), method="grid")
+        self.assertEqual(PointIndex(torch.rand((2, 10, 2))).method, "bruteforce")
+
+    def test_icp(self):
+        X = torch.rand((2, 50, 3))
+        Y = torch.rand((2, 70, 3))
+        expected = iterative_closest_point(X, Y, max_iterations=5)
+        actual = iterative_closest_point(X, PointIndex(Y), max_iterations=5)
+        self.assertClose(actual.Xt, expected.Xt)
+        self.assertClose(actual.rmse, expected.rmse)
@@ -11,6 +11,7 @@ import torch
 from pytorch3d import _C
 from pytorch3d.loss import point_mesh_edge_distance, point_mesh_face_distance
 from pytorch3d.structures import Meshes, packed_to_list, Pointclouds
+from pytorch3d.utils import ico_sphere
 
 from .common_testing import get_random_cuda_device, TestCaseMixin
 
@@ -887,6 +888,79 @@ class TestPointMeshDistance(TestCaseMixin, unittest.TestCase):
             )
             self.assertClose(pcls.points_list()[i].grad, pcls_op.points_list()[i].grad)
 
+    def test_cpu_nearest_hulls(self):
+        """
+        The CPU forward functions, which search a BVH of each mesh or point
+        cloud, give the same results as computing all the distances.
+        """
+        sphere = ico_sphere(3)
+        verts = sphere.verts_packed()
+        verts = [verts, verts * 2.0 + 0.5, torch.rand(100, 3)]
+        faces = [sphere.faces_packed()] * 2 + [torch.randint(100, size=(50, 3))]
+        meshes = Meshes(verts=verts, faces=faces)
+        points = [torch.randn(n, 3) for n in [500, 300, 200]]
+        # Points on the surface of the first mesh.
+        points[0][:100] = sphere.verts_packed()[:100] * 0.999
+        pcls = Pointclouds(points=points)
+        min_area = TestPointMeshDistance.min_triangle_area()
+
+        points_packed = pcls.points_packed()
+        points_first_idx = pcls.cloud_to_packed_first_idx()
+        tris = meshes.verts_packed()[meshes.faces_packed()]
+        tris_first_idx = meshes.mesh_to_faces_packed_first_idx()
+        segms = meshes.verts_packed()[meshes.edges_packed()]
+        segms_first_idx = meshes.mesh_to_edges_packed_first_idx()
+
+        def expected(dists_list, first_idx):
+            # The largest index of the nearest, as in a loop with <=.
+            dists, idxs = [], []
+            for all_dists, first in zip(dists_list, first_idx.tolist()):
+                flipped = all_dists.flip(1).min(1)
+                dists.append(flipped.values)
+                idxs.append(all_dists.shape[1] - 1 - flipped.indices + first)
+            return torch.cat(dists), torch.cat(idxs)
+
+        tris_list = packed_to_list(tris, meshes.num_faces_per_mesh().tolist())
+        segms_list = packed_to_list(segms, meshes.num_edges_per_mesh().tolist())
+        point_tri_dists = [
+            _C.point_face_array_dist_forward(p, t, min_area)
+            for p, t in zip(points, tris_list)
+        ]
+        point_segm_dists = [
+            _C.point_edge_array_dist_forward(p, e) for p, e in zip(points, segms_list)
+        ]
+        max_p = max(len(p) for p in points)
+
+        dists, idxs = _C.point_face_dist_forward(
+            points_packed, points_first_idx, tris, tris_first_idx, max_p, min_area
+        )
+        expected_dists, expected_idxs = expected(point_tri_dists, tris_first_idx)
+        self.assertClose(dists, expected_dists)
+        self.assertClose(idxs, expected_idxs)
+
+        dists, idxs = _C.face_point_dist_forward(
+            points_packed, points_first_idx, tris, tris_first_idx, len(tris), min_area
+        )
+        point_tri_dists = [d.t() for d in point_tri_dists]
+        expected_dists, expected_idxs = expected(point_tri_dists, points_first_idx)
+        self.assertClose(dists, expected_dists)
+        self.assertClose(idxs, expected_idxs)
+
+        dists, idxs = _C.point_edge_dist_forward(
+            points_packed, points_first_idx, segms, segms_first_idx, max_p
+        )
+        expected_dists, expected_idxs = expected(point_segm_dists, segms_first_idx)
+        self.assertClose(dists, expected_dists)
+        self.assertClose(idxs, expected_idxs)
+
+        dists, idxs = _C.edge_point_dist_forward(
+            points_packed, points_first_idx, segms, segms_first_idx, len(segms)
+        )
+        point_segm_dists = [d.t() for d in point_segm_dists]
+        expected_dists, expected_idxs = expected(point_segm_dists, points_first_idx)
+        self.assertClose(dists, expected_dists)
+        self.assertClose(idxs, expected_idxs)
+
     def test_small_faces_case(self):
         for device in [torch.device("cpu"), torch.device("cuda:0")]:
             mesh_vertices = torch.tensor(
@@ -936,3 +1010,13 @@ class TestPointMeshDistance(TestCaseMixin, unittest.TestCase):
             torch.cuda.synchronize()
 
         return loss
+
+    @staticmethod
+    def point_mesh_face_cpu_sphere(ico_level: int, P: int):
+        meshes = ico_sphere(ico_level)
+        pcls = Pointclouds(points=[torch.randn(P, 3)])
+
+        def loss():
+            point_mesh_face_distance(meshes, pcls)
+
+        return loss
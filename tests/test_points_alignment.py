@@ -241,6 +241,33 @@ class TestICP(TestCaseMixin, unittest.TestCase):
                     Xt_pcl_ = Xt_pcl[pcli][:nX]
                     self.assertClose(Xt_pcl_, Xt_, atol=atol)
 
+    def test_knn_method(self):
+        """
+        Tests that the grid nearest neighbor search gives the same ICP result
+        as the default brute force search on the CPU.
+        """
+        torch.manual_seed(4)
+        X, Y = [
+            TestCorrespondingPointsAlignment.init_point_cloud(
+                batch_size=3, n_points=200, dim=3, device=torch.device("cpu")
+            )
+            for _ in range(2)
+        ]
+        solution = points_alignment.iterative_closest_point(X, Y)
+        solution_grid = points_alignment.iterative_closest_point(
+            X, Y, knn_method="grid"
+        )
+        for field in ("R", "T", "s"):
+            self.assertClose(
+                getattr(solution.RTs, field),
+                getattr(solution_grid.RTs, field),
+                atol=1e-5,
+            )
+        self.assertClose(solution.Xt, solution_grid.Xt, atol=1e-5)
+
+        with self.assertRaisesRegex(ValueError, "Unknown method"):
+            points_alignment.iterative_closest_point(X, Y, knn_method="kdtree")
+
     def test_compare_with_trimesh(self):
         """
         Compares the outputs of `iterative_closest_point` with the results
@@ -6,6 +6,8 @@
 
 import functools
 import unittest
+from itertools import product
+from typing import Optional
 
 import torch
 from pytorch3d import _C
@@ -393,6 +395,128 @@ class TestRasterizeMeshes(TestCaseMixin, unittest.TestCase):
         args = ()
         self._compare_impls(fn1, fn2, args, args, verts1, verts2, compare_grads=True)
 
+    def test_simple_cpu_binned(self):
+        device = torch.device("cpu")
+        self._simple_triangle_raster(rasterize_meshes, device, bin_size=5)
+        self._simple_blurry_raster(rasterize_meshes, device, bin_size=5)
+        self._test_behind_camera(rasterize_meshes, device, bin_size=5)
+        self._test_perspective_correct(rasterize_meshes, device, bin_size=5)
+        self._test_back_face_culling(rasterize_meshes, device, bin_size=5)
+
+    def test_cpu_naive_vs_binned(self):
+        """
+        Binned rasterization on the CPU gives exactly the same output as
+        naive rasterization, for any number of threads.
+        """
+        meshes = ico_sphere(2).extend(2)
+        verts = meshes.verts_padded() * torch.tensor([0.9, 1.2, 0.5])
+        verts[..., 2] += 1.5
+        verts[1] = verts[1] * 0.5 + torch.tensor([0.3, -0.2, 0.0])
+        meshes = meshes.update_padded(verts)
+        n_threads = torch.get_num_threads()
+        try:
+            for image_size, blur_radius, faces_per_pixel, cull_backfaces in [
+                (64, 0.0, 1, False),
+                (64, 1e-3, 5, False),
+                ((48, 80), 0.0, 3, True),
+                ((80, 48), 2e-3, 4, False),
+            ]:
+                kwargs = {
+                    "image_size": image_size,
+                    "blur_radius": blur_radius,
+                    "faces_per_pixel": faces_per_pixel,
+                    "perspective_correct": True,
+                    "cull_backfaces": cull_backfaces,
+                }
+                expected = rasterize_meshes(meshes, bin_size=0, **kwargs)
+                for bin_size, threads in product([None, 7, 16], [1, 4]):
+                    torch.set_num_threads(threads)
+                    actual = rasterize_meshes(meshes, bin_size=bin_size, **kwargs)
+                    for a, e in zip(actual, expected):
+                        self.assertTrue(torch.equal(a, e))
+        finally:
+            torch.set_num_threads(n_threads)
+
+    def test_cpu_occlusion_culling(self):
+        """
+        Occlusion culling does not change the output of hard rasterization.
+        """
+        # Several overlapping spheres, one behind the other.
+        sphere = ico_sphere(2)
+        verts = sphere.verts_packed()
+        faces = sphere.faces_packed()
+        V = verts.shape[0]
+        offsets = torch.tensor([[0.1 * i, -0.05 * i, 2.0 + 0.5 * i] for i in range(4)])
+        scene_verts = torch.cat([verts * 0.6 + offset for offset in offsets])
+        scene_faces = torch.cat([faces + i * V for i in range(len(offsets))])
+        meshes = Meshes(verts=[scene_verts, scene_verts * 0.8], faces=[scene_faces] * 2)
+        for bin_size, perspective_correct, cull_backfaces, z_clip_value in [
+            (None, False, False, None),
+            (8, True, False, None),
+            (16, True, True, None),
+            (None, True, False, 2.5),
+        ]:
+            kwargs = {
+                "image_size": (48, 64),
+                "faces_per_pixel": 1,
+                "bin_size": bin_size,
+                "perspective_correct": perspective_correct,
+                "cull_backfaces": cull_backfaces,
+                "z_clip_value": z_clip_value,
+            }
+            expected = rasterize_meshes(meshes, **kwargs)
+            actual = rasterize_meshes(meshes, occlusion_culling=True, **kwargs)
+            for a, e in zip(actual, expected):
+                self.assertTrue(torch.equal(a, e))
+
+    def test_precull_faces(self):
+        """
+        Removing the faces which cannot be seen before rasterization does not
+        change the output or the gradients.
+        """
+        # A zoomed-in view of a grid of spheres, some of which are behind the
+        # camera.
+        sphere = ico_sphere(2)
+        verts = sphere.verts_packed()
+        faces = sphere.faces_packed()
+        V = verts.shape[0]
+        offsets = torch.tensor(
+            [[x, y, z] for x in [-3.0, 0.0, 3.0] for y in [-0.5, 2.0] for z in [-2, 3]]
+        )
+        # A sphere which is partly behind the z_clip_value.
+        offsets = torch.cat([offsets, torch.tensor([[0.5, 0.0, 0.5]])])
+        scene_verts = torch.cat([verts + offset for offset in offsets])
+        scene_faces = torch.cat([faces + i * V for i in range(len(offsets))])
+        for bin_size, blur_radius, faces_per_pixel, cull_backfaces, z_clip_value in [
+            (None, 0.0, 1, False, None),
+            (8, 0.0, 1, True, None),
+            (0, 1e-3, 4, False, None),
+            (None, 1e-3, 4, True, None),
+            (None, 0.0, 1, False, 0.5),
+            (0, 1e-3, 4, True, 0.5),
+        ]:
+            kwargs = {
+                "image_size": (48, 64),
+                "blur_radius": blur_radius,
+                "faces_per_pixel": faces_per_pixel,
+                "bin_size": bin_size,
+                "cull_backfaces": cull_backfaces,
+                "z_clip_value": z_clip_value,
+            }
+            outputs = []
+            grads = []
+            for precull_faces in [False, True]:
+                verts = scene_verts.clone().requires_grad_(True)
+                meshes = Meshes(verts=[verts, verts * 0.8], faces=[scene_faces] * 2)
+                output = rasterize_meshes(meshes, precull_faces=precull_faces, **kwargs)
+                loss = output[1].sum() + output[2].sum() + output[3].sum()
+                loss.backward()
+                outputs.append(output)
+                grads.append(verts.grad)
+            for a, e in zip(outputs[1], outputs[0]):
+                self.assertTrue(torch.equal(a, e))
+            self.assertClose(grads[1], grads[0])
+
     def test_cpp_vs_cuda_bary_clip(self):
         meshes = ico_sphere(2, device=torch.device("cpu"))
         verts1, faces1 = meshes.get_mesh_verts_faces(0)
@@ -1210,8 +1334,17 @@ class TestRasterizeMeshes(TestCaseMixin, unittest.TestCase):
         image_size: int,
         blur_radius: float,
         faces_per_pixel: int,
+        bin_size: Optional[int] = 0,
+        occlusion_culling: bool = False,
+        precull_faces: bool = False,
+        zoom: float = 1.0,
     ):
         meshes = ico_sphere(ico_level, torch.device("cpu"))
+        if zoom != 1.0:
+            # Magnify the sphere in front of the camera, so that most of its
+            # faces are outside the image.
+            verts = meshes.verts_padded() * torch.tensor([zoom, zoom, 1.0])
+            meshes = meshes.update_padded(verts + torch.tensor([0.0, 0.0, 2.0]))
         meshes_batch = meshes.extend(num_meshes)
 
         def rasterize():
@@ -1220,7 +1353,9 @@ class TestRasterizeMeshes(TestCaseMixin, unittest.TestCase):
                 image_size,
                 blur_radius,
                 faces_per_pixel=faces_per_pixel,
-                bin_size=0,
+                bin_size=bin_size,
+                occlusion_culling=occlusion_culling,
+                precull_faces=precull_faces,
             )
 
         return rasterize
@@ -6,22 +6,27 @@
 
 
 import unittest
+from unittest import mock
 
 import numpy as np
 import torch
 from PIL import Image
 from pytorch3d.renderer import (
+    CachingMeshRasterizer,
     FoVOrthographicCameras,
     FoVPerspectiveCameras,
+    IncrementalPointsRasterizer,
     look_at_view_transform,
     MeshRasterizer,
     OrthographicCameras,
     PerspectiveCameras,
+    PointLights,
     PointsRasterizationSettings,
     PointsRasterizer,
     RasterizationSettings,
 )
 from pytorch3d.renderer.fisheyecameras import FishEyeCameras
+from pytorch3d.renderer.mesh.rasterize_meshes import _RasterizeFaceVerts
 from pytorch3d.renderer.opengl.rasterizer_opengl import (
     _check_cameras,
     _check_raster_settings,
@@ -260,6 +265,51 @@ class TestMeshRasterizer(unittest.TestCase):
             rasterizer = MeshRasterizerOpenGL()
             rasterizer.to(device)
 
+    def test_precull_faces(self):
+        """
+        With a perspective camera, which clips the faces at z_clip_value, the
+        faces which cannot be seen are removed before rasterization without
+        changing the output.
+        """
+        sphere = ico_sphere(2)
+        verts = sphere.verts_packed()
+        faces = sphere.faces_packed()
+        V = verts.shape[0]
+        # Spheres in front of the camera, outside the image, behind the camera
+        # and across the near clipping plane.
+        offsets = torch.tensor(
+            [[0.0, 0.0, 0.0], [8.0, 0.0, 0.0], [0.0, 0.0, 8.0], [0.5, 0.0, 2.2]]
+        )
+        meshes = Meshes(
+            verts=[torch.cat([verts + offset for offset in offsets])],
+            faces=[torch.cat([faces + i * V for i in range(len(offsets))])],
+        )
+        R, T = look_at_view_transform(3.0, 0, 0)
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+
+        outputs = []
+        num_faces = []
+        for precull_faces in [False, True]:
+            raster_settings = RasterizationSettings(
+                image_size=64, precull_faces=precull_faces
+            )
+            rasterizer = MeshRasterizer(
+                cameras=cameras, raster_settings=raster_settings
+            )
+            with mock.patch.object(
+                _RasterizeFaceVerts, "apply", wraps=_RasterizeFaceVerts.apply
+            ) as apply:
+                outputs.append(rasterizer(meshes))
+            num_faces.append(apply.call_args[0][0].shape[0])
+
+        # Clipping removes the sphere behind the camera either way, while the
+        # sphere outside the image is only removed by the precull.
+        self.assertLessEqual(num_faces[1], num_faces[0] - faces.shape[0])
+        for name in ["pix_to_face", "zbuf", "bary_coords", "dists"]:
+            a = getattr(outputs[1], name)
+            e = getattr(outputs[0], name)
+            self.assertTrue(torch.equal(a, e))
+
     @usesOpengl
     def test_compare_rasterizers(self):
         device = torch.device("cuda:0")
@@ -329,6 +379,84 @@ class TestMeshRasterizer(unittest.TestCase):
         )
 
 
+class TestCachingMeshRasterizer(TestCaseMixin, unittest.TestCase):
+    def test_cache(self):
+        R, T = look_at_view_transform(2.7, 0, 0)
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+        raster_settings = RasterizationSettings(image_size=32, faces_per_pixel=2)
+        rasterizer = CachingMeshRasterizer(
+            cameras=cameras, raster_settings=raster_settings, max_cache_size=2
+        )
+        sphere = ico_sphere(1)
+        expected = MeshRasterizer(cameras, raster_settings)(sphere)
+
+        fragments = rasterizer(sphere, lights=PointLights())
+        for name in ["pix_to_face", "zbuf", "bary_coords", "dists"]:
+            self.assertClose(getattr(fragments, name), getattr(expected, name))
+        self.assertEqual(rasterizer.stats(), {"hits": 0, "misses": 1})
+
+        # Equal meshes and shader arguments do not matter.
+        lights = PointLights(location=[[1.0, 2.0, 3.0]])
+        fragments2 = rasterizer(sphere.clone(), lights=lights)
+        self.assertIs(fragments2, fragments)
+        self.assertEqual(rasterizer.stats(), {"hits": 1, "misses": 1})
+
+        # Different vertices, cameras or settings are rasterized again.
+        moved = sphere.offset_verts(torch.tensor([0.1, 0.0, 0.0]))
+        self.assertIsNot(rasterizer(moved), fragments)
+        _, T2 = look_at_view_transform(3.0, 0, 0)
+        self.assertIsNot(rasterizer(sphere, T=T2), fragments)
+        raster_settings.faces_per_pixel = 1
+        fragments3 = rasterizer(sphere)
+        self.assertEqual(fragments3.pix_to_face.shape[-1], 1)
+        self.assertEqual(rasterizer.stats(), {"hits": 1, "misses": 4})
+
+        # Only the two most recently used Fragments are kept.
+        self.assertIs(rasterizer(sphere), fragments3)
+        raster_settings.faces_per_pixel = 2
+        self.assertIsNot(rasterizer(sphere), fragments)
+        self.assertEqual(rasterizer.stats(), {"hits": 2, "misses": 5})
+
+        rasterizer.clear_cache()
+        rasterizer(sphere)
+        self.assertEqual(rasterizer.stats(), {"hits": 2, "misses": 6})
+
+    def test_cache_cuda(self):
+        device = torch.device("cuda:0")
+        rasterizer = CachingMeshRasterizer(
+            cameras=FoVPerspectiveCameras(T=torch.tensor([[0.0, 0.0, 3.0]])),
+            raster_settings=RasterizationSettings(image_size=16),
+        ).to(device)
+        sphere = ico_sphere(1, device)
+        fragments = rasterizer(sphere)
+        # On the GPU, the same tensors are found without reading them.
+        self.assertIs(rasterizer(sphere), fragments)
+        self.assertEqual(rasterizer.stats(), {"hits": 1, "misses": 1})
+        # In-place changes are seen through the version counter.
+        with torch.no_grad():
+            sphere.verts_packed().mul_(0.5)
+        self.assertIsNot(rasterizer(sphere), fragments)
+        self.assertEqual(rasterizer.stats(), {"hits": 1, "misses": 2})
+
+    def test_requires_grad(self):
+        rasterizer = CachingMeshRasterizer(
+            cameras=FoVPerspectiveCameras(T=torch.tensor([[0.0, 0.0, 3.0]])),
+            raster_settings=RasterizationSettings(image_size=16),
+        )
+        sphere = ico_sphere(1)
+        verts = sphere.verts_packed().clone().requires_grad_(True)
+        mesh = Meshes(verts=[verts], faces=[sphere.faces_packed()])
+        for _ in range(2):
+            fragments = rasterizer(mesh)
+            fragments.zbuf.sum().backward()
+        self.assertEqual(rasterizer.stats(), {"hits": 0, "misses": 0})
+
+        with torch.no_grad():
+            rasterizer(mesh)
+            rasterizer(mesh)
+        self.assertEqual(rasterizer.stats(), {"hits": 1, "misses": 1})
+
+
 @usesOpengl
 class TestMeshRasterizerOpenGLUtils(TestCaseMixin, unittest.TestCase):
     def setUp(self):
@@ -585,3 +713,57 @@ class TestPointRasterizer(unittest.TestCase):
         device = torch.device("cuda:0")
         rasterizer = PointsRasterizer()
         rasterizer.to(device)
+
+
+class TestIncrementalPointsRasterizer(TestCaseMixin, unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        torch.manual_seed(42)
+
+    def _assert_fragments_close(self, fragments, expected):
+        self.assertClose(fragments.idx, expected.idx)
+        self.assertClose(fragments.zbuf, expected.zbuf)
+        self.assertClose(fragments.dists, expected.dists)
+
+    def test_growing_clouds(self):
+        R, T = look_at_view_transform(2.7, 0.0, 0.0)
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+        raster_settings = PointsRasterizationSettings(
+            image_size=(24, 32), radius=0.1, points_per_pixel=4, bin_size=0
+        )
+        rasterizer = IncrementalPointsRasterizer(cameras, raster_settings)
+        full_rasterizer = PointsRasterizer(cameras, raster_settings)
+        points = [torch.rand(300, 3) * 2 - 1, torch.rand(200, 3) * 2 - 1]
+        for lengths in [[50, 0], [100, 20], [100, 120], [300, 200], [300, 200]]:
+            clouds = Pointclouds(points=[p[:n] for p, n in zip(points, lengths)])
+            fragments = rasterizer(clouds)
+            self._assert_fragments_close(fragments, full_rasterizer(clouds))
+        self.assertEqual(rasterizer.stats(), {"incremental": 4, "full": 1})
+
+        # Changed points or cameras are rasterized again.
+        points[0][10] += 0.1
+        clouds = Pointclouds(points=points)
+        self._assert_fragments_close(rasterizer(clouds), full_rasterizer(clouds))
+        _, T2 = look_at_view_transform(3.0, 0.0, 0.0)
+        fragments = rasterizer(clouds, T=T2)
+        self._assert_fragments_close(fragments, full_rasterizer(clouds, T=T2))
+        self.assertEqual(rasterizer.stats(), {"incremental": 4, "full": 3})
+
+        rasterizer.clear_cache()
+        rasterizer(clouds, T=T2)
+        self.assertEqual(rasterizer.stats(), {"incremental": 4, "full": 4})
+
+    def test_radius_per_point(self):
+        cameras = FoVPerspectiveCameras(T=torch.tensor([[0.0, 0.0, 2.5]]))
+        rasterizer = IncrementalPointsRasterizer(cameras)
+        points = torch.rand(1, 400, 3) * 2 - 1
+        radius = torch.rand(1, 400) * 0.1
+        for length in [100, 400]:
+            raster_settings = PointsRasterizationSettings(
+                image_size=32, radius=radius[:, :length], points_per_pixel=3
+            )
+            clouds = Pointclouds(points=points[:, :length])
+            fragments = rasterizer(clouds, raster_settings=raster_settings)
+            expected = PointsRasterizer(cameras, raster_settings)(clouds)
+            self._assert_fragments_close(fragments, expected)
+        self.assertEqual(rasterizer.stats(), {"incremental": 1, "full": 1})
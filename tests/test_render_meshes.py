@@ -518,6 +518,92 @@ class TestRenderMeshes(TestCaseMixin, unittest.TestCase):
             images[0, ...].sum().backward()
             self.assertIsNotNone(verts.grad)
 
+    def test_tiled_rendering(self):
+        """
+        Rendering an image in tiles gives the same image as rendering it whole.
+        """
+        sphere_mesh = ico_sphere(3)
+        verts_padded = sphere_mesh.verts_padded()
+        sphere_mesh = sphere_mesh.update_padded(verts_padded * 0.8 + 0.2)
+        features = torch.rand_like(verts_padded)
+        sphere_mesh.textures = TexturesVertex(verts_features=features)
+        R, T = look_at_view_transform(2.7, 10, 20)
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+        lights = PointLights(location=[[0.0, 0.0, -2.0]])
+        for image_size, tile_size, shader_class, blur_radius, faces_per_pixel in [
+            (64, 32, HardPhongShader, 0.0, 1),
+            ((64, 96), (32, 64), HardPhongShader, 0.0, 1),
+            ((96, 64), 32, SoftPhongShader, 1e-4, 10),
+        ]:
+            raster_settings = RasterizationSettings(
+                image_size=image_size,
+                blur_radius=blur_radius,
+                faces_per_pixel=faces_per_pixel,
+            )
+            rasterizer = MeshRasterizer(cameras, raster_settings)
+            shader = shader_class(lights=lights, cameras=cameras)
+            expected = MeshRenderer(rasterizer, shader)(sphere_mesh)
+            renderer = MeshRenderer(rasterizer, shader, tile_size=tile_size)
+            images = renderer(sphere_mesh)
+            self.assertClose(images, expected, atol=1e-5)
+
+        if not skip_opengl_requested():
+            rasterizer = MeshRasterizerOpenGL(cameras=cameras)
+            with self.assertRaisesRegex(ValueError, "requires a MeshRasterizer"):
+                MeshRenderer(rasterizer, shader, tile_size=32)
+
+    def test_sparse_fragments(self):
+        """
+        Soft rendering with sparse fragments gives the same images as with the
+        dense fragments.
+        """
+        sphere_mesh = ico_sphere(2).extend(2)
+        verts_padded = sphere_mesh.verts_padded()
+        sphere_mesh = sphere_mesh.update_padded(verts_padded * 0.5)
+        V, F = verts_padded.shape[1], sphere_mesh.faces_padded().shape[1]
+        R, T = look_at_view_transform(2.7, 10, torch.tensor([20.0, 80.0]))
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+        lights = PointLights(location=[[0.0, 0.0, -2.0]])
+        blend_params = BlendParams(sigma=1e-4, gamma=1e-4)
+        textures = [
+            TexturesVertex(verts_features=torch.rand(2, V, 3)),
+            TexturesUV(
+                maps=torch.rand(2, 8, 8, 3),
+                faces_uvs=sphere_mesh.faces_padded(),
+                verts_uvs=torch.rand(2, V, 2),
+            ),
+            TexturesAtlas(atlas=torch.rand(2, F, 2, 2, 3)),
+        ]
+        for texture, shader_class in product(
+            textures, [SoftPhongShader, SoftSilhouetteShader]
+        ):
+            sphere_mesh.textures = texture
+            images = []
+            for sparse_fragments in [False, True]:
+                raster_settings = RasterizationSettings(
+                    image_size=(48, 32),
+                    blur_radius=np.log(1.0 / 1e-4 - 1.0) * blend_params.sigma,
+                    faces_per_pixel=8,
+                    sparse_fragments=sparse_fragments,
+                )
+                rasterizer = MeshRasterizer(cameras, raster_settings)
+                if shader_class is SoftPhongShader:
+                    shader = shader_class(
+                        lights=lights, cameras=cameras, blend_params=blend_params
+                    )
+                else:
+                    shader = shader_class(blend_params=blend_params)
+                images.append(MeshRenderer(rasterizer, shader)(sphere_mesh))
+            self.assertClose(images[1], images[0], atol=1e-5)
+
+        fragments = rasterizer(sphere_mesh)
+        raster_settings.sparse_fragments = False
+        expected = rasterizer(sphere_mesh)
+        self.assertEqual(fragments.shape, tuple(expected.pix_to_face.shape))
+        dense = fragments.to_dense()
+        for field in ["pix_to_face", "zbuf", "bary_coords", "dists"]:
+            self.assertClose(getattr(dense, field), getattr(expected, field))
+
     def test_texture_map(self):
         """
         Test a mesh with a texture map is loaded and rendered correctly.
@@ -371,6 +371,28 @@ class TestRenderPoints(TestCaseMixin, unittest.TestCase):
                 )
             self.assertClose(rgb, image_ref)
 
+    def test_tiled_rendering(self):
+        """
+        Rendering an image in tiles gives the same image as rendering it whole.
+        """
+        points = torch.rand(2, 500, 3) * 1.6 - 0.8
+        features = torch.rand(2, 500, 3)
+        pointclouds = Pointclouds(points=points, features=features)
+        R, T = look_at_view_transform(2.7, 10, 20)
+        cameras = FoVPerspectiveCameras(R=R, T=T)
+        for image_size, tile_size, compositor in [
+            (64, 32, AlphaCompositor()),
+            ((64, 96), (32, 64), NormWeightedCompositor()),
+        ]:
+            raster_settings = PointsRasterizationSettings(
+                image_size=image_size, radius=0.05, points_per_pixel=5
+            )
+            rasterizer = PointsRasterizer(cameras, raster_settings)
+            expected = PointsRenderer(rasterizer, compositor)(pointclouds)
+            renderer = PointsRenderer(rasterizer, compositor, tile_size=tile_size)
+            images = renderer(pointclouds)
+            self.assertClose(images, expected, atol=1e-5)
+
     def test_compositor_background_color_rgba(self):
 
         N, H, W, K, C, P = 1, 15, 15, 20, 4, 225
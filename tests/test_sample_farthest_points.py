@@ -179,6 +179,25 @@ class TestFPS(TestCaseMixin, unittest.TestCase):
         self._test_random_start(sample_farthest_points, device)
         self._test_gradcheck(sample_farthest_points, device)
 
+    def test_cpu_num_threads(self):
+        """
+        The CPU implementation gives identical results for any number of threads,
+        both when there are more clouds than threads and when there are fewer.
+        """
+        old_num_threads = torch.get_num_threads()
+        for N, P in [(8, 500), (1, 40000)]:
+            points = torch.rand((N, P, 3))
+            lengths = torch.randint(low=P // 2, high=P + 1, size=(N,))
+            outputs = []
+            try:
+                for num_threads in [1, 4]:
+                    torch.set_num_threads(num_threads)
+                    _, idxs = sample_farthest_points(points, lengths, K=50)
+                    outputs.append(idxs)
+            finally:
+                torch.set_num_threads(old_num_threads)
+            self.assertTrue(torch.equal(outputs[0], outputs[1]))
+
     def test_cuda_vs_cpu(self):
         """
         Compare cuda vs cpu on a complex object
@@ -274,3 +293,15 @@ class TestFPS(TestCaseMixin, unittest.TestCase):
             torch.cuda.synchronize()
 
         return output
+
+    @staticmethod
+    def sample_farthest_points_cpu_num_threads(
+        N: int, P: int, D: int, K: int, threads: int
+    ):
+        torch.set_num_threads(threads)
+        pts = torch.randn(N, P, D, dtype=torch.float32)
+
+        def output():
+            sample_farthest_points(pts, K=K)
+
+        return output